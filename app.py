@@ -22,19 +22,58 @@ def initialize_session_state():
         st.session_state.dark_mode = True  # الوضع الليلي افتراضي
     if 'models_loaded' not in st.session_state:
         st.session_state.models_loaded = {}
+    if 'session_id' not in st.session_state:
+        # معرف جلسة المحادثة مع Gemini (يتغير مع كل محادثة جديدة)
+        import uuid
+        st.session_state.session_id = uuid.uuid4().hex
+    if 'risk_state' not in st.session_state:
+        # تراكم الخطر عبر رسائل الجلسة (يُحدَّث مع كل رسالة بدون إعادة فحص السجل)
+        from config import Config
+        from utils.conversation_risk import ConversationRiskState
+        st.session_state.risk_state = ConversationRiskState(**Config.RISK_SETTINGS)
 
-@st.cache_resource(ttl=3600)  # Cache لمدة ساعة
-def load_emotion_model_v2():
-    """تحميل نموذج المشاعر مع Cache - V2"""
+def create_emotion_detector():
+    """إنشاء محلل المشاعر (يُستدعى من Thread التجهيز)"""
     from emotion_model import EmotionDetector
     return EmotionDetector()
 
-@st.cache_resource(ttl=3600)
-def load_response_model():
-    """تحميل نموذج الردود مع Cache"""
+def create_response_generator():
+    """إنشاء مولد الردود (يُستدعى من Thread التجهيز)"""
     from response_generator import GeminiResponseGenerator
     return GeminiResponseGenerator()
 
+def load_compiled_lexicons():
+    """تحميل القواميس المجمعة المشتركة"""
+    from utils.lexicon_store import get_compiled
+    return get_compiled()
+
+def start_warmup():
+    """
+    تسجيل النماذج الثقيلة وبدء تجهيزها في الخلفية من أول تشغيل للسكريبت
+    (التسجيل والبدء يحدثان مرة واحدة لكل عملية)
+    """
+    from config import Config
+    from utils.warmup import get_warmup_manager
+    
+    ttl = Config.PERFORMANCE_SETTINGS['model_reload_ttl']
+    manager = get_warmup_manager()
+    manager.register('lexicons', load_compiled_lexicons, ttl=float('inf'),
+                     exercise=lambda compiled: compiled['matcher'].find("تجهيز"))
+    manager.register('emotion', create_emotion_detector, ttl=ttl,
+                     exercise=lambda detector: detector.warm_up())
+    manager.register('response', create_response_generator, ttl=ttl,
+                     exercise=lambda generator: generator.warm_up())
+    manager.start()
+    return manager
+
+def load_emotion_model_v2():
+    """محلل المشاعر الجاهز (يُحدَّث في الخلفية دون توقف عند انتهاء صلاحيته) - V2"""
+    return start_warmup().get('emotion')
+
+def load_response_model():
+    """مولد الردود الجاهز (يُحدَّث في الخلفية دون توقف عند انتهاء صلاحيته)"""
+    return start_warmup().get('response')
+
 @st.cache_resource(ttl=3600)
 def load_tracker():
     """تحميل نظام التتبع مع Cache"""
@@ -59,14 +98,22 @@ def load_ui():
     from ui_components import UIComponents
     return UIComponents()
 
+@st.cache_resource(ttl=3600)
+def load_risk_detector():
+    """تحميل كاشف الخطر مع Cache"""
+    from utils.risk_detector import RiskDetector
+    return RiskDetector()
+
 def load_model(model_name):
     """تحميل النماذج عند الحاجة فقط (Lazy Loading) مع Cache"""
+    # النماذج المُجهَّزة في الخلفية لا تُثبَّت في الجلسة حتى تصلها النسخة المحدثة
+    if model_name == 'emotion':
+        return load_emotion_model_v2()
+    if model_name == 'response':
+        return load_response_model()
+    
     if model_name not in st.session_state.models_loaded:
-        if model_name == 'emotion':
-            st.session_state.models_loaded[model_name] = load_emotion_model_v2()
-        elif model_name == 'response':
-            st.session_state.models_loaded[model_name] = load_response_model()
-        elif model_name == 'tracker':
+        if model_name == 'tracker':
             st.session_state.models_loaded[model_name] = load_tracker()
         elif model_name == 'exercises':
             st.session_state.models_loaded[model_name] = load_exercises()
@@ -74,6 +121,8 @@ def load_model(model_name):
             st.session_state.models_loaded[model_name] = load_resources()
         elif model_name == 'ui':
             st.session_state.models_loaded[model_name] = load_ui()
+        elif model_name == 'risk':
+            st.session_state.models_loaded[model_name] = load_risk_detector()
     
     return st.session_state.models_loaded.get(model_name)
 
@@ -82,6 +131,9 @@ def main():
     # تهيئة الذاكرة
     initialize_session_state()
     
+    # بدء تجهيز النماذج في الخلفية (أول تشغيل فقط)
+    warmup = start_warmup()
+    
     # تحسين سرعة التنقل - تعطيل بعض الميزات الثقيلة
     st.markdown("""
     <style>
@@ -178,6 +230,9 @@ def main():
             st.session_state.conversation_history = []
             st.session_state.messages = []
             st.session_state.show_welcome = True
+            st.session_state.risk_state.reset()
+            import uuid
+            st.session_state.session_id = uuid.uuid4().hex
             st.rerun()
         
         st.markdown("---")
@@ -198,6 +253,10 @@ def main():
             from ui_components import create_welcome_animation
             create_welcome_animation()
             st.session_state.show_welcome = False
+        
+        # حالة تجهيز النماذج (المحادثة تعمل في كل الأحوال، وأول رسالة تنتظر التجهيز فقط)
+        if not warmup.is_ready('emotion', 'response'):
+            st.caption("⏳ جاري تجهيز نماذج التحليل في الخلفية...")
 
         # عرض الرسائل السابقة
         for message in st.session_state.messages:
@@ -213,15 +272,38 @@ def main():
             response_gen = load_model('response')
             mood_tracker = load_model('tracker')
             therapy_exercises = load_model('exercises')
+            risk_detector = load_model('risk')
             
             # عرض رسالة المستخدم
             st.session_state.messages.append({"role": "user", "content": prompt})
             with st.chat_message("user"):
                 st.markdown(prompt)
             
+            # كشف الخطر أولاً (ميكروثوانٍ): رسالة الطوارئ لا تنتظر تحليل المشاعر
+            # ولا يُرسل لها طلب Gemini أصلاً
+            import time
+            from utils.crisis_fast_path import LLM_CANCELLED, get_crisis_stats, start_reply_stream
+            # خطر الرسالة مع ما تراكم من الرسائل السابقة في الجلسة
+            risk_result = st.session_state.risk_state.update(risk_detector.detect_risk(prompt))
+            is_crisis = risk_result['level'] == 'high'
+            get_crisis_stats().record_message(crisis=is_crisis)
+            if is_crisis:
+                detected_at = time.perf_counter()
+                ai_response = risk_detector.get_crisis_response()
+                response_source = 'Crisis Protocol'
+                crisis_bubble = st.chat_message("assistant")
+                crisis_bubble.markdown(ai_response)
+                get_crisis_stats().record_render(time.perf_counter() - detected_at)
+                get_crisis_stats().record_llm(LLM_CANCELLED)
+            
             # تحليل المشاعر
             with st.spinner("🔍 بحلل كلامك..."):
-                emotion_result = emotion_model.detect_emotion(prompt)
+                # الرسائل الطويلة تُحلل جملة بجملة بزمن محدود
+                from config import Config
+                if len(prompt) >= Config.PERFORMANCE_SETTINGS['stream_min_chars']:
+                    emotion_result = emotion_model.detect_emotion_streaming(prompt)
+                else:
+                    emotion_result = emotion_model.detect_emotion(prompt)
                 emotion = emotion_result["emotion"]
                 confidence = emotion_result["confidence"]
                 description = emotion_result["description_ar"]
@@ -229,23 +311,94 @@ def main():
             # عرض نتيجة التحليل
             ui_components.create_mood_card(emotion, confidence, description)
             
-            # توليد الرد
-            with st.spinner("💭 بفكر في الرد المناسب..."):
-                history_text = ""
-                for conv in st.session_state.conversation_history[-3:]:
-                    history_text += f"المستخدم: {conv['user']}\nالمساعد: {conv['assistant']}\n"
-                
-                ai_response = response_gen.generate_ai_response(
+            # توليد الرد في الخلفية
+            history_text = ""
+            for conv in st.session_state.conversation_history[-3:]:
+                history_text += f"المستخدم: {conv['user']}\nالمساعد: {conv['assistant']}\n"
+            
+            def start_gemini_reply():
+                return start_reply_stream(
+                    response_gen.stream_ai_response,
                     user_text=prompt,
                     emotion=emotion,
-                    history=history_text
+                    history=history_text,
+                    session_id=st.session_state.session_id,
+                    turns=st.session_state.conversation_history[-Config.PERFORMANCE_SETTINGS['chat_history_turns']:]
                 )
             
+            # الرسائل المتكررة (التحيات مثلاً) ترد من الـ Cache بدون طلب Gemini
+            # (الرسائل المقلقة يرد عليها Gemini دائماً)
+            from utils.response_cache import get_near_duplicate_cache, get_response_cache
+            response_cache = get_response_cache()
+            near_cache = get_near_duplicate_cache()
+            cache_key = response_cache.make_key(prompt, emotion, history_text)
+            cached_response = None
+            if not risk_result['is_risk']:
+                cached_response = response_cache.get(cache_key)
+                cache_source = 'Response Cache'
+                if cached_response is None:
+                    # نفس الرسالة باختلاف إملائي بسيط ("قلقان اوي" / "قلقانه قوي")
+                    cached_response = near_cache.get(prompt, emotion, history_text)
+                    cache_source = 'Near-Duplicate Cache'
+            pending_reply = start_gemini_reply() if not is_crisis and cached_response is None else None
+            
+            if is_crisis:
+                crisis_bubble.caption(f"🎭 الحالة: {emotion} | 🤖 النموذج: {response_source}")
+            elif cached_response is not None:
+                ai_response = cached_response
+                response_source = cache_source
+                with st.chat_message("assistant"):
+                    st.markdown(ai_response)
+                    st.caption(f"🎭 الحالة: {emotion} | 🤖 النموذج: {response_source}")
+                # جلسة Gemini تحتفظ بالدور حتى لو لم يُطلب منها
+                response_gen.record_turn(st.session_state.session_id, prompt, emotion, ai_response)
+            else:
+                # عرض الرد أولاً بأول مع وصول أجزائه من Gemini، ورد احتياطي فوري إذا تأخر
+                from utils.hedged_reply import HEDGE, HEDGE_FOLLOW, FallbackReply, hedged_updates
+                settings = Config.PERFORMANCE_SETTINGS
+                hedge_deadline = settings['hedge_deadline_risk_s' if risk_result['is_risk'] else 'hedge_deadline_s']
+                response_source = emotion_result.get('source', 'Unknown')
+                ai_response = hedge_response = None
+                follow_bubble = False
+                bubble = st.chat_message("assistant")
+                placeholder = bubble.empty()
+                placeholder.markdown("💭 بفكر في الرد المناسب...")
+                for ai_response, reply_source in hedged_updates(
+                    pending_reply,
+                    lambda: response_gen.generate_fallback_response(prompt, emotion),
+                    hedge_deadline
+                ):
+                    if reply_source == HEDGE:
+                        hedge_response = ai_response
+                    elif hedge_response is not None and settings['hedge_mode'] == HEDGE_FOLLOW and not follow_bubble:
+                        # الرد المتأخر في رسالة جديدة بعد الرد الاحتياطي
+                        bubble.caption(f"🎭 الحالة: {emotion} | 🤖 النموذج: Fallback")
+                        bubble = st.chat_message("assistant")
+                        placeholder = bubble.empty()
+                        follow_bubble = True
+                    placeholder.markdown(ai_response if reply_source == HEDGE else ai_response + " ▌")
+                if ai_response is None:
+                    ai_response = FallbackReply(response_gen.generate_fallback_response(prompt, emotion))
+                if ai_response is hedge_response or isinstance(ai_response, FallbackReply):
+                    response_source = 'Fallback'
+                elif not risk_result['is_risk']:
+                    response_cache.put(cache_key, ai_response)
+                    near_cache.put(prompt, emotion, history_text, ai_response)
+                placeholder.markdown(ai_response)
+                bubble.caption(f"🎭 الحالة: {emotion} | 🤖 النموذج: {response_source}")
+                if follow_bubble:
+                    st.session_state.messages.append({
+                        "role": "assistant",
+                        "content": hedge_response,
+                        "emotion": emotion,
+                        "source": "Fallback"
+                    })
+            
             # حفظ في نظام تتبع المزاج
             mood_tracker.add_mood_entry(emotion, confidence, prompt, ai_response)
             
             # اقتراح تمرين
-            recommended_exercise = therapy_exercises.get_recommended_exercise(emotion)
+            recommended_exercise = None if is_crisis else therapy_exercises.get_recommended_exercise(emotion)
             if recommended_exercise:
                 st.info(f"💡 **اقتراح:** جرب تمرين '{recommended_exercise['exercise']}' - {recommended_exercise['reason']}")
             
@@ -264,13 +417,8 @@ def main():
                 "role": "assistant",
                 "content": ai_response,
                 "emotion": emotion,
-                "source": emotion_result.get('source', 'Unknown')
+                "source": response_source
             })
-            
-            # عرض الرد
-            with st.chat_message("assistant"):
-                st.markdown(ai_response)
-                st.caption(f"🎭 الحالة: {emotion} | 🤖 النموذج: {emotion_result.get('source', 'Unknown')}")
 
         # رسالة ترحيبية
         if len(st.session_state.messages) == 0:
@@ -332,10 +480,95 @@ def main():
             if st.checkbox("أؤكد رغبتي في مسح جميع البيانات"):
                 st.session_state.conversation_history = []
                 st.session_state.messages = []
+                import uuid
+                st.session_state.session_id = uuid.uuid4().hex
                 # يمكن إضافة مسح بيانات المزاج هنا
                 st.success("تم مسح البيانات بنجاح!")
                 st.rerun()
         
+        st.subheader("⚡ الأداء")
+        
+        from utils.analysis_cache import get_analysis_cache
+        cache_stats = get_analysis_cache().stats()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("🎯 نسبة نجاح الـ Cache", f"{cache_stats['hit_rate'] * 100:.0f}%")
+        col2.metric("✅ Hits / ❌ Misses", f"{cache_stats['hits']} / {cache_stats['misses']}")
+        col3.metric("📦 حجم الـ Cache", f"{cache_stats['size_bytes'] / 1024:.0f} KB")
+
+        from emotion_model import get_cascade_stats
+        cascade = get_cascade_stats().stats()
+        stages = cascade['stages']
+        col1, col2, col3 = st.columns(3)
+        col1.metric("🪜 نسبة التصعيد للنموذج", f"{cascade['escalation_rate'] * 100:.0f}%")
+        col2.metric("⏱️ زمن الكلمات المفتاحية",
+                    f"{stages.get('keywords', {}).get('total_ms', 0):.0f} ms")
+        col3.metric("⏱️ زمن النموذج", f"{sum(s['total_ms'] for n, s in stages.items() if n != 'keywords'):.0f} ms")
+
+        from utils.crisis_fast_path import get_crisis_stats
+        crisis = get_crisis_stats().stats()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("🚨 رسائل أزمات", f"{crisis['crises']} / {crisis['messages']}")
+        col2.metric("⏱️ من الكشف للعرض (متوسط)",
+                    f"{crisis['avg_render_ms']:.1f} ms" if crisis['avg_render_ms'] is not None else "-")
+        col3.metric("🛑 طلبات Gemini الملغاة / المتجاهلة", f"{crisis['llm_cancelled']} / {crisis['llm_discarded']}")
+
+        from utils.token_usage import get_token_stats
+        tokens = get_token_stats().stats()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("🔢 Tokens الطلب (متوسط)", f"{tokens['avg_prompt_tokens']:.0f}")
+        col2.metric("📜 بالطريقة القديمة (تقدير)", f"{tokens['avg_legacy_prompt_tokens']:.0f}")
+        col3.metric("💰 التوفير في الطلب", f"{tokens['prompt_saving'] * 100:.0f}%")
+
+        from utils.reply_timing import get_reply_timing
+        timing = get_reply_timing().stats()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("⚡ أول جزء من الرد (متوسط)",
+                    f"{timing['avg_ttft_ms']:.0f} ms" if timing['avg_ttft_ms'] is not None else "-")
+        col2.metric("⏱️ الرد كاملاً (متوسط)",
+                    f"{timing['avg_total_ms']:.0f} ms" if timing['avg_total_ms'] is not None else "-")
+        col3.metric("🛟 ردود احتياطية", f"{timing['fallbacks']} / {timing['turns']}")
+
+        from utils.response_cache import get_response_cache
+        response_cache_stats = get_response_cache().stats()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("♻️ نسبة الردود من الـ Cache", f"{response_cache_stats['hit_rate'] * 100:.0f}%")
+        col2.metric("📉 طلبات Gemini الموفرة", response_cache_stats['api_calls_saved'])
+        col3.metric("⏱️ زمن الرد من الـ Cache",
+                    f"{response_cache_stats['avg_hit_ms']:.3f} ms" if response_cache_stats['avg_hit_ms'] is not None else "-")
+
+        from utils.response_cache import get_near_duplicate_cache
+        near_stats = get_near_duplicate_cache().stats()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("🔎 ردود من رسائل مشابهة", f"{near_stats['hit_rate'] * 100:.0f}%")
+        col2.metric("📉 طلبات موفرة (رسائل مشابهة)", near_stats['api_calls_saved'])
+        col3.metric("⏱️ زمن البحث (MinHash)",
+                    f"{near_stats['avg_query_ms']:.3f} ms" if near_stats['avg_query_ms'] is not None else "-")
+
+        from utils.hedged_reply import get_hedge_stats
+        hedge = get_hedge_stats().stats()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("⏰ ردود بعد المهلة (احتياطي فوري)", f"{hedge['hedge_rate'] * 100:.0f}%")
+        col2.metric("📬 استخدام الرد المتأخر", f"{hedge['late_use_rate'] * 100:.0f}%")
+        col3.metric("⌛ تأخر الرد بعد الاحتياطي (متوسط)",
+                    f"{hedge['avg_late_ms']:.0f} ms" if hedge['avg_late_ms'] is not None else "-")
+
+        if warmup.is_ready('response'):
+            breaker = warmup.get('response').breaker.stats()
+            col1, col2, col3 = st.columns(3)
+            col1.metric("🔌 حالة الاتصال بـ Gemini (Circuit)", breaker['state'])
+            col2.metric("🔁 إعادة المحاولات", breaker['retries'])
+            col3.metric("⛔ طلبات مرفوضة / فشل", f"{breaker['rejected']} / {breaker['failures']}")
+
+        readiness = warmup.readiness()
+        st.caption("🔥 جاهزية النماذج: " + " | ".join(f"{name}: {state}" for name, state in readiness.items()))
+
+        from utils.micro_batcher import batcher_stats
+        for (backend_name, _), batching in batcher_stats().items():
+            col1, col2, col3 = st.columns(3)
+            col1.metric(f"📦 متوسط الدفعة ({backend_name})", f"{batching['avg_batch_size']:.1f}")
+            col2.metric("⏳ زمن الانتظار الإضافي (p95)", f"{batching['p95_wait_ms']:.1f} ms")
+            col3.metric("📥 عمق الطابور", f"{batching['queue_depth']} / {batching['max_queue_depth']}")
+
         st.subheader("ℹ️ معلومات التطبيق")
         st.info("""
         **الإصدار:** 2.0.0
@@ -0,0 +1,4 @@
+"""
+Benchmarks Package
+قياسات أداء مسار معالجة النصوص والتحليل
+"""
@@ -0,0 +1,66 @@
+"""
+Micro-benchmark لتحويل اللهجة المصرية
+يقارن DialectRewriter (Regex واحد على شكل Trie) بالتنفيذات القديمة لكل مستخدم:
+    - map_egyptian_to_standard: تقسيم بالمسافات ثم بحث كل كلمة في القاموس
+      (على النص المنظف كما يُستدعى في preprocess_for_model)
+    - normalize_egyptian_text: str.replace لكل مفتاح في القاموس على النص الخام
+
+الاستخدام:
+    python -m benchmarks.bench_dialect_rewriter --messages 5000
+"""
+
+import argparse
+
+from benchmarks.bench_text_cleaner import best_of
+from benchmarks.corpus import generate_corpus
+from build_lexicons import load_dialect_dictionary
+from utils.text_cleaner import ArabicTextCleaner
+
+
+def legacy_map_egyptian_to_standard(mapping):
+    """التنفيذ القديم لـ map_egyptian_to_standard كمرجع للمقارنة"""
+    def rewrite(text):
+        words = text.split()
+        mapped_words = []
+        for word in words:
+            if word in mapping:
+                mapped_words.append(mapping[word])
+            else:
+                mapped_words.append(word)
+        return ' '.join(mapped_words)
+    return rewrite
+
+
+def legacy_normalize_egyptian_text(mapping):
+    """التنفيذ القديم لـ normalize_egyptian_text كمرجع للمقارنة"""
+    def rewrite(text):
+        text_lower = text.lower()
+        for egyptian, formal in mapping.items():
+            text_lower = text_lower.replace(egyptian, formal)
+        return text_lower
+    return rewrite
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dialect rewriter micro-benchmark")
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20, help="عدد القياسات لكل حالة")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.messages)
+    cleaner = ArabicTextCleaner()
+    dialect = load_dialect_dictionary()
+    cleaned = [cleaner.clean_text(text) for text in corpus]
+
+    for name, legacy, current, texts in [
+        ("map_egyptian_to_standard", legacy_map_egyptian_to_standard(cleaner.egyptian_to_standard),
+         cleaner.map_egyptian_to_standard, cleaned),
+        ("normalize_egyptian_text", legacy_normalize_egyptian_text(dialect.EGYPTIAN_TO_ARABIC),
+         dialect.normalize_egyptian_text, corpus),
+    ]:
+        legacy_us, current_us = best_of([legacy, current], texts, args.repeat)
+        print(f"{name:>25}: legacy {legacy_us:6.2f} | current {current_us:6.2f} µs/msg")
+
+
+if __name__ == "__main__":
+    main()
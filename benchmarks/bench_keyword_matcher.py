@@ -0,0 +1,104 @@
+"""
+Micro-benchmark لمطابق الكلمات المشترك
+يقارن (مع زيادة عدد كلمات قاموس المشاعر) بين:
+    - legacy: الحلقة القديمة (keyword in text.lower() لكل كلمة)
+    - matcher: KeywordMatcher (Regex واحد على شكل Trie لقاموس الفئة فقط)
+وبعدها الدالتين الفعليتين بالقاموس الحالي مقابل تنفيذهما القديم
+
+الاستخدام:
+    python -m benchmarks.bench_keyword_matcher --sizes 0,1000,5000
+"""
+
+import argparse
+
+from benchmarks.bench_risk_matcher import synthetic_keywords
+from benchmarks.bench_text_cleaner import best_of
+from benchmarks.corpus import generate_corpus
+from build_lexicons import load_dialect_dictionary
+from utils.keyword_matcher import KeywordMatcher
+from utils.lexicon_store import get_shared_matcher
+from utils.text_cleaner import ARABIC_NORMALIZE_TABLE, EMOTION_KEYWORDS, ArabicTextCleaner
+
+
+def legacy_detect_emotion_keywords(lexicon):
+    """التنفيذ القديم لـ detect_emotion_keywords كمرجع للمقارنة"""
+    def detect(text):
+        text_lower = text.lower()
+        detected_emotions = []
+        for emotion, keywords in lexicon.items():
+            for keyword in keywords:
+                if keyword in text_lower:
+                    detected_emotions.append(emotion)
+                    break
+        return detected_emotions if detected_emotions else ['neutral']
+    return detect
+
+
+def legacy_detect_egyptian_emotion_keywords(expressions):
+    """التنفيذ القديم لـ detect_egyptian_emotion_keywords كمرجع للمقارنة"""
+    def detect(text):
+        text_lower = text.lower()
+        detected = {}
+        for emotion, keywords in expressions.items():
+            count = sum(1 for keyword in keywords if keyword in text_lower)
+            if count > 0:
+                detected[emotion] = count
+        return detected
+    return detect
+
+
+def matcher_detect_emotion_keywords(lexicon):
+    """نفس منطق ArabicTextCleaner.detect_emotion_keywords على مطابق مستقل"""
+    matcher = KeywordMatcher(ARABIC_NORMALIZE_TABLE)
+    matcher.add_lexicon('emotion', lexicon)
+    matcher.build()
+
+    def detect(text):
+        hits = matcher.find(text, 'emotion')
+        detected_emotions = [emotion for emotion in lexicon if ('emotion', emotion) in hits]
+        return detected_emotions if detected_emotions else ['neutral']
+    return detect
+
+
+def scaled_lexicon(size):
+    """قاموس المشاعر الحالي مع كلمات إضافية موزعة على الحالات"""
+    lexicon = {emotion: list(keywords) for emotion, keywords in EMOTION_KEYWORDS.items()}
+    emotions = list(lexicon)
+    for index, word in enumerate(synthetic_keywords(size)):
+        lexicon[emotions[index % len(emotions)]].append(word)
+    return lexicon
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyword matcher micro-benchmark")
+    parser.add_argument("--sizes", default="0,1000,5000", help="عدد الكلمات الإضافية")
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20, help="عدد القياسات لكل حالة")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.messages)
+    print(f"{'keywords':>9} | {'legacy':>10} | {'matcher':>10}  (µs/msg)")
+    for size in map(int, args.sizes.split(',')):
+        lexicon = scaled_lexicon(size)
+        row = best_of([legacy_detect_emotion_keywords(lexicon), matcher_detect_emotion_keywords(lexicon)],
+                      corpus, args.repeat)
+        total = sum(len(keywords) for keywords in lexicon.values())
+        print(f"{total:>9,} | {row[0]:>10.2f} | {row[1]:>10.2f}")
+
+    # الدوال الفعلية بالمطابق المشترك (مجمع مسبقاً)
+    get_shared_matcher().build()
+    cleaner = ArabicTextCleaner()
+    dialect = load_dialect_dictionary()
+    print()
+    for name, legacy, current in [
+        ("detect_emotion_keywords", legacy_detect_emotion_keywords(EMOTION_KEYWORDS),
+         cleaner.detect_emotion_keywords),
+        ("detect_egyptian_emotion_keywords", legacy_detect_egyptian_emotion_keywords(dialect.EGYPTIAN_EMOTION_EXPRESSIONS),
+         dialect.detect_egyptian_emotion_keywords),
+    ]:
+        legacy_us, current_us = best_of([legacy, current], corpus, args.repeat)
+        print(f"{name:>33}: legacy {legacy_us:6.2f} | current {current_us:6.2f} µs/msg")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Benchmark لفهرس الرسائل المتشابهة (MinHash/LSH)
+تُفهرس رسائل قصيرة، ثم يُبحث عن:
+    - اختلافات إملائية لرسائل مفهرسة (يجب أن تطابق رسالتها الأصلية)
+    - رسائل غير مفهرسة (يجب ألا تطابق شيئاً)
+
+ويقارن مع البحث الخطي (Jaccard مع كل الرسائل المخزنة) في:
+    - precision / recall مقابل الرسالة الأصلية
+    - recall الـ LSH مقابل البحث الخطي (ما يفوته تقسيم الـ bands)
+    - precision بعد فحص الكلمات (is_spelling_variant) كما في NearDuplicateCache
+    - زمن البحث لكل رسالة ومتوسط عدد المرشحين
+
+الاستخدام:
+    python -m benchmarks.bench_minhash --sizes 1000,10000 --queries 2000
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.corpus import generate_corpus
+from utils.minhash_index import MinHashIndex, shingles
+from utils.response_cache import is_spelling_variant, near_duplicate_tag, normalize_message
+
+# تبديلات إملائية شائعة في الكتابة المصرية (بعد التطبيع)
+SWAPS = [('ق', 'ا'), ('ا', 'ق'), ('ذ', 'ز'), ('ث', 'س'), ('ظ', 'ض'), ('و', 'ي')]
+
+
+def spelling_variant(text, rng):
+    """اختلاف إملائي بسيط: تأنيث/حذف هاء آخر كلمة، تبديل حرف، أو مد حرف"""
+    words = text.split()
+    index = rng.randrange(len(words))
+    word = words[index]
+    edit = rng.randrange(3)
+    if edit == 0:
+        word = word[:-1] if word.endswith('ه') and len(word) > 2 else word + 'ه'
+    elif edit == 1:
+        options = [(i, new) for i, char in enumerate(word) for old, new in SWAPS if char == old]
+        if options:
+            i, new = rng.choice(options)
+            word = word[:i] + new + word[i + 1:]
+        else:
+            word += 'ه'
+    else:
+        i = rng.randrange(len(word))
+        word = word[:i + 1] + word[i] + word[i + 1:]
+    words[index] = word
+    return ' '.join(words)
+
+
+def build_messages(count, seed=42):
+    """رسائل قصيرة مختلفة بعد التطبيع"""
+    seen = {}
+    size = count
+    while len(seen) < count:
+        for text in generate_corpus(size * 2, seed=seed, min_words=2, max_words=6):
+            normalized = normalize_message(text)
+            if normalized and len(normalized) <= 200:
+                seen.setdefault(normalized, None)
+        seed += 1
+    return list(seen)[:count]
+
+
+def linear_search(entries, text, threshold, ngram):
+    grams = shingles(text, ngram)
+    tag = near_duplicate_tag(text)
+    found = []
+    for message_id, entry_grams, entry_tag in entries:
+        if entry_tag != tag:
+            continue
+        similarity = len(grams & entry_grams) / len(grams | entry_grams)
+        if similarity >= threshold:
+            found.append((similarity, message_id))
+    return sorted(found, reverse=True)
+
+
+def run(size, queries, threshold, seed=42):
+    """
+    Returns:
+        dict: {'size', 'raw_precision', 'precision', 'recall', 'lsh_recall', 'lsh_us', 'linear_us',
+               'avg_candidates'}
+    """
+    rng = random.Random(seed)
+    messages = build_messages(size + queries // 2, seed=seed)
+    indexed, unindexed = messages[:size], messages[size:]
+
+    index = MinHashIndex(threshold=threshold, max_entries=size)
+    for message_id, text in enumerate(indexed):
+        index.add(text, message_id, tag=near_duplicate_tag(text))
+    entries = [(message_id, frozenset(shingles(text, index.ngram)), near_duplicate_tag(text))
+               for message_id, text in enumerate(indexed)]
+
+    workload = [(spelling_variant(indexed[i], rng), i) for i in rng.sample(range(size), queries // 2)]
+    workload += [(text, None) for text in unindexed]
+    rng.shuffle(workload)
+
+    raw_matched = raw_correct = matched = correct = linear_found = agreed = 0
+    lsh_seconds = linear_seconds = 0.0
+    for text, expected in workload:
+        started = time.perf_counter()
+        raw = index.query(text, tag=near_duplicate_tag(text))
+        found = [(similarity, i) for similarity, i in raw if is_spelling_variant(text, indexed[i])]
+        lsh_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        linear = linear_search(entries, text, threshold, index.ngram)
+        linear_seconds += time.perf_counter() - started
+
+        if raw:
+            raw_matched += 1
+            raw_correct += raw[0][1] == expected
+        if found:
+            matched += 1
+            correct += found[0][1] == expected
+        if linear:
+            linear_found += 1
+            agreed += bool(raw) and raw[0][0] == linear[0][0]
+
+    positives = sum(1 for _, expected in workload if expected is not None)
+    return {
+        'size': size,
+        'raw_precision': raw_correct / raw_matched if raw_matched else 0.0,
+        'precision': correct / matched if matched else 0.0,
+        'recall': correct / positives if positives else 0.0,
+        'lsh_recall': agreed / linear_found if linear_found else 1.0,
+        'lsh_us': lsh_seconds / len(workload) * 1e6,
+        'linear_us': linear_seconds / len(workload) * 1e6,
+        'avg_candidates': index.stats()['avg_candidates'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MinHash/LSH near-duplicate benchmark")
+    parser.add_argument("--sizes", default="1000,10000", help="عدد الرسائل المفهرسة")
+    parser.add_argument("--queries", type=int, default=2000, help="نصفها اختلافات إملائية ونصفها رسائل جديدة")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'indexed':>8} | {'raw precision':>13} | {'precision':>9} | {'recall':>6} | {'LSH recall':>10} | "
+          f"{'LSH µs':>8} | {'linear µs':>9} | {'candidates':>10}")
+    for size in map(int, args.sizes.split(',')):
+        result = run(size, args.queries, args.threshold, seed=args.seed)
+        print(f"{result['size']:>8,} | {result['raw_precision']:>13.3f} | {result['precision']:>9.3f} | "
+              f"{result['recall']:>6.3f} | "
+              f"{result['lsh_recall']:>10.3f} | {result['lsh_us']:>8.1f} | {result['linear_us']:>9.1f} | "
+              f"{result['avg_candidates']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
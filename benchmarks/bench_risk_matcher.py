@@ -0,0 +1,115 @@
+"""
+Micro-benchmark لمطابق الخطر المُجمَّع
+يقارن (مع زيادة عدد كلمات الأزمات، ثم مع زيادة عدد أنماط الخطر) بين:
+    - legacy: re.search لكل نمط ثم فحص كل كلمة في النص
+    - alternation: Regex واحد بمجموعة مسماة لكل كلمة (بدون Trie)
+    - combined: RiskMatcher (Regex واحد والكلمات على شكل Trie)
+    - prefiltered: نفس RiskMatcher مع فلتر الـ N-grams على النص الخام قبل الـ Regex
+وبعدها detect_risk بالقاموس الحالي: التنفيذ القديم، ثم المطابق بدون الفلتر ومعه
+
+الاستخدام:
+    python -m benchmarks.bench_risk_matcher --sizes 0,100,1000,10000 --patterns 0,10,100,1000
+"""
+
+import argparse
+import random
+import re
+
+from benchmarks.bench_text_cleaner import best_of
+from benchmarks.corpus import generate_corpus
+from utils.risk_detector import CRISIS_KEYWORDS, HIGH_RISK_PATTERNS, RiskDetector
+from utils.risk_matcher import RiskMatcher
+from utils.text_cleaner import ARABIC_NORMALIZE_TABLE
+
+ARABIC_LETTERS = 'ابتثجحخدذرزسشصضطظعغفقكلمنهوي'
+
+
+def synthetic_keywords(count, seed=7):
+    """كلمات عشوائية إضافية لتكبير القاموس"""
+    rng = random.Random(seed)
+    return [''.join(rng.choice(ARABIC_LETTERS) for _ in range(rng.randint(4, 9)))
+            for _ in range(count)]
+
+
+def synthetic_patterns(count, seed=11):
+    """أنماط إضافية بنفس شكل HIGH_RISK_PATTERNS (فعل ثم بدائل كلمات)"""
+    words = synthetic_keywords(count * 3, seed)
+    return [f"(عايز|عاوز|بفكر) ({'|'.join(words[i * 3:i * 3 + 3])})" for i in range(count)]
+
+
+def legacy_scanner(patterns, keywords):
+    def scan(text):
+        text = text.lower()
+        for pattern in patterns:
+            if re.search(pattern, text):
+                return True
+        return [word for word in keywords if word in text]
+    return scan
+
+
+def alternation_scanner(patterns, keywords):
+    groups = [f'(?P<p{i}>{p})' for i, p in enumerate(patterns)]
+    groups += [f'(?P<k{i}>{re.escape(k)})' for i, k in enumerate(keywords)]
+    regex = re.compile('(?=(?:' + '|'.join(groups) + '))')
+    return lambda text: [m.lastgroup for m in regex.finditer(text.lower())]
+
+
+def combined_scanner(patterns, keywords, prefilter=False):
+    matcher = RiskMatcher([(p, 'high') for p in patterns],
+                          [(k, 'medium') for k in keywords],
+                          ARABIC_NORMALIZE_TABLE, prefilter=prefilter)
+    return matcher.scan
+
+
+def prefiltered_scanner(patterns, keywords):
+    return combined_scanner(patterns, keywords, prefilter=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Risk matcher micro-benchmark")
+    parser.add_argument("--sizes", default="0,100,1000,10000", help="عدد الكلمات الإضافية")
+    parser.add_argument("--patterns", default="0,10,100,1000", help="عدد الأنماط الإضافية")
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5, help="عدد القياسات لكل حالة")
+    parser.add_argument("--alternation-limit", type=int, default=100,
+                        help="أقصى عدد كلمات أو أنماط إضافية لقياس alternation (زمنه يتضاعف مع الحجم)")
+    parser.add_argument("--legacy-pattern-limit", type=int, default=100,
+                        help="أقصى عدد أنماط إضافية لقياس legacy (re.search يعيد تجميعها بعد امتلاء ذاكرة re)")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.messages)
+    cases = [(HIGH_RISK_PATTERNS, CRISIS_KEYWORDS + synthetic_keywords(size), size)
+             for size in map(int, args.sizes.split(','))]
+    cases += [(HIGH_RISK_PATTERNS + synthetic_patterns(size), CRISIS_KEYWORDS, size)
+              for size in map(int, args.patterns.split(',')) if size]
+    print(f"{'patterns':>8} | {'keywords':>9} | {'legacy':>10} | {'alternation':>11} | {'combined':>10} | {'prefiltered':>11}  (µs/msg)")
+    for patterns, keywords, size in cases:
+        builds = [combined_scanner, prefiltered_scanner]
+        if size <= args.alternation_limit:
+            builds.insert(0, alternation_scanner)
+        if len(patterns) - len(HIGH_RISK_PATTERNS) <= args.legacy_pattern_limit:
+            builds.insert(0, legacy_scanner)
+        times = best_of([build(patterns, keywords) for build in builds], corpus, args.repeat)
+        row = [f"{times.pop(0):.2f}" if build in builds else '-'
+               for build in (legacy_scanner, alternation_scanner, combined_scanner, prefiltered_scanner)]
+        print(f"{len(patterns):>8,} | {len(keywords):>9,} | {row[0]:>10} | {row[1]:>11} | {row[2]:>10} | {row[3]:>11}")
+
+    # القاموس الحالي كما يستخدمه RiskDetector (مع الكلمات اليومية لاختيار الـ N-grams)
+    detector = RiskDetector()
+    matcher = detector.matcher
+    unfiltered = RiskMatcher([(p, 'high') for p in HIGH_RISK_PATTERNS],
+                             [(k, 'medium') for k in CRISIS_KEYWORDS],
+                             ARABIC_NORMALIZE_TABLE, prefilter=False)
+    candidates = sum(map(matcher.prefilter.might_match, corpus)) / len(corpus)
+    legacy_us, unfiltered_us, prefiltered_us, reject_us = best_of(
+        [legacy_scanner(HIGH_RISK_PATTERNS, CRISIS_KEYWORDS), unfiltered.scan, matcher.scan,
+         matcher.prefilter.might_match],
+        corpus, args.repeat * 4
+    )
+    print(f"\nreal lexicon ({len(matcher):,} entries, {candidates:.1%} candidates): "
+          f"legacy {legacy_us:.2f} | combined {unfiltered_us:.2f} | prefiltered {prefiltered_us:.2f} "
+          f"(reject stage {reject_us:.2f}) µs/msg")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Micro-benchmark لـ ArabicTextCleaner.clean_text
+يقارن المحرك المدمج (translate + Regex واحد) بالتنفيذ القديم متعدد المراحل
+
+الاستخدام:
+    python -m benchmarks.bench_text_cleaner --size 100000
+"""
+
+import argparse
+import re
+import time
+
+try:
+    # التنفيذ القديم فقط يحتاج emoji (اعتمادية اختبارات وليست من اعتماديات التطبيق)
+    import emoji
+except ImportError:
+    emoji = None
+
+from benchmarks.corpus import generate_corpus
+from utils.text_cleaner import ArabicTextCleaner
+
+
+def legacy_clean_text(text):
+    """التنفيذ القديم (تسع مراحل منفصلة) كمرجع للمقارنة"""
+    text = text.strip()
+    text = emoji.replace_emoji(text, replace='')
+    text = re.sub(r'\d+', '', text)
+    text = re.sub(r'[^\w\s\u0600-\u06FF.,!?؛،]', '', text)
+    text = re.sub('[إأآا]', 'ا', text)
+    text = re.sub('ى', 'ي', text)
+    text = re.sub('ة', 'ه', text)
+    text = re.sub(r'[\u064B-\u065F]', '', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def measure(func, corpus):
+    """قياس الإنتاجية (رسالة/ثانية) والزمن لكل رسالة (ميكروثانية)"""
+    start = time.perf_counter()
+    for text in corpus:
+        func(text)
+    elapsed = time.perf_counter() - start
+    return len(corpus) / elapsed, elapsed / len(corpus) * 1e6
+
+
+def best_of(funcs, corpus, repeat):
+    """
+    أفضل زمن لكل رسالة لكل دالة من عدة قياسات متبادلة
+    (التبادل يجعل تذبذب الجهاز يؤثر على كل الدوال بنفس القدر)
+    """
+    best = [float('inf')] * len(funcs)
+    for _ in range(repeat):
+        for index, func in enumerate(funcs):
+            best[index] = min(best[index], measure(func, corpus)[1])
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="clean_text micro-benchmark")
+    parser.add_argument("--size", type=int, default=100_000, help="عدد الرسائل")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.size, seed=args.seed)
+    cleaner = ArabicTextCleaner()
+
+    targets = [("fused", cleaner.clean_text)]
+    if emoji is None:
+        print(f"Corpus: {len(corpus):,} messages | emoji not installed, skipping legacy comparison")
+    else:
+        mismatches = sum(1 for t in corpus if cleaner.clean_text(t) != legacy_clean_text(t))
+        print(f"Corpus: {len(corpus):,} messages | mismatches vs legacy: {mismatches}")
+        targets.insert(0, ("legacy", legacy_clean_text))
+
+    for name, func in targets:
+        throughput, per_message = measure(func, corpus)
+        print(f"{name:>8}: {throughput:>12,.0f} msg/s | {per_message:8.2f} µs/msg")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+مولد Corpus صناعي باللهجة المصرية لقياس الأداء
+يخلط كلمات المشاعر والعبارات اليومية مع إيموجي وأرقام وتشكيل ورموز
+"""
+
+import csv
+import random
+from pathlib import Path
+
+DATASET_FILE = Path(__file__).resolve().parent.parent / "docs" / "data" / "dataset.csv"
+
+# مفردات إضافية تغطي الهمزات والتاء المربوطة والتشكيل
+EXTRA_WORDS = [
+    'أنا', 'إنت', 'آخر', 'النهارده', 'الامتحانات', 'حاجة', 'كدة', 'مستشفى',
+    'عَايِز', 'مُتعَب', 'جداً', 'صباح', 'الفل', 'ازيك', 'دلوقتي', 'برضه',
+    'قلقان', 'خايف من المستقبل', 'مش قادر', 'مبسوط', 'عادي', 'ok', 'stress',
+]
+EMOJIS = ['😢', '😊', '😰', '❤️', '👍🏽', '🙏', '💔', '😫', 'ℹ', '1️⃣', '🇪🇬']
+NOISE = ['123', '٣٤٥', '!!', '؟', '...', '،', '#', '@', '*', '&', '‍', '\t', '\n']
+
+
+def load_dataset_texts(path=DATASET_FILE):
+    """تحميل نصوص dataset.csv"""
+    with open(path, encoding='utf-8') as f:
+        return [row['text'] for row in csv.DictReader(f)]
+
+
+def generate_corpus(size, seed=42, min_words=3, max_words=25):
+    """
+    توليد قائمة رسائل صناعية بحجم محدد
+
+    Args:
+        size: عدد الرسائل
+        seed: بذرة العشوائية لنتائج قابلة للتكرار
+        min_words, max_words: حدود طول الرسالة بالكلمات
+
+    Returns:
+        list: قائمة الرسائل
+    """
+    rng = random.Random(seed)
+    vocabulary = [w for text in load_dataset_texts() for w in text.split()] + EXTRA_WORDS
+    messages = []
+    for _ in range(size):
+        tokens = []
+        for _ in range(rng.randint(min_words, max_words)):
+            roll = rng.random()
+            if roll < 0.08:
+                tokens.append(rng.choice(EMOJIS))
+            elif roll < 0.14:
+                tokens.append(rng.choice(NOISE))
+            else:
+                tokens.append(rng.choice(vocabulary))
+        messages.append(' '.join(tokens))
+    return messages
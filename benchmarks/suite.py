@@ -0,0 +1,207 @@
+"""
+مجموعة قياسات أداء مسار التحليل
+تقيس clean_text و detect_emotion_keywords و detect_emotion و detect_risk
+و normalize_egyptian_text على dataset.csv وعلى Corpus صناعي بأحجام من 1
+إلى مليون رسالة، وتحفظ الإنتاجية و p50/p95/p99 كـ JSON للمقارنة بين
+التشغيلات، وتنتهي بكود خطأ إذا تجاوز التراجع الحد المسموح
+
+الاستخدام:
+    python -m benchmarks.suite --sizes 1,1000,100000 --output results.json
+    python -m benchmarks.suite --baseline results.json --threshold 0.2
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.corpus import generate_corpus, load_dataset_texts
+
+DEFAULT_SIZES = (1, 1000, 10000)
+# أقل عدد قياسات لكل حالة (الأحجام الصغيرة تُكرر حتى تستقر النسب المئوية)
+MIN_SAMPLES = 1000
+# عدد الرسائل الأولى المستخدمة للتسخين قبل القياس
+WARMUP_MESSAGES = 100
+
+
+def build_targets():
+    """الدوال المقاسة (كل دالة تستقبل رسالة واحدة)"""
+    from build_lexicons import load_dialect_dictionary
+    from emotion_model import EmotionDetector
+    from utils.risk_detector import RiskDetector
+
+    dialect = load_dialect_dictionary()
+    detector = EmotionDetector()
+    return {
+        'clean_text': detector.text_cleaner.clean_text,
+        'detect_emotion_keywords': detector.text_cleaner.detect_emotion_keywords,
+        'detect_emotion': detector.detect_emotion,
+        'detect_risk': RiskDetector().detect_risk,
+        'normalize_egyptian_text': dialect.normalize_egyptian_text,
+    }
+
+
+def measure(func, corpus):
+    """
+    قياس زمن كل رسالة على حدة
+
+    Returns:
+        dict: {'samples', 'throughput', 'mean_us', 'p50_us', 'p95_us', 'p99_us'}
+    """
+    for text in corpus[:WARMUP_MESSAGES]:
+        func(text)
+
+    samples = max(len(corpus), MIN_SAMPLES)
+    latencies = np.empty(samples, dtype=np.int64)
+    clock = time.perf_counter_ns
+    for i in range(samples):
+        text = corpus[i % len(corpus)]
+        start = clock()
+        func(text)
+        latencies[i] = clock() - start
+
+    total_seconds = latencies.sum() / 1e9
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) / 1000
+    return {
+        'samples': samples,
+        'throughput': round(samples / total_seconds, 1) if total_seconds else float('inf'),
+        'mean_us': round(latencies.mean() / 1000, 3),
+        'p50_us': round(float(p50), 3),
+        'p95_us': round(float(p95), 3),
+        'p99_us': round(float(p99), 3),
+    }
+
+
+def run_suite(sizes=DEFAULT_SIZES, seed=42, targets=None, names=None, use_cache=False):
+    """
+    تشغيل كل القياسات
+
+    Args:
+        use_cache: القياس مع الـ Cache المشترك (الافتراضي بدونه لقياس زمن
+            التحليل الفعلي لا زمن البحث في الـ Cache)
+
+    Returns:
+        dict: {'meta': بيانات التشغيل, 'results': [نتيجة لكل (دالة، corpus، حجم)]}
+    """
+    from utils.analysis_cache import get_analysis_cache
+
+    targets = targets or build_targets()
+    if names:
+        targets = {name: targets[name] for name in names}
+
+    corpora = [('dataset', load_dataset_texts())]
+    corpora += [('synthetic', generate_corpus(size, seed=seed)) for size in sizes]
+
+    cache = get_analysis_cache()
+    cache_enabled = cache.enabled
+    cache.enabled = use_cache and cache_enabled
+    results = []
+    try:
+        for corpus_name, corpus in corpora:
+            for name, func in targets.items():
+                entry = {'target': name, 'corpus': corpus_name, 'size': len(corpus)}
+                entry.update(measure(func, corpus))
+                results.append(entry)
+    finally:
+        cache.enabled = cache_enabled
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'sizes': list(sizes),
+            'use_cache': use_cache,
+        },
+        'results': results,
+    }
+
+
+def _key(entry):
+    return entry['target'], entry['corpus'], entry['size']
+
+
+def compare(current, baseline, threshold=0.2):
+    """
+    مقارنة النتائج بتشغيل سابق
+
+    Args:
+        threshold: أقصى نسبة تراجع مسموحة في الإنتاجية أو p95
+
+    Returns:
+        list: التراجعات [{'target', 'corpus', 'size', 'metric', 'baseline', 'current', 'change'}]
+    """
+    previous = {_key(entry): entry for entry in baseline['results']}
+    regressions = []
+    for entry in current['results']:
+        old = previous.get(_key(entry))
+        if old is None:
+            continue
+        checks = [
+            ('throughput', old['throughput'] * (1 - threshold) > entry['throughput']),
+            ('p95_us', entry['p95_us'] > old['p95_us'] * (1 + threshold)),
+        ]
+        for metric, regressed in checks:
+            if regressed:
+                regressions.append({
+                    'target': entry['target'],
+                    'corpus': entry['corpus'],
+                    'size': entry['size'],
+                    'metric': metric,
+                    'baseline': old[metric],
+                    'current': entry[metric],
+                    'change': round(entry[metric] / old[metric] - 1, 3) if old[metric] else None,
+                })
+    return regressions
+
+
+def print_report(report):
+    print(f"{'target':<24} {'corpus':<10} {'size':>8} {'msg/s':>12} "
+          f"{'p50 µs':>9} {'p95 µs':>9} {'p99 µs':>9}")
+    for r in report['results']:
+        print(f"{r['target']:<24} {r['corpus']:<10} {r['size']:>8,} {r['throughput']:>12,.0f} "
+              f"{r['p50_us']:>9.2f} {r['p95_us']:>9.2f} {r['p99_us']:>9.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analysis benchmark suite")
+    parser.add_argument("--sizes", default=','.join(map(str, DEFAULT_SIZES)),
+                        help="أحجام الـ Corpus الصناعي مفصولة بفواصل (1 إلى 1000000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--targets", help="أسماء الدوال المقاسة مفصولة بفواصل (الافتراضي كلها)")
+    parser.add_argument("--with-cache", action="store_true", help="قياس detect_emotion مع الـ Cache")
+    parser.add_argument("--output", help="حفظ النتائج كـ JSON")
+    parser.add_argument("--baseline", help="ملف JSON لتشغيل سابق للمقارنة")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="أقصى تراجع مسموح (0.2 = 20%%) قبل فشل التشغيل")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    names = args.targets.split(',') if args.targets else None
+    report = run_suite(sizes, args.seed, names=names, use_cache=args.with_cache)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for r in regressions:
+            print(f"❌ {r['target']} [{r['corpus']} × {r['size']:,}] {r['metric']}: "
+                  f"{r['baseline']} → {r['current']} ({r['change']:+.0%})")
+        if regressions:
+            return 1
+        print(f"✅ لا يوجد تراجع أكبر من {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
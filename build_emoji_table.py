@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+توليد جدول نطاقات الإيموجي (utils/emoji_table.py) من ملف Unicode emoji-test.txt
+يُشغَّل عند تحديث docs/data/emoji-test.txt بإصدار أحدث من Unicode
+"""
+
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+SOURCE_FILE = BASE_DIR / "docs" / "data" / "emoji-test.txt"
+OUTPUT_FILE = BASE_DIR / "utils" / "emoji_table.py"
+
+VARIATION_SELECTOR = 0xFE0F
+KEYCAP = 0x20E3
+
+
+def parse_sequences(path=SOURCE_FILE):
+    """قراءة تسلسلات الإيموجي كقوائم Code Points"""
+    sequences = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            codepoints = line.split(';', 1)[0].split()
+            sequences.append([int(cp, 16) for cp in codepoints])
+    return sequences
+
+
+def to_ranges(codepoints):
+    """دمج الـ Code Points المتتالية في نطاقات (بداية، نهاية)"""
+    ranges = []
+    for cp in sorted(codepoints):
+        if ranges and cp == ranges[-1][1] + 1:
+            ranges[-1][1] = cp
+        else:
+            ranges.append([cp, cp])
+    return [tuple(r) for r in ranges]
+
+
+def build_table(sequences):
+    """
+    استخراج الجداول المطلوبة للـ Stripper:
+    - الإيموجي المستقلة (حرف واحد بعد حذف محدد الشكل FE0F)
+    - أساسات الـ Keycap (مثل 1️⃣) وهل يُشترط FE0F قبل 20E3
+    """
+    singles = set()
+    keycap_bases = set()
+    keycap_vs_optional = False
+    for seq in sequences:
+        if seq[-1] == KEYCAP:
+            keycap_bases.add(seq[0])
+            keycap_vs_optional |= VARIATION_SELECTOR not in seq
+            continue
+        core = [cp for cp in seq if cp != VARIATION_SELECTOR]
+        if len(core) == 1:
+            singles.add(core[0])
+    return to_ranges(singles), ''.join(sorted(map(chr, keycap_bases))), keycap_vs_optional
+
+
+def render(ranges, keycap_bases, keycap_vs_optional):
+    """كتابة الجدول كوحدة Python"""
+    rows = '\n'.join(f'    (0x{start:05X}, 0x{end:05X}),' for start, end in ranges)
+    return f'''"""
+جدول نطاقات الإيموجي (ملف مُولَّد - لا تعدله يدوياً)
+المصدر: docs/data/emoji-test.txt
+للتحديث: python build_emoji_table.py
+"""
+
+# نطاقات الإيموجي المستقلة (بداية، نهاية) شاملة
+EMOJI_RANGES = (
+{rows}
+)
+
+# أساسات تسلسلات الـ Keycap (مثل 1️⃣)
+KEYCAP_BASES = {keycap_bases!r}
+KEYCAP_VARIATION_OPTIONAL = {keycap_vs_optional!r}
+'''
+
+
+def main():
+    """توليد utils/emoji_table.py"""
+    sequences = parse_sequences()
+    ranges, keycap_bases, keycap_vs_optional = build_table(sequences)
+    OUTPUT_FILE.write_text(render(ranges, keycap_bases, keycap_vs_optional), encoding='utf-8')
+    print(f"✅ {OUTPUT_FILE} | {len(sequences)} sequences | {len(ranges)} ranges")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+بناء ملف القواميس المجمعة (models/lexicons.json)
+يُشغَّل بعد أي تعديل في القواميس، ويشغله run.py تلقائياً قبل بدء التطبيق
+"""
+
+import importlib.util
+from pathlib import Path
+
+from utils import lexicon_store
+from utils import risk_detector, text_cleaner  # noqa: F401 (تسجيل القواميس)
+
+DICTIONARY_FILE = Path(__file__).resolve().parent / "docs" / "data" / "egyptian_dialect_dictionary.py"
+
+
+def load_dialect_dictionary():
+    """تحميل قاموس اللهجة المصرية (ملف مستقل خارج الحزم) لتسجيل قواميسه"""
+    spec = importlib.util.spec_from_file_location("egyptian_dialect_dictionary", DICTIONARY_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main():
+    """بناء الملف المجمع من كل قواميس المشروع"""
+    load_dialect_dictionary()
+    compiled = lexicon_store.save_artifact()
+    print(f"✅ {lexicon_store.ARTIFACT_PATH} | version {compiled['version']} | "
+          f"{len(compiled['matcher'])} keywords | {len(compiled['rewriters'])} dialect maps")
+
+
+if __name__ == "__main__":
+    main()
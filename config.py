@@ -52,6 +52,14 @@ class Config:
         "default_analysis_period": 30,  # أيام
         "min_entries_for_analysis": 5,
         "confidence_threshold": 0.7,
+        # تحويل المشاعر إلى نقاط رقمية للتحليل
+        "mood_scores": {
+            'happiness': 5,
+            'neutral': 3,
+            'anxiety': 2,
+            'stress': 2,
+            'depression': 1
+        },
         "chart_colors": {
             'happiness': '#2E8B57',
             'neutral': '#4682B4',
@@ -99,6 +107,14 @@ class Config:
         }
     }
     
+    # تراكم الخطر عبر رسائل المحادثة
+    RISK_SETTINGS = {
+        "decay": 0.7,  # معامل تناقص النقاط مع كل رسالة جديدة
+        "window": 5,  # عدد الرسائل الأخيرة التي تُعد فيها المؤشرات
+        "medium_hits_for_high": 2,  # رسائل مقلقة في النافذة ترفع الخطر إلى عالٍ
+        "elevated_score": 1.5  # نقاط متراكمة ترفع الرسالة الخالية إلى متوسط
+    }
+    
     # إعدادات التطوير
     DEBUG = os.getenv("DEBUG", "False").lower() == "true"
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -108,7 +124,43 @@ class Config:
         "cache_enabled": True,
         "max_cache_size": 100,  # MB
         "session_timeout": 3600,  # ثانية (ساعة واحدة)
-        "max_file_size": 10  # MB للتحميلات
+        "max_file_size": 10,  # MB للتحميلات
+        "model_reload_ttl": 3600,  # ثانية قبل تحديث النماذج في الخلفية
+        # الرسائل الطويلة تُحلل جملة بجملة بحد أقصى للجمل وطول كل جملة
+        "stream_min_chars": 280,
+        "stream_max_sentences": 20,
+        "stream_max_sentence_chars": 400,
+        # تجميع طلبات النموذج المتزامنة من كل الجلسات (الحجم الأقصى = BATCH_SIZE في models/config.txt)
+        "batch_max_wait_ms": 5,
+        # أقصى انتظار لنتيجة الدفعة قبل التحليل المباشر بدون تجميع
+        "batch_timeout_s": 10,
+        # طلبات Gemini المتزامنة (في الخلفية، بالتوازي مع كشف الخطر)
+        "reply_workers": 8,
+        # جلسات Gemini: عدد الأدوار المحفوظة في كل جلسة وأقصى عدد جلسات في الذاكرة
+        "chat_history_turns": 3,
+        "max_chat_sessions": 500,
+        # مهلة طلب Gemini وإعادة المحاولة (انتظار عشوائي بين 0 و min(الحد، الأساس × 2^المحاولة))
+        "reply_deadline_s": 20,
+        "reply_retries": 2,
+        "retry_base_delay_s": 0.5,
+        "retry_max_delay_s": 4,
+        # Circuit Breaker: فشل متتالٍ يفتحه، وثوانٍ قبل الطلب التجريبي
+        "breaker_failures": 5,
+        "breaker_reset_s": 30,
+        # رد احتياطي فوري إذا تأخر أول جزء من رد Gemini (None للتعطيل)، بمهلة أقصر
+        # للرسائل ذات الخطر المتوسط؛ والرد المتأخر "replace" يحل محله أو "follow" يظهر بعده
+        "hedge_deadline_s": 6,
+        "hedge_deadline_risk_s": 2,
+        "hedge_mode": "replace",
+        # Cache الردود للرسائل المتكررة: عدد الرسائل، الصلاحية (ثانية)، الردود المختلفة
+        # لكل رسالة قبل الرد من الـ Cache، وأقصى طول للرسالة المخزنة
+        "response_cache_entries": 500,
+        "response_cache_ttl": 3600,
+        "response_cache_variants": 3,
+        "response_cache_max_chars": 200,
+        # الرسائل المتشابهة إملائياً (MinHash/LSH): أقل تشابه وأقصى عدد رسائل في الفهرس
+        "near_duplicate_threshold": 0.5,
+        "near_duplicate_entries": 2000
     }
     
     @classmethod
@@ -3,6 +3,17 @@
 Egyptian Dialect Dictionary - Common Words and Expressions
 """
 
+import sys
+from pathlib import Path
+
+# إتاحة حزمة utils عند تشغيل الملف مباشرة
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from utils.lexicon_store import (get_rewriter, get_shared_matcher,
+                                 register_dialect_map, register_lexicon)
+
 # تحويل من العامية المصرية للفصحى
 EGYPTIAN_TO_ARABIC = {
     # الضمائر
@@ -102,6 +113,8 @@ EGYPTIAN_TO_ARABIC = {
     'مش فاهم': 'لا أفهم',
 }
 
+register_dialect_map('egyptian_to_arabic', EGYPTIAN_TO_ARABIC)
+
 # تعبيرات مصرية خاصة بالمشاعر
 EGYPTIAN_EMOTION_EXPRESSIONS = {
     'قلق/توتر': [
@@ -137,6 +150,8 @@ EGYPTIAN_EMOTION_EXPRESSIONS = {
     ]
 }
 
+register_lexicon('egyptian_emotion', EGYPTIAN_EMOTION_EXPRESSIONS)
+
 # كلمات تقوية (Intensifiers)
 EGYPTIAN_INTENSIFIERS = {
     'قوي': 'strong',
@@ -201,13 +216,8 @@ def normalize_egyptian_text(text):
     Returns:
         str: النص المُحوَّل
     """
-    text_lower = text.lower()
-    
-    # استبدال الكلمات المصرية بالفصحى
-    for egyptian, formal in EGYPTIAN_TO_ARABIC.items():
-        text_lower = text_lower.replace(egyptian, formal)
-    
-    return text_lower
+    # استبدال الكلمات والعبارات المصرية بالفصحى (أطول تطابق، كلمات كاملة فقط)
+    return get_rewriter('egyptian_to_arabic').rewrite(text.lower())
 
 def detect_egyptian_emotion_keywords(text):
     """
@@ -219,11 +229,11 @@ def detect_egyptian_emotion_keywords(text):
     Returns:
         dict: قاموس بالمشاعر المكتشفة وعددها
     """
-    text_lower = text.lower()
+    hits = get_shared_matcher().find(text, 'egyptian_emotion')
     detected = {}
     
-    for emotion, keywords in EGYPTIAN_EMOTION_EXPRESSIONS.items():
-        count = sum(1 for keyword in keywords if keyword in text_lower)
+    for emotion in EGYPTIAN_EMOTION_EXPRESSIONS:
+        count = len(hits.get(('egyptian_emotion', emotion), []))
         if count > 0:
             detected[emotion] = count
     
@@ -6,9 +6,114 @@
 # import torch
 # from transformers import AutoTokenizer, AutoModelForSequenceClassification
 # from transformers import pipeline
-# import numpy as np
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from config import Config
+from utils.analysis_cache import get_analysis_cache
+from utils.lexicon_store import get_shared_matcher
+from utils.micro_batcher import get_micro_batcher
+from utils.streaming_analyzer import StreamingAnalyzer
+from utils.emotion_backends import ONNX_MODEL_DIR, LinearBackend, OnnxSentimentBackend
 from utils.text_cleaner import ArabicTextCleaner
 
+# المصنف الخطي المحلي (يُنشأ بـ: python train_classifier.py train)
+LINEAR_MODEL_PATH = Path(__file__).resolve().parent / "models" / "emotion_linear.npz"
+
+# قاموس تحويل مخرجات النموذج للمشاعر
+EMOTION_MAPPING = {
+    'positive': 'happiness',
+    'negative': 'depression',
+    'neutral': 'neutral',
+    'POSITIVE': 'happiness',
+    'NEGATIVE': 'depression',
+    'NEUTRAL': 'neutral'
+}
+
+# أوزان المشاعر حسب الكلمات المفتاحية
+EMOTION_SCORES = {
+    'anxiety': 0,
+    'depression': 0,
+    'stress': 0,
+    'happiness': 0,
+    'neutral': 0
+}
+
+# ترتيب أعمدة المشاعر في المصفوفات (نفس ترتيب الأولوية عند التعادل)
+EMOTION_LABELS = tuple(EMOTION_SCORES)
+
+# وصف عربي لكل حالة
+EMOTION_DESCRIPTIONS = {
+    'anxiety': 'حالة قلق وتوتر',
+    'depression': 'حالة حزن واكتئاب',
+    'stress': 'حالة ضغط نفسي',
+    'happiness': 'حالة سعادة وراحة',
+    'neutral': 'حالة طبيعية'
+}
+
+# اسم مصدر التحليل لكل طريقة
+BACKEND_SOURCES = {
+    'model': 'MARBERT AI',
+    'keywords': 'Keyword Analysis'
+}
+
+class CascadeStats:
+    def __init__(self):
+        """
+        عدادات مراحل التحليل المتدرج: عدد المرات والوقت لكل مرحلة ونسبة التصعيد
+        (لضبط confidence_threshold مقابل وقت المعالج)
+        """
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """تصفير العدادات"""
+        with self._lock:
+            self._stages = {}
+            self.escalations = 0
+    
+    def record(self, stage, seconds, escalated=False):
+        """تسجيل تشغيل مرحلة واحدة"""
+        with self._lock:
+            calls, total = self._stages.get(stage, (0, 0.0))
+            self._stages[stage] = (calls + 1, total + seconds)
+            if escalated:
+                self.escalations += 1
+    
+    def stats(self):
+        """
+        Returns:
+            dict: {'stages': {المرحلة: {'calls', 'total_ms', 'avg_ms'}},
+                   'escalations', 'escalation_rate'}
+        """
+        with self._lock:
+            stages = {
+                stage: {
+                    'calls': calls,
+                    'total_ms': round(total * 1000, 2),
+                    'avg_ms': round(total * 1000 / calls, 3),
+                }
+                for stage, (calls, total) in self._stages.items()
+            }
+            first_stage = self._stages.get('keywords', (0, 0.0))[0]
+            return {
+                'stages': stages,
+                'escalations': self.escalations,
+                'escalation_rate': round(self.escalations / first_stage, 3) if first_stage else 0.0,
+            }
+
+
+_cascade_stats = CascadeStats()
+
+
+def get_cascade_stats():
+    """عدادات التحليل المتدرج المشتركة على مستوى العملية"""
+    return _cascade_stats
+
+
 class EmotionDetector:
     def __init__(self, model_name="CAMeL-Lab/bert-base-arabic-camelbert-msa-sentiment"):
         """
@@ -23,6 +128,20 @@ class EmotionDetector:
         print("Using keyword-based analysis")
         self.sentiment_pipeline = None
         
+        # طريقة التحليل الأثقل المتاحة محلياً (ONNX ثم المصنف الخطي) للنصوص الغامضة
+        self.backend = self._load_backend()
+        
+        # طلبات النموذج المتزامنة من كل الجلسات تُنفذ كدفعة واحدة مشتركة
+        self.batcher = None
+        if self.backend is not None and self.backend.batch_size > 1:
+            self.batcher = get_micro_batcher(
+                (self.backend.name, str(self.backend.model_path)),
+                self.backend.predict,
+                max_batch_size=self.backend.batch_size,
+                max_wait_ms=Config.PERFORMANCE_SETTINGS['batch_max_wait_ms'],
+                timeout=Config.PERFORMANCE_SETTINGS['batch_timeout_s']
+            )
+        
         # يمكن تفعيل النموذج لاحقاً إذا أردت
         # try:
         #     # تحميل النموذج والـ Tokenizer
@@ -47,29 +166,64 @@ class EmotionDetector:
         # تهيئة منظف النصوص
         self.text_cleaner = ArabicTextCleaner()
         
-        # قاموس تحويل المشاعر
-        self.emotion_mapping = {
-            'positive': 'happiness',
-            'negative': 'depression',
-            'neutral': 'neutral',
-            'POSITIVE': 'happiness',
-            'NEGATIVE': 'depression',
-            'NEUTRAL': 'neutral'
-        }
+        # قاموس تحويل المشاعر وأوزانها (مشتركة بين كل الكائنات)
+        self.emotion_mapping = EMOTION_MAPPING
+        self.emotion_scores = EMOTION_SCORES
         
-        # أوزان المشاعر حسب الكلمات المفتاحية
-        self.emotion_scores = {
-            'anxiety': 0,
-            'depression': 0,
-            'stress': 0,
-            'happiness': 0,
-            'neutral': 0
-        }
+        # أقل ثقة تُقبل عندها نتيجة الكلمات المفتاحية دون تصعيد، ونتيجة التصعيد نفسها
+        self.confidence_threshold = Config.ANALYTICS_SETTINGS['confidence_threshold']
+    
+    def _load_backend(self):
+        """
+        أفضل طريقة تحليل متاحة محلياً: نموذج ONNX ثم المصنف الخطي
+
+        Returns:
+            EmotionBackend أو None (الكلمات المفتاحية فقط)
+        """
+        loaders = [
+            (ONNX_MODEL_DIR, OnnxSentimentBackend, "ONNX model"),
+            (LINEAR_MODEL_PATH, LinearBackend, "local linear classifier"),
+        ]
+        for path, backend_class, name in loaders:
+            if not path.exists():
+                continue
+            try:
+                backend = backend_class(path)
+                print(f"Using {name}")
+                return backend
+            except Exception as e:
+                print(f"⚠️ تعذر تحميل {name}: {e}")
+        return None
+    
+    def warm_up(self):
+        """
+        تشغيل كل مراحل التحليل مرة واحدة (التنظيف، القواميس، الكلمات المفتاحية،
+        والطريقة الأثقل إن وجدت) دون المرور بالـ Cache أو العدادات
+        """
+        cleaned_text = self.text_cleaner.preprocess_for_model("أنا قلقان شوية النهارده")
+        self._keyword_stage(cleaned_text)
+        if self.backend is not None:
+            self.backend.predict_one(cleaned_text)
     
     def analyze_with_keywords(self, text):
         """تحليل باستخدام الكلمات المفتاحية (Fallback Method)"""
-        keywords_found = self.text_cleaner.detect_emotion_keywords(text)
-        
+        return self._score_keywords(self.text_cleaner.detect_emotion_keywords(text))
+    
+    def _keyword_stage(self, text):
+        """
+        المرحلة الأولى في التحليل المتدرج
+
+        Returns:
+            tuple: (الحالة، الثقة، ثقة البوابة) حيث ثقة البوابة صفر إذا لم توجد
+                أي كلمة مفتاحية (الحالة الطبيعية هنا افتراض وليست دليلاً)
+        """
+        hits = get_shared_matcher().find(text, 'emotion')
+        keywords_found = [e for e in EMOTION_LABELS if ('emotion', e) in hits]
+        emotion, confidence = self._score_keywords(keywords_found or ['neutral'])
+        return emotion, confidence, confidence if keywords_found else 0.0
+    
+    def _score_keywords(self, keywords_found):
+        """حساب الحالة والثقة من قائمة المشاعر المكتشفة"""
         # حساب النتيجة
         scores = self.emotion_scores.copy()
         for emotion in keywords_found:
@@ -85,6 +239,31 @@ class EmotionDetector:
         
         return max_emotion, confidence
     
+    def analyze_with_backend(self, text):
+        """تحليل باستخدام طريقة التحليل المحلية (ONNX أو المصنف الخطي)"""
+        label = None
+        if self.batcher is not None:
+            try:
+                label, confidence = self.batcher(text)
+            except TimeoutError:
+                print("⚠️ تأخرت نتيجة الدفعة، سيتم التحليل مباشرة")
+        if label is None:
+            label, confidence = self.backend.predict_one(text)
+        emotion = self.emotion_mapping.get(label, label)
+        if self.backend.polarity_only:
+            emotion = self._refine_with_keywords(text, emotion)
+        return emotion, confidence
+    
+    def _refine_with_keywords(self, text, emotion):
+        """تحسين تصنيف نموذج الإيجابية/السلبية بناءً على الكلمات المفتاحية"""
+        keyword_emotions = self.text_cleaner.detect_emotion_keywords(text)
+        
+        if 'anxiety' in keyword_emotions and emotion == 'depression':
+            emotion = 'anxiety'
+        elif 'stress' in keyword_emotions:
+            emotion = 'stress'
+        return emotion
+    
     def analyze_with_model(self, text):
         """تحليل باستخدام نموذج MARBERT"""
         try:
@@ -96,12 +275,7 @@ class EmotionDetector:
             emotion = self.emotion_mapping.get(sentiment_label, 'neutral')
             
             # تحسين التصنيف بناءً على الكلمات المفتاحية
-            keyword_emotions = self.text_cleaner.detect_emotion_keywords(text)
-            
-            if 'anxiety' in keyword_emotions and emotion == 'depression':
-                emotion = 'anxiety'
-            elif 'stress' in keyword_emotions:
-                emotion = 'stress'
+            emotion = self._refine_with_keywords(text, emotion)
             
             return emotion, confidence
             
@@ -124,6 +298,46 @@ class EmotionDetector:
                 'description_ar': وصف بالعربية
             }
         """
+        # النصوص المتكررة تُحلل مرة واحدة على مستوى العملية
+        backend = self.get_backend(use_model)
+        cache = get_analysis_cache()
+        key = cache.make_key('detect_emotion', text, backend, self.confidence_threshold)
+        return dict(cache.get_or_compute(key, lambda: self._detect_emotion(text, backend)))
+    
+    def detect_emotion_streaming(self, text, risk_detector=None):
+        """
+        تحليل رسالة طويلة جملة بجملة مع توقف مبكر (انظر StreamingAnalyzer)
+        
+        Returns:
+            dict: نفس مفاتيح detect_emotion مع 'distribution' و 'sentences'
+                و 'risk' و 'stopped_early' و 'stop_reason'
+        """
+        settings = Config.PERFORMANCE_SETTINGS
+        analyzer = StreamingAnalyzer(
+            self, risk_detector,
+            max_sentences=settings['stream_max_sentences'],
+            max_sentence_chars=settings['stream_max_sentence_chars']
+        )
+        result = analyzer.analyze(text)
+        result['description_ar'] = EMOTION_DESCRIPTIONS.get(result['emotion'], 'غير محدد')
+        result['source'] = 'Sentence Analysis'
+        return result
+    
+    def get_backend(self, use_model=True):
+        """
+        الطريقة الأثقل التي تُصعَّد إليها النصوص الغامضة
+
+        Returns:
+            str: 'model' أو اسم الـ Backend ('onnx' أو 'linear') أو 'keywords' (بدون تصعيد)
+        """
+        if use_model and self.sentiment_pipeline:
+            return 'model'
+        if use_model and self.backend is not None:
+            return self.backend.name
+        return 'keywords'
+    
+    def _detect_emotion(self, text, backend):
+        """التحليل الفعلي بدون Cache"""
         # تنظيف النص
         cleaned_text = self.text_cleaner.preprocess_for_model(text)
         
@@ -134,27 +348,83 @@ class EmotionDetector:
                 'description_ar': 'نص قصير جداً'
             }
         
-        # تحليل المشاعر
-        if use_model and self.sentiment_pipeline:
-            emotion, confidence = self.analyze_with_model(cleaned_text)
-        else:
-            emotion, confidence = self.analyze_with_keywords(cleaned_text)
-        
-        # إضافة وصف عربي
-        descriptions = {
-            'anxiety': 'حالة قلق وتوتر',
-            'depression': 'حالة حزن واكتئاب',
-            'stress': 'حالة ضغط نفسي',
-            'happiness': 'حالة سعادة وراحة',
-            'neutral': 'حالة طبيعية'
-        }
+        # تحليل متدرج: الكلمات المفتاحية أولاً، والنصوص الغامضة فقط تُصعَّد للطريقة الأثقل
+        stage = 'keywords'
+        emotion, confidence, gate = self._run_stage(stage, self._keyword_stage, cleaned_text)
+        if backend != 'keywords' and gate < self.confidence_threshold:
+            analyze = self.analyze_with_model if backend == 'model' else self.analyze_with_backend
+            escalated = self._run_stage(backend, analyze, cleaned_text, escalated=True)
+            # نتيجة الطريقة الأثقل تُقبل فقط بثقة لا تقل عن الحد، وإلا تبقى نتيجة الكلمات المفتاحية
+            if escalated[1] >= self.confidence_threshold:
+                stage = backend
+                emotion, confidence = escalated
         
         return {
             'emotion': emotion,
             'confidence': round(confidence, 2),
-            'description_ar': descriptions.get(emotion, 'غير محدد'),
-            'source': 'MARBERT AI' if (use_model and self.sentiment_pipeline) else 'Keyword Analysis'
+            'description_ar': EMOTION_DESCRIPTIONS.get(emotion, 'غير محدد'),
+            'source': BACKEND_SOURCES.get(stage) or self.backend.source
+        }
+    
+    def _run_stage(self, stage, analyze, text, escalated=False):
+        """تشغيل مرحلة واحدة مع تسجيل وقتها في عدادات التحليل المتدرج"""
+        start = time.perf_counter()
+        result = analyze(text)
+        _cascade_stats.record(stage, time.perf_counter() - start, escalated)
+        return result
+    
+    def detect_emotions(self, texts, workers=1):
+        """
+        تحليل مجموعة نصوص دفعة واحدة بعمليات مصفوفات (للمعالجة الجماعية للسجل)
+        يبني مصفوفة (الرسائل × المشاعر) لعدد الكلمات المكتشفة، ثم يحسب
+        الحالة والثقة ونقاط المزاج كعمليات NumPy بنفس منطق analyze_with_keywords
+        
+        Args:
+            texts: قائمة النصوص
+            workers: عدد العمليات للتنظيف (انظر ArabicTextCleaner.clean_many)
+            
+        Returns:
+            dict: أعمدة NumPy جاهزة لـ pd.DataFrame:
+                'emotion', 'emotion_id', 'confidence', 'mood_score', 'is_short',
+                و 'hits_<emotion>' لكل حالة
+        """
+        matcher = get_shared_matcher()
+        tags = [('emotion', emotion) for emotion in EMOTION_LABELS]
+        
+        lengths = []
+        rows = []
+        for cleaned in self.text_cleaner.clean_many(texts, workers=workers):
+            hits = matcher.find(cleaned, 'emotion')
+            lengths.append(len(cleaned))
+            rows.append([len(hits.get(tag, ())) for tag in tags])
+        
+        counts = np.array(rows, dtype=np.int32).reshape(len(rows), len(tags))
+        is_short = np.array(lengths, dtype=np.int32) < 3
+        
+        # كل حالة مكتشفة تُحسب مرة واحدة، وبدون كلمات تكون الحالة طبيعية
+        present = (counts > 0).astype(np.float64)
+        neutral = EMOTION_LABELS.index('neutral')
+        present[present.sum(axis=1) == 0, neutral] = 1.0
+        
+        emotion_id = present.argmax(axis=1)
+        confidence = present[np.arange(len(present)), emotion_id] / present.sum(axis=1)
+        
+        emotion_id[is_short] = neutral
+        confidence[is_short] = 0.5
+        
+        mood_scores = Config.ANALYTICS_SETTINGS['mood_scores']
+        score_table = np.array([mood_scores.get(e, 3) for e in EMOTION_LABELS], dtype=np.int8)
+        
+        result = {
+            'emotion': np.array(EMOTION_LABELS, dtype=object)[emotion_id],
+            'emotion_id': emotion_id,
+            'confidence': np.round(confidence, 2),
+            'mood_score': score_table[emotion_id],
+            'is_short': is_short,
         }
+        for index, emotion in enumerate(EMOTION_LABELS):
+            result[f'hits_{emotion}'] = counts[:, index]
+        return result
     
     def get_emotion_emoji(self, emotion):
         """الحصول على إيموجي للحالة"""
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+تصدير نموذج تحليل المشاعر (CAMeL-BERT) إلى ONNX مع نسخة مضغوطة int8
+يحتاج transformers و torch مرة واحدة على جهاز التطوير فقط، وبعدها يعمل
+التطبيق بـ onnxruntime و tokenizers وحدهما
+
+الاستخدام:
+    python export_onnx_model.py [--model اسم_النموذج] [--no-quantize]
+"""
+
+import argparse
+from pathlib import Path
+
+from utils.emotion_backends import ONNX_MODEL_DIR, quantize_model
+
+DEFAULT_MODEL = "CAMeL-Lab/bert-base-arabic-camelbert-msa-sentiment"
+INPUT_NAMES = ['input_ids', 'attention_mask', 'token_type_ids']
+
+
+def export(model_name, output_dir, opset=17):
+    """تصدير النموذج والـ Tokenizer والإعدادات (id2label) إلى output_dir"""
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+    tokenizer.save_pretrained(output_dir)
+    model.config.save_pretrained(output_dir)
+
+    sample = tokenizer(["نص تجريبي للتصدير"], return_tensors='pt')
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in INPUT_NAMES}
+    dynamic_axes['logits'] = {0: 'batch'}
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in INPUT_NAMES),
+            str(output_dir / "model.onnx"),
+            input_names=INPUT_NAMES,
+            output_names=['logits'],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+    return output_dir / "model.onnx"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="تصدير نموذج المشاعر إلى ONNX")
+    parser.add_argument('--model', default=DEFAULT_MODEL)
+    parser.add_argument('--output', type=Path, default=ONNX_MODEL_DIR)
+    parser.add_argument('--no-quantize', action='store_true', help="بدون نسخة int8")
+    args = parser.parse_args()
+
+    model_path = export(args.model, args.output)
+    print(f"✅ {model_path} ({model_path.stat().st_size / 1e6:.0f} MB)")
+    if not args.no_quantize:
+        quantized = quantize_model(model_path)
+        print(f"✅ {quantized} ({quantized.stat().st_size / 1e6:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,8 @@ from datetime import datetime, timedelta
 import streamlit as st
 from pathlib import Path
 
+from config import Config
+
 class MoodTracker:
     def __init__(self, data_file="data/mood_history.json"):
         self.data_file = Path(data_file)
@@ -50,14 +52,27 @@ class MoodTracker:
     
     def emotion_to_score(self, emotion):
         """تحويل المشاعر إلى نقاط رقمية للتحليل"""
-        scores = {
-            'happiness': 5,
-            'neutral': 3,
-            'anxiety': 2,
-            'stress': 2,
-            'depression': 1
-        }
-        return scores.get(emotion, 3)
+        return Config.ANALYTICS_SETTINGS['mood_scores'].get(emotion, 3)
+    
+    def rescore_history(self, detector):
+        """
+        إعادة تحليل كل نصوص السجل دفعة واحدة (مسار مصفوفات بدل حلقة لكل رسالة)
+        
+        Args:
+            detector: كائن EmotionDetector
+            
+        Returns:
+            DataFrame: السجل مع أعمدة التحليل الجديدة (rescored_*)
+        """
+        df = pd.DataFrame(self.mood_data)
+        if df.empty:
+            return df
+        
+        result = detector.detect_emotions(df['user_text'].tolist())
+        df['rescored_emotion'] = result['emotion']
+        df['rescored_confidence'] = result['confidence']
+        df['rescored_mood_score'] = result['mood_score']
+        return df
     
     def get_mood_trends(self, days=30):
         """الحصول على اتجاهات الحالة المزاجية"""
@@ -4,10 +4,27 @@
 """
 
 import os
+import threading
+import time
+from collections import OrderedDict
 from dotenv import load_dotenv
 import google.generativeai as genai
 import streamlit as st
 
+from config import Config
+from utils.hedged_reply import FallbackReply
+from utils.reply_timing import get_reply_timing
+from utils.resilience import CircuitBreaker, CircuitOpenError, backoff_delay
+from utils.token_usage import get_token_stats
+
+
+class BlockedReplyError(ValueError):
+    """Gemini ردت لكن الرد محجوب (response.text يفشل) أو فارغ"""
+
+
+# ردود وصلت من الخدمة لكنها محجوبة: لا تُحسب فشلاً للـ Circuit ولا يُعاد الطلب
+BLOCKED_ERRORS = (BlockedReplyError, genai.types.BlockedPromptException, genai.types.StopCandidateException)
+
 # تحميل مفتاح Gemini API
 load_dotenv()
 
@@ -64,14 +81,87 @@ class GeminiResponseGenerator:
         - دائماً انهي الرد بسؤال متابعة يشجع المستخدم يكمل كلام.
         - لو المستخدم لمح للانتحار أو إيذاء النفس، وجهيه فوراً للخط الساخن (08008880700) بلطف وحزم.
         """
+        self.model_name = Config.GEMINI_MODEL_NAME
+        # عدد أدوار المحادثة المحفوظة في كل جلسة، وأقصى عدد جلسات (الأقدم استخداماً يُحذف)
+        self.chat_history_turns = Config.PERFORMANCE_SETTINGS['chat_history_turns']
+        self.max_chat_sessions = Config.PERFORMANCE_SETTINGS['max_chat_sessions']
+        # مهلة كل طلب (ثانية) وإعادة المحاولة، و Circuit Breaker يرفض الطلبات فوراً بعد فشل متكرر
+        self.reply_deadline = Config.PERFORMANCE_SETTINGS['reply_deadline_s']
+        self.reply_retries = Config.PERFORMANCE_SETTINGS['reply_retries']
+        self.retry_base_delay = Config.PERFORMANCE_SETTINGS['retry_base_delay_s']
+        self.retry_max_delay = Config.PERFORMANCE_SETTINGS['retry_max_delay_s']
+        self.breaker = CircuitBreaker(
+            failure_threshold=Config.PERFORMANCE_SETTINGS['breaker_failures'],
+            reset_timeout=Config.PERFORMANCE_SETTINGS['breaker_reset_s'],
+        )
+        self._model = None
+        self._chats = OrderedDict()
+        self._lock = threading.Lock()
+
+    def warm_up(self):
+        """تجهيز عميل Gemini (الاتصال والمكتبات والنموذج) قبل أول رسالة دون إرسال أي طلب"""
+        try:
+            from google.generativeai import client
+            client.get_default_generative_client()
+            self.get_model()
+        except Exception as e:
+            print(f"Gemini warm-up skipped: {e}")
+
+    def get_model(self):
+        """نموذج Gemini المشترك: يُنشأ مرة واحدة والـ system prompt فيه كـ system_instruction"""
+        with self._lock:
+            if self._model is None:
+                self._model = genai.GenerativeModel(self.model_name, system_instruction=self.system_prompt)
+            return self._model
 
-    def generate_ai_response(self, user_text, emotion, history):
+    def get_chat(self, session_id, turns=None):
         """
-        توليد رد ذكي باستخدام Gemini
+        جلسة المحادثة الخاصة بالمستخدم (تُنشأ عند أول رسالة)
+
+        Args:
+            session_id: معرف جلسة المستخدم
+            turns: أدوار سابقة [{'user', 'assistant'}] تبدأ بها الجلسة إذا لم تكن موجودة
+                   (مثلاً بعد إعادة تحميل مولد الردود)
         """
-        
-        # بناء السياق الكامل
-        full_prompt = f"""
+        with self._lock:
+            chat = self._chats.get(session_id)
+            if chat is not None:
+                self._chats.move_to_end(session_id)
+                return chat
+
+        history = []
+        for conv in (turns or [])[-self.chat_history_turns:]:
+            history.append({'role': 'user', 'parts': [conv['user']]})
+            history.append({'role': 'model', 'parts': [conv['assistant']]})
+        chat = self.get_model().start_chat(history=history)
+
+        with self._lock:
+            chat = self._chats.setdefault(session_id, chat)
+            self._chats.move_to_end(session_id)
+            while len(self._chats) > self.max_chat_sessions:
+                self._chats.popitem(last=False)
+        return chat
+
+    def end_chat(self, session_id):
+        """حذف جلسة المحادثة (محادثة جديدة)"""
+        with self._lock:
+            self._chats.pop(session_id, None)
+
+    def record_turn(self, session_id, user_text, emotion, reply):
+        """إضافة دور رُد عليه بدون Gemini (من Cache الردود) لسجل جلسة المحادثة إن وُجدت"""
+        with self._lock:
+            chat = self._chats.get(session_id)
+        if chat is None:
+            return  # الجلسة تبدأ من turns في الرسالة القادمة
+        history = list(chat.history) + [
+            {'role': 'user', 'parts': [self.build_turn(user_text, emotion)]},
+            {'role': 'model', 'parts': [reply]},
+        ]
+        chat.history = history[-2 * self.chat_history_turns:]
+
+    def build_legacy_prompt(self, user_text, emotion, history):
+        """الطلب الكامل بالطريقة القديمة (system prompt + السجل كنص) لمقارنة الـ Tokens"""
+        return f"""
         {self.system_prompt}
         
         سياق المحادثة الحالية:
@@ -85,17 +175,207 @@ class GeminiResponseGenerator:
         ردي على المستخدم بصفتك "د. أمل" بناءً على القواعد السابقة.
         """
 
+    def build_turn(self, user_text, emotion):
+        """رسالة الدور الحالي فقط (الشخصية في system_instruction والسجل في جلسة المحادثة)"""
+        return f"مشاعر المستخدم المكتشفة: {emotion}\nرسالة المستخدم: {user_text}"
+
+    def record_tokens(self, mode, response, sent_chars, legacy_prompt):
+        """
+        تسجيل Tokens الرد من usage_metadata مع تقدير Tokens الطريقة القديمة
+        (بنفس نسبة الـ Tokens لكل حرف في الطلب المرسل فعلياً)
+        """
+        usage = getattr(response, 'usage_metadata', None)
+        prompt_tokens = int(getattr(usage, 'prompt_token_count', 0) or 0)
+        reply_tokens = int(getattr(usage, 'candidates_token_count', 0) or 0)
+        legacy_tokens = round(prompt_tokens * len(legacy_prompt) / sent_chars) if sent_chars else 0
+        get_token_stats().record(mode, prompt_tokens, reply_tokens, legacy_tokens)
+        if Config.DEBUG:
+            print(f"🔢 Gemini tokens ({mode}): prompt={prompt_tokens} reply={reply_tokens} legacy≈{legacy_tokens}")
+
+    def prepare_request(self, turn, history, session_id=None, turns=None):
+        """
+        تجهيز الطلب (طلب مستقل، أو الدور الحالي في جلسة المحادثة)
+
+        Returns:
+            tuple: (النموذج أو جلسة المحادثة، المحتوى، الجلسة أو None، عدد حروف الطلب المرسل)
+        """
+        if session_id is None:
+            content = f"سياق المحادثة الحالية:\n{history}\n\n{turn}" if history else turn
+            return self.get_model(), content, None, len(self.system_prompt) + len(content)
+
+        chat = self.get_chat(session_id, turns)
+        history_chars = sum(len(part.text) for content in chat.history for part in content.parts)
+        return chat, turn, chat, len(self.system_prompt) + history_chars + len(turn)
+
+    def send_request(self, turn, history, cancel_event=None, session_id=None, turns=None, stream=False,
+                     timeout=None):
+        """
+        إرسال الطلب لـ Gemini بمهلة timeout ثانية (الافتراضي reply_deadline)
+
+        Returns:
+            tuple | None: (الرد، جلسة المحادثة أو None، عدد حروف الطلب المرسل)،
+            أو None إذا أُلغي الطلب قبل الإرسال
+
+        Raises:
+            CircuitOpenError: الـ Circuit مفتوح (لم يُرسل الطلب)
+        """
+        target, content, chat, sent_chars = self.prepare_request(turn, history, session_id, turns)
+        # الطلب أُلغي قبل الإرسال (تم عرض رسالة الطوارئ بدلاً منه)
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        if not self.breaker.allow_request():
+            raise CircuitOpenError("Gemini circuit is open")
+        send = target.generate_content if chat is None else target.send_message
+        timeout = self.reply_deadline if timeout is None else timeout
+        response = send(content, stream=stream, request_options={'timeout': timeout})
+        return response, chat, sent_chars
+
+    def finish_request(self, response, chat, sent_chars, legacy_prompt, cancel_event=None):
+        """بعد اكتمال الرد: تنظيف سجل الجلسة وتسجيل الـ Tokens"""
+        if chat is not None:
+            if cancel_event is not None and cancel_event.is_set():
+                # الرد سيُتجاهل (رسالة أزمة)، فلا يبقى في سجل الجلسة
+                chat.rewind()
+            elif len(chat.history) > 2 * self.chat_history_turns:
+                chat.history = chat.history[-2 * self.chat_history_turns:]
+        self.record_tokens('stateless' if chat is None else 'chat', response, sent_chars, legacy_prompt)
+
+    def read_text(self, response, allow_empty=False):
+        """
+        نص الرد (أو جزء منه في الرد المتدفق)
+
+        Raises:
+            BlockedReplyError: الرد محجوب، أو فارغ إذا كانت allow_empty False
+        """
         try:
-            # استخدام أحدث نموذج متاح
-            model = genai.GenerativeModel("gemini-2.5-flash")
-            response = model.generate_content(full_prompt)
-            return response.text.strip()
+            text = response.text
+        except ValueError as e:
+            raise BlockedReplyError(str(e)) from e
+        if not allow_empty and not text.strip():
+            raise BlockedReplyError("empty reply")
+        return text
+
+    @staticmethod
+    def is_retryable(error):
+        """إعادة المحاولة لا تفيد مع الـ Circuit المفتوح أو الرد المحجوب"""
+        return not isinstance(error, (CircuitOpenError,) + BLOCKED_ERRORS)
+
+    def record_error(self, error, session_id=None):
+        """
+        تسجيل فشل الطلب وبدء الجلسة من جديد. الـ Circuit المفتوح ليس فشلاً جديداً،
+        والرد المحجوب أو الفارغ نجاح للـ Circuit (الخدمة ردت) في كل المسارات
+        """
+        print(f"Gemini Error: {str(error) or repr(error)}")
+        if isinstance(error, BLOCKED_ERRORS):
+            self.breaker.record_success()
+        elif not isinstance(error, CircuitOpenError):
+            self.breaker.record_failure()
+        if session_id is not None:
+            # سجل الجلسة قد يكون في حالة غير متسقة؛ تبدأ من جديد من turns في الرسالة القادمة
+            self.end_chat(session_id)
+
+    def generate_ai_response(self, user_text, emotion, history, cancel_event=None, session_id=None, turns=None):
+        """
+        توليد رد ذكي باستخدام Gemini
+
+        Args:
+            history: آخر أدوار المحادثة كنص (للطلب المستقل بدون session_id)
+            cancel_event: threading.Event لإلغاء الطلب قبل إرساله (رسائل الأزمات)
+            session_id: معرف جلسة المستخدم؛ إذا وُجد يُرسل الدور الحالي فقط في جلسة محادثة
+            turns: أدوار سابقة تبدأ بها جلسة المحادثة إذا لم تكن موجودة (انظر get_chat)
+
+        Returns:
+            str: الرد، أو None إذا أُلغي الطلب قبل الإرسال
+        """
+        try:
+            sent = self.send_request(self.build_turn(user_text, emotion), history, cancel_event, session_id, turns)
+            if sent is None:
+                return None
+            response, chat, sent_chars = sent
+            reply = self.read_text(response).strip()
+            self.breaker.record_success()
+            self.finish_request(response, chat, sent_chars,
+                                self.build_legacy_prompt(user_text, emotion, history), cancel_event)
+            return reply
 
         except Exception as e:
-            print(f"Gemini Error: {e}")
+            self.record_error(e, session_id)
             # في حالة فشل Gemini، استخدم رد افتراضي ذكي
             return self.generate_fallback_response(user_text, emotion)
 
+    def stream_ai_response(self, user_text, emotion, history, cancel_event=None, session_id=None, turns=None):
+        """
+        توليد الرد متدفقاً من Gemini (نفس معاملات generate_ai_response)
+
+        الفشل قبل أول جزء يُعاد بانتظار عشوائي (حتى reply_retries)، وreply_deadline
+        مهلة كلية لكل المحاولات: كل محاولة تنتظر فقط ما تبقى منها، وإعادة المحاولة
+        لا تبدأ إذا كان الانتظار قبلها سيتجاوزها. بعد ظهور جزء من الرد لا يُعاد الطلب.
+        إذا كان الـ Circuit مفتوحاً يكون الرد الاحتياطي فوراً بدون أي طلب
+
+        Yields:
+            str: نص الرد حتى الآن بعد كل جزء يصل. إذا فشل الطلب قبل أول جزء أو في
+            منتصف الرد يكون آخر نص هو الرد الاحتياطي كاملاً (FallbackReply، يحل محل
+            الجزء المعروض).
+            لا يُرجع شيئاً إذا أُلغي الطلب قبل الإرسال
+        """
+        started = time.perf_counter()
+        first_chunk = None
+        turn = self.build_turn(user_text, emotion)
+        attempt = 0
+        while True:
+            text = ''
+            try:
+                remaining = self.reply_deadline - (time.perf_counter() - started)
+                sent = self.send_request(turn, history, cancel_event, session_id, turns, stream=True,
+                                         timeout=remaining)
+                if sent is None:
+                    return
+                response, chat, sent_chars = sent
+                for chunk in response:
+                    chunk_text = self.read_text(chunk, allow_empty=True)
+                    if not chunk_text:
+                        continue
+                    if first_chunk is None:
+                        first_chunk = time.perf_counter()
+                    text += chunk_text
+                    yield text
+                if not text.strip():
+                    raise BlockedReplyError("empty reply")
+                self.breaker.record_success()
+                self.finish_request(response, chat, sent_chars,
+                                    self.build_legacy_prompt(user_text, emotion, history), cancel_event)
+                fallback = False
+                break
+
+            except GeneratorExit:
+                # توقف القارئ في منتصف الرد (رسالة أزمة): الرد الجزئي لا يبقى في سجل الجلسة
+                self.breaker.record_cancelled()
+                if session_id is not None:
+                    self.end_chat(session_id)
+                raise
+
+            except Exception as e:
+                self.record_error(e, session_id)
+                delay = backoff_delay(attempt, self.retry_base_delay, self.retry_max_delay)
+                if (first_chunk is None and self.is_retryable(e) and attempt < self.reply_retries
+                        and time.perf_counter() + delay - started < self.reply_deadline):
+                    self.breaker.record_retry()
+                    attempt += 1
+                    if cancel_event is not None:
+                        cancel_event.wait(delay)
+                    else:
+                        time.sleep(delay)
+                    continue
+                text = FallbackReply(self.generate_fallback_response(user_text, emotion))
+                fallback = True
+                if first_chunk is None:
+                    first_chunk = time.perf_counter()
+                yield text
+                break
+
+        finished = time.perf_counter()
+        get_reply_timing().record((first_chunk or finished) - started, finished - started, fallback=fallback)
+
     def generate_fallback_response(self, user_text, emotion):
         """رد احتياطي في حالة فشل Gemini"""
         responses = {
@@ -26,8 +26,7 @@ def check_requirements():
         'pandas', 
         'numpy',
         'google-generativeai',
-        'python-dotenv',
-        'emoji'
+        'python-dotenv'
     ]
     
     missing_packages = []
@@ -89,6 +88,14 @@ def create_data_directories():
         Path(directory).mkdir(exist_ok=True)
         print(f"✅ مجلد {directory}")
 
+def build_lexicons():
+    """بناء ملف القواميس المجمعة لتحميلها بقراءة واحدة عند بدء التطبيق"""
+    try:
+        import build_lexicons
+        build_lexicons.main()
+    except Exception as e:
+        print(f"⚠️ تعذر بناء القواميس المجمعة (سيتم بناؤها في الذاكرة): {e}")
+
 def run_app():
     """تشغيل التطبيق"""
     print("\nStarting the application...")
@@ -141,6 +148,9 @@ def main():
     # إنشاء المجلدات
     create_data_directories()
     
+    # بناء ملف القواميس المجمعة
+    build_lexicons()
+    
     print("\nAll requirements ready!")
     
     # تشغيل التطبيق
@@ -0,0 +1,10 @@
+import pytest
+
+import emotion_model
+
+
+@pytest.fixture(autouse=True)
+def keyword_backend_by_default(tmp_path, monkeypatch):
+    # اختبارات الكلمات المفتاحية لا تتأثر بنماذج مُدرَّبة أو مُصدَّرة محلياً في models/
+    monkeypatch.setattr(emotion_model, 'LINEAR_MODEL_PATH', tmp_path / 'missing.npz')
+    monkeypatch.setattr(emotion_model, 'ONNX_MODEL_DIR', tmp_path / 'missing_onnx')
@@ -0,0 +1,43 @@
+import json
+
+from benchmarks.suite import compare, main, run_suite
+
+
+def test_run_suite_reports_throughput_and_percentiles():
+    report = run_suite(sizes=[1, 50], targets={'upper': str.upper})
+    assert [(r['corpus'], r['size']) for r in report['results']] == [
+        ('dataset', 40), ('synthetic', 1), ('synthetic', 50)
+    ]
+    for result in report['results']:
+        assert result['samples'] >= 1000
+        assert result['throughput'] > 0
+        assert result['p50_us'] <= result['p95_us'] <= result['p99_us']
+
+
+def test_compare_flags_only_regressions_beyond_threshold():
+    baseline = {'results': [
+        {'target': 'a', 'corpus': 'synthetic', 'size': 10, 'throughput': 1000.0, 'p95_us': 10.0},
+        {'target': 'b', 'corpus': 'synthetic', 'size': 10, 'throughput': 1000.0, 'p95_us': 10.0},
+    ]}
+    current = {'results': [
+        {'target': 'a', 'corpus': 'synthetic', 'size': 10, 'throughput': 900.0, 'p95_us': 11.0},
+        {'target': 'b', 'corpus': 'synthetic', 'size': 10, 'throughput': 500.0, 'p95_us': 30.0},
+        {'target': 'c', 'corpus': 'synthetic', 'size': 10, 'throughput': 1.0, 'p95_us': 1e6},
+    ]}
+    regressions = compare(current, baseline, threshold=0.2)
+    assert {(r['target'], r['metric']) for r in regressions} == {('b', 'throughput'), ('b', 'p95_us')}
+
+
+def test_main_writes_json_and_fails_on_regression(tmp_path):
+    output = tmp_path / 'run.json'
+    assert main(['--sizes', '1', '--targets', 'clean_text', '--output', str(output)]) == 0
+    report = json.loads(output.read_text(encoding='utf-8'))
+    assert {r['target'] for r in report['results']} == {'clean_text'}
+
+    # خط أساس أسرع بكثير من أي جهاز حقيقي
+    for result in report['results']:
+        result['throughput'] *= 1000
+        result['p95_us'] /= 1000
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps(report), encoding='utf-8')
+    assert main(['--sizes', '1', '--targets', 'clean_text', '--baseline', str(baseline)]) == 1
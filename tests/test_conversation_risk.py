@@ -0,0 +1,52 @@
+import pickle
+
+from utils.conversation_risk import ConversationRiskState
+from utils.risk_detector import RiskDetector
+
+NONE = {'is_risk': False, 'level': 'none', 'reason': ''}
+MEDIUM = {'is_risk': True, 'level': 'medium', 'reason': 'كلمة مقلقة'}
+HIGH = {'is_risk': True, 'level': 'high', 'reason': 'نمط خطر'}
+
+
+def test_repeated_medium_signals_escalate_to_high():
+    state = ConversationRiskState(window=5, medium_hits_for_high=2)
+    assert state.update(MEDIUM)['level'] == 'medium'
+    assert state.update(NONE)['level'] == 'none'
+    result = state.update(MEDIUM)
+    assert result['level'] == 'high'
+    assert result['message_level'] == 'medium'
+    assert result['escalated'] and result['recent_hits'] == 2
+
+
+def test_window_forgets_old_hits():
+    state = ConversationRiskState(window=3, medium_hits_for_high=2, elevated_score=10)
+    state.update(MEDIUM)
+    for _ in range(3):
+        state.update(NONE)
+    assert state.hits == 0
+    assert state.update(MEDIUM)['level'] == 'medium'
+
+
+def test_decayed_score_elevates_quiet_message_after_high():
+    state = ConversationRiskState(decay=0.7, elevated_score=1.5)
+    assert state.update(HIGH)['level'] == 'high'
+    result = state.update(NONE)
+    assert result['level'] == 'medium' and result['score'] == 2.1
+    assert state.update(NONE)['level'] == 'none'
+
+
+def test_reset_and_pickle_round_trip():
+    state = ConversationRiskState()
+    state.update(MEDIUM)
+    restored = pickle.loads(pickle.dumps(state))
+    assert restored.update(MEDIUM)['level'] == 'high'
+    state.reset()
+    assert state.score == 0 and state.hits == 0 and state.update(MEDIUM)['level'] == 'medium'
+
+
+def test_with_risk_detector():
+    detector = RiskDetector()
+    state = ConversationRiskState()
+    assert state.update(detector.detect_risk('خلاص تعبت'))['level'] == 'medium'
+    assert state.update(detector.detect_risk('يومي كان عادي'))['level'] == 'none'
+    assert state.update(detector.detect_risk('مفيش فايدة'))['level'] == 'high'
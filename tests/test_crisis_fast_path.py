@@ -0,0 +1,116 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from response_generator import GeminiResponseGenerator
+from utils.crisis_fast_path import CrisisStats, get_crisis_stats, start_reply, start_reply_stream
+
+
+def wait_for(predicate, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_reply_completes_without_cancel():
+    pending = start_reply(lambda user_text, cancel_event=None: f"رد على: {user_text}", user_text="ازيك")
+    assert pending.result(timeout=1) == "رد على: ازيك"
+
+
+def test_cancel_before_send_skips_request():
+    get_crisis_stats().reset()
+    release = threading.Event()
+    sent = []
+
+    def generate(user_text, cancel_event=None):
+        release.wait(1)
+        if cancel_event.is_set():
+            return None
+        sent.append(user_text)
+        return "رد"
+
+    pending = start_reply(generate, user_text="عايز اموت")
+    pending.cancel()
+    release.set()
+    assert wait_for(lambda: get_crisis_stats().stats()['llm_cancelled'] == 1)
+    assert sent == []
+    assert get_crisis_stats().stats()['llm_discarded'] == 0
+
+
+def test_cancel_after_send_discards_reply():
+    get_crisis_stats().reset()
+    sending, release = threading.Event(), threading.Event()
+
+    def generate(user_text, cancel_event=None):
+        if cancel_event.is_set():
+            return None
+        sending.set()
+        release.wait(1)
+        return "رد متأخر"
+
+    pending = start_reply(generate, user_text="عايز اموت")
+    assert sending.wait(1)
+    pending.cancel()
+    release.set()
+    assert wait_for(lambda: get_crisis_stats().stats()['llm_discarded'] == 1)
+    assert get_crisis_stats().stats()['llm_cancelled'] == 0
+
+
+def test_render_latency_stats():
+    stats = CrisisStats()
+    stats.record_message(crisis=False)
+    stats.record_message(crisis=True)
+    stats.record_render(0.002)
+    stats.record_render(0.004)
+    result = stats.stats()
+    assert result['messages'] == 2 and result['crises'] == 1
+    assert result['avg_render_ms'] == 3.0
+    assert result['max_render_ms'] == 4.0
+    assert result['last_render_ms'] == 4.0
+
+
+@patch('google.generativeai.GenerativeModel')
+def test_generator_skips_network_call_when_cancelled(mock_model_class):
+    mock_model = MagicMock()
+    mock_model_class.return_value = mock_model
+    with patch('google.generativeai.configure'):
+        generator = GeminiResponseGenerator()
+
+    cancel_event = threading.Event()
+    cancel_event.set()
+    assert generator.generate_ai_response("عايز اموت", "depression", "", cancel_event=cancel_event) is None
+    mock_model.generate_content.assert_not_called()
+
+
+def test_stream_updates_arrive_in_order():
+    def stream(user_text, cancel_event=None):
+        yield "أنا"
+        yield "أنا سامعاك"
+
+    pending = start_reply_stream(stream, user_text="ازيك")
+    assert list(pending.updates(timeout=1)) == ["أنا", "أنا سامعاك"]
+    assert pending.result(timeout=1) == "أنا سامعاك"
+
+
+def test_cancel_mid_stream_stops_reading_and_discards():
+    get_crisis_stats().reset()
+    first_sent, release, closed = threading.Event(), threading.Event(), threading.Event()
+
+    def stream(user_text, cancel_event=None):
+        try:
+            yield "جزء"
+            first_sent.set()
+            release.wait(1)
+            yield "جزء تاني"
+            yield "جزء تالت"
+        finally:
+            closed.set()
+
+    pending = start_reply_stream(stream, user_text="عايز اموت")
+    assert first_sent.wait(1)
+    pending.cancel()
+    release.set()
+    assert closed.wait(1)
+    assert wait_for(lambda: get_crisis_stats().stats()['llm_discarded'] == 1)
+    assert pending.result(timeout=1) == "جزء تاني"
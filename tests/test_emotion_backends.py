@@ -0,0 +1,114 @@
+import json
+
+import numpy as np
+import pytest
+
+from utils.emotion_backends import MODEL_CONFIG_PATH, load_model_config
+
+# نموذج صغير جداً: Embedding لكل كلمة ثم مجموع على طول النص = Logits
+VOCAB = ['[PAD]', '[UNK]', '[CLS]', '[SEP]', 'سعيد', 'حزين', 'عادي', 'مطر']
+LABELS = {'0': 'negative', '1': 'neutral', '2': 'positive'}
+EMBEDDINGS = np.array([
+    [0, 0, 0], [0, 0, 0], [0, 0, 0], [0, 0, 0],
+    [0, 0, 4], [4, 0, 0], [0, 4, 0], [4, 0, 0],
+], dtype=np.float32)
+
+
+def _export_tiny_model(model_dir):
+    onnx = pytest.importorskip('onnx')
+    from onnx import TensorProto, helper, numpy_helper
+
+    graph = helper.make_graph(
+        [
+            helper.make_node('Gather', ['embeddings', 'input_ids'], ['token_logits']),
+            helper.make_node('Cast', ['attention_mask'], ['mask'], to=TensorProto.FLOAT),
+            helper.make_node('Unsqueeze', ['mask', 'axis'], ['mask3d']),
+            helper.make_node('Mul', ['token_logits', 'mask3d'], ['masked']),
+            helper.make_node('ReduceSum', ['masked', 'sequence_axis'], ['logits'], keepdims=0),
+        ],
+        'tiny_sentiment',
+        [
+            helper.make_tensor_value_info('input_ids', TensorProto.INT64, ['batch', 'sequence']),
+            helper.make_tensor_value_info('attention_mask', TensorProto.INT64, ['batch', 'sequence']),
+        ],
+        [helper.make_tensor_value_info('logits', TensorProto.FLOAT, ['batch', 3])],
+        initializer=[
+            numpy_helper.from_array(EMBEDDINGS, 'embeddings'),
+            numpy_helper.from_array(np.array([2], dtype=np.int64), 'axis'),
+            numpy_helper.from_array(np.array([1], dtype=np.int64), 'sequence_axis'),
+        ],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 13)])
+    model.ir_version = 8
+    model_dir.mkdir()
+    onnx.save(model, str(model_dir / 'model.onnx'))
+    (model_dir / 'vocab.txt').write_text('\n'.join(VOCAB), encoding='utf-8')
+    (model_dir / 'config.json').write_text(json.dumps({'id2label': LABELS}), encoding='utf-8')
+    return model_dir
+
+
+@pytest.fixture
+def tiny_model_dir(tmp_path):
+    pytest.importorskip('onnxruntime')
+    pytest.importorskip('tokenizers')
+    return _export_tiny_model(tmp_path / 'emotion_onnx')
+
+
+def test_load_model_config_reads_pipeline_settings():
+    config = load_model_config(MODEL_CONFIG_PATH)
+    assert config['DEVICE'] == -1
+    assert config['BATCH_SIZE'] == 8
+    assert config['MAX_INPUT_LENGTH'] == 512
+    assert config['SUPPORTED_EMOTIONS'] == ['anxiety', 'depression', 'stress', 'happiness', 'neutral']
+
+
+def test_load_model_config_defaults_for_missing_file(tmp_path):
+    config = load_model_config(tmp_path / 'missing.txt')
+    assert config['BATCH_SIZE'] == 1 and config['DEVICE'] == -1
+
+
+def test_onnx_backend_predicts_batches(tiny_model_dir):
+    from utils.emotion_backends import OnnxSentimentBackend
+
+    config = {'DEVICE': -1, 'BATCH_SIZE': 2, 'MAX_INPUT_LENGTH': 8}
+    backend = OnnxSentimentBackend(tiny_model_dir, config=config, intra_op_threads=1)
+    texts = ['سعيد', 'حزين حزين', 'عادي', 'سعيد سعيد حزين']
+    results = backend.predict(texts)
+    assert [label for label, _ in results] == ['positive', 'negative', 'neutral', 'positive']
+    # الحشو داخل الدفعة لا يغير النتيجة
+    for text, (label, confidence) in zip(texts, results):
+        single_label, single_confidence = backend.predict_one(text)
+        assert single_label == label
+        assert single_confidence == pytest.approx(confidence)
+
+
+def test_onnx_backend_reuses_sessions_and_prefers_int8(tiny_model_dir):
+    from utils.emotion_backends import OnnxSentimentBackend, quantize_model
+
+    config = {'DEVICE': -1, 'BATCH_SIZE': 1, 'MAX_INPUT_LENGTH': 8}
+    first = OnnxSentimentBackend(tiny_model_dir, config=config, intra_op_threads=1)
+    second = OnnxSentimentBackend(tiny_model_dir, config=config, intra_op_threads=1)
+    assert first.session is second.session
+
+    quantize_model(tiny_model_dir / 'model.onnx')
+    quantized = OnnxSentimentBackend(tiny_model_dir, config=config, intra_op_threads=1)
+    assert quantized.model_path.name == 'model.int8.onnx'
+    assert quantized.predict_one('حزين')[0] == 'negative'
+
+
+def test_detector_escalates_to_onnx_backend(tiny_model_dir, monkeypatch):
+    import emotion_model
+
+    monkeypatch.setattr(emotion_model, 'ONNX_MODEL_DIR', tiny_model_dir)
+    detector = emotion_model.EmotionDetector()
+    assert detector.get_backend() == 'onnx'
+    # "سعيد" كلمة مفتاحية واضحة فلا تصعيد
+    assert detector.detect_emotion("أنا سعيد في اختبار onnx")['source'] == 'Keyword Analysis'
+    # بدون كلمات مفتاحية: يُصعَّد للنموذج وتُحوَّل مخرجاته الواثقة (negative) لحالة
+    result = detector.detect_emotion("ذهب أحمد إلى السوق في مطر اختبار onnx")
+    assert result['source'] == 'CAMeL-BERT (ONNX)'
+    assert result['emotion'] == 'depression'
+    # كلمات غير معروفة للنموذج: ثقة 1/3 أقل من الحد فتبقى نتيجة الكلمات المفتاحية
+    unsure = detector.detect_emotion("ذهب أحمد إلى السوق في اختبار onnx")
+    assert unsure['source'] == 'Keyword Analysis'
+    assert unsure['emotion'] == 'neutral'
@@ -38,3 +38,133 @@ def test_short_text():
     result = detector.detect_emotion("لا")
     assert result['emotion'] == 'neutral'
     assert result['description_ar'] == 'نص قصير جداً'
+
+
+def test_detect_emotion_is_memoized():
+    from utils.analysis_cache import get_analysis_cache
+
+    detector = EmotionDetector()
+    cache = get_analysis_cache()
+    text = "أنا مبسوط جدا النهارده من الكاش"
+    first = detector.detect_emotion(text)
+    hits = cache.stats()['hits']
+    second = detector.detect_emotion(text)
+    assert second == first
+    assert cache.stats()['hits'] == hits + 1
+    # النتيجة نسخة مستقلة لا تؤثر على المخزن
+    second['emotion'] = 'changed'
+    assert detector.detect_emotion(text)['emotion'] == first['emotion']
+
+
+def test_analysis_cache_evicts_by_size():
+    from utils.analysis_cache import AnalysisCache
+
+    cache = AnalysisCache(max_bytes=2000)
+    for i in range(100):
+        cache.get_or_compute(cache.make_key('t', str(i)), lambda: 'x' * 100)
+    stats = cache.stats()
+    assert stats['size_bytes'] <= 2000
+    assert stats['evictions'] > 0
+    assert stats['misses'] == 100
+
+
+def test_detect_emotions_matches_single_message_path():
+    detector = EmotionDetector()
+    texts = ["أنا قلقان جدا", "أنا سعيد اليوم", "أنا حزين ومكتئب", "لا",
+             "ذهب أحمد إلى المدرسة", "قلقان ومبسوط", "تعبان نفسياً ومضغوط"]
+    result = detector.detect_emotions(texts)
+    for i, text in enumerate(texts):
+        single = detector.detect_emotion(text, use_model=False)
+        assert result['emotion'][i] == single['emotion']
+        assert result['confidence'][i] == single['confidence']
+    assert result['mood_score'].tolist() == [2, 5, 1, 3, 3, 2, 1]
+    assert result['hits_depression'][2] == 2
+
+
+def _train_on_dataset(path):
+    from train_classifier import DEFAULT_DATA, load_examples
+    from utils.linear_classifier import LinearEmotionClassifier
+
+    detector = EmotionDetector()
+    texts, labels = load_examples([DEFAULT_DATA])
+    cleaned = [detector.text_cleaner.preprocess_for_model(t) for t in texts]
+    classifier = LinearEmotionClassifier.train(cleaned, labels)
+    classifier.save(path)
+    return classifier, cleaned, labels
+
+
+def test_linear_classifier_round_trip_with_mmap(tmp_path):
+    import numpy as np
+    from utils.linear_classifier import LinearEmotionClassifier
+
+    path = tmp_path / 'emotion_linear.npz'
+    classifier, cleaned, labels = _train_on_dataset(path)
+    loaded = LinearEmotionClassifier.load(path)
+    assert isinstance(loaded.weights, np.memmap)
+    assert loaded.classes == classifier.classes
+    for text in cleaned:
+        assert np.allclose(loaded.predict_proba(text), classifier.predict_proba(text), atol=1e-6)
+    accuracy = np.mean([loaded.predict(t)[0] == label for t, label in zip(cleaned, labels)])
+    assert accuracy >= 0.9
+
+
+def test_detector_uses_linear_backend_when_trained(tmp_path, monkeypatch):
+    import emotion_model
+
+    path = tmp_path / 'emotion_linear.npz'
+    _train_on_dataset(path)
+    monkeypatch.setattr(emotion_model, 'LINEAR_MODEL_PATH', path)
+    detector = EmotionDetector()
+    assert detector.get_backend() == 'linear'
+    # نص بدون كلمات مفتاحية يُصعَّد للمصنف الخطي، ونتيجته تُقبل إذا بلغت ثقتها الحد
+    detector.confidence_threshold = 0.2
+    result = detector.detect_emotion("ذهب أحمد إلى السوق مع أخوه")
+    assert result['source'] == 'Linear Classifier'
+    assert detector.detect_emotion("ذهب أحمد إلى السوق مع أخوه", use_model=False)['source'] == 'Keyword Analysis'
+
+
+def test_cascade_escalates_only_ambiguous_texts(tmp_path, monkeypatch):
+    import emotion_model
+
+    path = tmp_path / 'emotion_linear.npz'
+    _train_on_dataset(path)
+    monkeypatch.setattr(emotion_model, 'LINEAR_MODEL_PATH', path)
+    detector = EmotionDetector()
+    stats = emotion_model.get_cascade_stats()
+    stats.reset()
+
+    # كلمة مفتاحية واحدة واضحة: ثقة 1.0 فلا حاجة للتصعيد
+    confident = detector.detect_emotion("أنا قلقان جدا من التصعيد")
+    assert confident['source'] == 'Keyword Analysis'
+    # حالتان متعارضتان: ثقة 0.5 أقل من الحد فيُصعَّد النص، لكن ثقة المصنف
+    # الخطي فيه أقل من الحد أيضاً فتبقى نتيجة الكلمات المفتاحية
+    ambiguous = detector.detect_emotion("قلقان ومبسوط في نفس الوقت للتصعيد")
+    assert ambiguous['source'] == 'Keyword Analysis'
+
+    result = stats.stats()
+    assert result['stages']['keywords']['calls'] == 2
+    assert result['stages']['linear']['calls'] == 1
+    assert result['escalations'] == 1
+    assert result['escalation_rate'] == 0.5
+
+    # رفع الحد يصعد كل النصوص
+    detector.confidence_threshold = 1.01
+    detector.detect_emotion("أنا قلقان جدا من التصعيد")
+    assert stats.stats()['escalations'] == 2
+
+
+def test_low_confidence_escalation_keeps_keyword_result(monkeypatch):
+    detector = EmotionDetector()
+    monkeypatch.setattr(detector, 'get_backend', lambda use_model=True: 'linear')
+    monkeypatch.setattr(detector, 'backend', type('Backend', (), {'source': 'Linear Classifier'})())
+    monkeypatch.setattr(detector, 'analyze_with_backend', lambda text: ('stress', 0.3))
+
+    # الطريقة الأثقل غير واثقة: لا تغير الحالة الطبيعية ولا نتيجة الكلمات الغامضة
+    neutral = detector.detect_emotion("ذهب أحمد إلى السوق للثقة المنخفضة")
+    assert (neutral['emotion'], neutral['source']) == ('neutral', 'Keyword Analysis')
+    mixed = detector.detect_emotion("قلقان ومبسوط للثقة المنخفضة")
+    assert mixed['source'] == 'Keyword Analysis' and mixed['emotion'] != 'stress'
+
+    monkeypatch.setattr(detector, 'analyze_with_backend', lambda text: ('stress', 0.9))
+    confident = detector.detect_emotion("ذهب أحمد إلى السوق للثقة العالية")
+    assert (confident['emotion'], confident['source']) == ('stress', 'Linear Classifier')
@@ -0,0 +1,55 @@
+import threading
+
+from utils.crisis_fast_path import start_reply_stream
+from utils.hedged_reply import HEDGE, LATE, REPLY, FallbackReply, HedgeStats, hedged_updates
+
+
+def slow_stream(release, pieces):
+    def stream(cancel_event=None):
+        release.wait(1)
+        text = ''
+        for piece in pieces:
+            text = piece if isinstance(piece, FallbackReply) else text + piece
+            yield text
+    return stream
+
+
+def test_fast_reply_is_not_hedged():
+    stats = HedgeStats()
+    release = threading.Event()
+    release.set()
+    pending = start_reply_stream(slow_stream(release, ["أنا ", "سامعاك"]))
+
+    updates = list(hedged_updates(pending, lambda: "احتياطي", deadline=1, stats=stats))
+
+    assert updates == [("أنا ", REPLY), ("أنا سامعاك", REPLY)]
+    assert stats.stats()['hedged'] == 0 and stats.stats()['turns'] == 1
+
+
+def test_slow_reply_serves_fallback_then_late_reply():
+    stats = HedgeStats()
+    release = threading.Event()
+    pending = start_reply_stream(slow_stream(release, ["أنا ", "سامعاك"]))
+
+    updates = hedged_updates(pending, lambda: "احتياطي", deadline=0.01, stats=stats)
+    hedge = next(updates)
+    assert hedge == ("احتياطي", HEDGE) and isinstance(hedge[0], FallbackReply)
+    release.set()
+
+    assert list(updates) == [("أنا ", LATE), ("أنا سامعاك", LATE)]
+    result = stats.stats()
+    assert result['hedge_rate'] == 1.0 and result['late_use_rate'] == 1.0
+    assert result['avg_late_ms'] is not None
+
+
+def test_late_fallback_keeps_the_hedge():
+    stats = HedgeStats()
+    release = threading.Event()
+    pending = start_reply_stream(slow_stream(release, [FallbackReply("احتياطي تاني")]))
+
+    updates = hedged_updates(pending, lambda: "احتياطي", deadline=0.01, stats=stats)
+    assert next(updates)[1] == HEDGE
+    release.set()
+
+    assert list(updates) == []
+    assert stats.stats()['hedged'] == 1 and stats.stats()['late_used'] == 0
@@ -0,0 +1,104 @@
+import json
+import random
+
+from utils import lexicon_store
+from utils.keyword_matcher import KeywordMatcher
+from utils.lexicon_store import get_shared_matcher
+from utils.risk_detector import RiskDetector
+from utils.text_cleaner import ARABIC_NORMALIZE_TABLE, ArabicTextCleaner
+
+
+def test_matches_naive_substring_scan():
+    rng = random.Random(3)
+    alphabet = 'ابتثجحخ '
+    lexicon = {
+        label: [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 6))) for _ in range(300)]
+        for label in ('a', 'b', 'c')
+    }
+    matcher = KeywordMatcher()
+    matcher.add_lexicon('test', lexicon)
+
+    for _ in range(200):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        hits = matcher.find(text)
+        for label, keywords in lexicon.items():
+            expected = {k for k in keywords if k in text}
+            assert set(hits.get(('test', label), [])) == expected
+
+
+def test_raw_text_matches_normalized_scan():
+    rng = random.Random(5)
+    # صيغ الهمزات والتاء المربوطة والتشكيل والحروف الكبيرة تُطابق بدون تطبيع النص
+    alphabet = 'اأإآىيةهبaA\u064e\u0650 '
+    matcher = KeywordMatcher(ARABIC_NORMALIZE_TABLE)
+    for index in range(300):
+        keyword = ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 5)))
+        matcher.add(keyword, ('test' if index % 2 else 'other', str(index % 3)))
+
+    for _ in range(300):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        normalized = matcher.normalize(text)
+        for category in (None, 'test'):
+            expected = {}
+            for key, tags in matcher._tags.items():
+                if key in normalized:
+                    for tag, keyword in tags:
+                        if category is None or tag[0] == category:
+                            expected.setdefault(tag, set()).add(keyword)
+            hits = matcher.find(text, category)
+            assert {tag: set(keywords) for tag, keywords in hits.items()} == expected
+
+
+def test_overlapping_keywords_share_one_pass():
+    matcher = KeywordMatcher()
+    matcher.add('خايف', ('emotion', 'anxiety'))
+    matcher.add('خايف من المستقبل', ('emotion', 'anxiety'))
+    matcher.add('المستقبل', ('other', 'x'))
+    hits = matcher.find('انا خايف من المستقبل')
+    assert hits[('emotion', 'anxiety')] == ['خايف', 'خايف من المستقبل']
+    assert hits[('other', 'x')] == ['المستقبل']
+
+
+def test_shared_matcher_tags_every_lexicon():
+    ArabicTextCleaner()
+    RiskDetector()
+    hits = get_shared_matcher().find('بكره حياتي')
+    assert ('emotion', 'depression') in hits
+    assert ('crisis', 'crisis') in hits
+
+
+def test_keywords_and_text_are_normalized_alike():
+    cleaner = ArabicTextCleaner()
+    # 'تعبان نفسياً' فيها تنوين يُحذف عند تنظيف النص
+    assert cleaner.detect_emotion_keywords(cleaner.clean_text('أنا تعبان نفسياً')) == ['depression']
+    hits = get_shared_matcher().find('انا عايز اموت')
+    assert hits[('crisis', 'crisis')] == ['أموت']
+
+
+def test_artifact_round_trip(tmp_path):
+    ArabicTextCleaner()
+    path = tmp_path / 'lexicons.json'
+    compiled = lexicon_store.save_artifact(path)
+    loaded = lexicon_store.load_artifact(path)
+    assert loaded['version'] == compiled['version']
+    assert 'قلقان' in loaded['matcher'].find('قلقان')[('emotion', 'anxiety')]
+    assert loaded['rewriters']['egyptian_to_standard'].rewrite('مش عارف') == 'لا عارف'
+
+
+def test_stale_artifact_is_rejected(tmp_path, monkeypatch):
+    path = tmp_path / 'lexicons.json'
+    lexicon_store.save_artifact(path)
+    monkeypatch.setitem(lexicon_store._KEYWORD_LEXICONS, 'emotion', {'anxiety': ['جديد']})
+    assert lexicon_store.load_artifact(path) is None
+    assert lexicon_store.load_artifact(tmp_path / 'missing.json') is None
+
+
+def test_artifact_is_plain_data_tied_to_code(tmp_path, monkeypatch):
+    ArabicTextCleaner()
+    path = tmp_path / 'lexicons.json'
+    lexicon_store.save_artifact(path)
+    data = json.loads(path.read_text(encoding='utf-8'))
+    assert data['code'] == lexicon_store._code_version()
+    # ملف بُني بكود مطابقة مختلف يُرفض ويُعاد البناء
+    monkeypatch.setattr(lexicon_store, '_code_version', lambda: 'other')
+    assert lexicon_store.load_artifact(path) is None
@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+
+from utils.micro_batcher import MicroBatcher, get_micro_batcher
+
+
+def test_concurrent_requests_share_one_batch():
+    calls = []
+
+    def double(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(double, max_batch_size=8, max_wait_ms=200)
+    start = threading.Barrier(8)
+    results = {}
+
+    def worker(i):
+        start.wait()
+        results[i] = batcher(i, timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+
+    assert results == {i: i * 2 for i in range(8)}
+    assert len(calls) < 8
+    stats = batcher.stats()
+    assert stats['submitted'] == 8
+    assert sum(size * n for size, n in stats['batch_size_histogram'].items()) == 8
+    assert stats['avg_batch_size'] > 1
+
+
+def test_batch_size_is_capped_and_wait_is_bounded():
+    batcher = MicroBatcher(lambda items: items, max_batch_size=3, max_wait_ms=20)
+    futures = [batcher.submit(i) for i in range(7)]
+    assert [f.result(timeout=5) for f in futures] == list(range(7))
+    batcher.close()
+    stats = batcher.stats()
+    assert max(stats['batch_size_histogram']) <= 3
+    # انتظار واحد لا يتجاوز المهلة كثيراً
+    started = time.perf_counter()
+    single = MicroBatcher(lambda items: items, max_batch_size=10, max_wait_ms=20)
+    assert single('x', timeout=5) == 'x'
+    assert time.perf_counter() - started < 1
+    assert single.stats()['avg_wait_ms'] >= 15
+    single.close()
+
+
+def test_batch_errors_propagate_to_every_caller():
+    def fail(items):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(fail, max_batch_size=4, max_wait_ms=10)
+    futures = [batcher.submit(i) for i in range(3)]
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result(timeout=5)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(1)
+
+
+def test_short_result_list_fails_every_caller_instead_of_hanging():
+    batcher = MicroBatcher(lambda items: items[:1], max_batch_size=4, max_wait_ms=50)
+    futures = [batcher.submit(i) for i in range(3)]
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result(timeout=5)
+    batcher.close()
+
+
+def test_call_uses_default_timeout():
+    release = threading.Event()
+
+    def slow(items):
+        release.wait(5)
+        return items
+
+    batcher = MicroBatcher(slow, max_wait_ms=1, timeout=0.05)
+    with pytest.raises(TimeoutError):
+        batcher('x')
+    release.set()
+    batcher.close()
+
+
+def test_shared_batcher_uses_latest_fn():
+    class Backend:
+        def __init__(self, offset):
+            self.offset = offset
+
+        def predict(self, items):
+            return [item + self.offset for item in items]
+
+    key = ('test', 'reloaded-model')
+    first = get_micro_batcher(key, Backend(1).predict, max_wait_ms=1)
+    assert first(1, timeout=5) == 2
+    second = get_micro_batcher(key, Backend(10).predict, max_wait_ms=1)
+    assert second is first
+    assert second(1, timeout=5) == 11
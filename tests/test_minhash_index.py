@@ -0,0 +1,53 @@
+from benchmarks.bench_minhash import run
+from utils.minhash_index import MinHashIndex
+from utils.response_cache import NearDuplicateCache, is_spelling_variant
+
+
+def test_index_finds_spelling_variant_only_with_same_tag():
+    index = MinHashIndex()
+    index.add('قلقان اوي', 'رد القلق', tag='anxiety')
+    index.add('انا جعان', 'رد الجوع', tag='anxiety')
+
+    found = index.query('قلقانه قوي', tag='anxiety')
+    assert [value for _, value in found] == ['رد القلق']
+    assert 0.5 <= found[0][0] < 1
+    assert index.query('قلقانه قوي', tag='neutral') == []
+    assert index.query('انا تعبان', tag='anxiety') == []
+
+
+def test_eviction_keeps_index_bounded():
+    index = MinHashIndex(max_entries=50)
+    for i in range(200):
+        index.add(f'رساله رقم {i} عن يوم {i * 7}', i)
+    assert len(index) == 50 and index.stats()['evictions'] == 150
+    assert all(value >= 150 for _, value in index.query('رساله رقم 3 عن يوم 21'))
+    assert index.query('رساله رقم 199 عن يوم 1393')[0][1] == 199
+    # الـ Buckets لا تحتفظ بمعرفات الرسائل المحذوفة
+    assert all(entry_id in index._entries for buckets in index._buckets
+               for bucket in buckets.values() for entry_id in bucket)
+
+
+def test_spelling_variant_check():
+    assert is_spelling_variant('قلقانه قوي', 'قلقان اوي')
+    assert not is_spelling_variant('خايف عايز', 'خايف')
+    assert not is_spelling_variant('حقا النهارده', 'النهارده لا')
+
+
+def test_near_duplicate_cache_policy():
+    cache = NearDuplicateCache()
+    cache.put('قلقان اوي', 'anxiety', '', 'خدي نفس عميق')
+    cache.put('انا مبسوط', 'happiness', '', 'يا سلام')
+
+    assert cache.get('قلقانه قوي!', 'anxiety') == 'خدي نفس عميق'
+    assert cache.get('قلقان اوي', 'anxiety') is None  # المطابقة التامة لـ ResponseCache
+    assert cache.get('قلقانه قوي', 'anxiety', 'المستخدم: اهلا\n') is None
+    assert cache.get('انا مش مبسوط', 'happiness') is None
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['api_calls_saved'] == 1 and stats['entries'] == 2
+
+
+def test_benchmark_precision_recall_and_speed():
+    result = run(size=500, queries=400, threshold=0.5)
+    assert result['precision'] >= 0.9
+    assert result['recall'] >= 0.8
+    assert result['avg_candidates'] < 50
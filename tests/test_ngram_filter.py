@@ -0,0 +1,117 @@
+import random
+import re
+
+from benchmarks.corpus import generate_corpus
+from utils.ngram_filter import NgramPrefilter, literal_expansions, required_literals
+from utils.risk_detector import CRISIS_KEYWORDS, HIGH_RISK_PATTERNS, RiskDetector
+from utils.risk_matcher import RiskMatcher
+from utils.text_cleaner import ARABIC_NORMALIZE_TABLE
+
+# أشكال كل حرف قبل التطبيع (لتوليد النص كما قد يكتبه المستخدم)
+SPELLINGS = {'ا': 'اأإآ', 'أ': 'اأإآ', 'ي': 'يى', 'ى': 'يى', 'ه': 'هة', 'ة': 'هة'}
+
+
+def expand_groups(pattern):
+    """كل النصوص التي يطابقها نمط مكون من حروف ومجموعات بدائل فقط"""
+    match = re.search(r'\(([^()]*)\)', pattern)
+    if match is None:
+        return [pattern]
+    return [expanded
+            for option in match.group(1).split('|')
+            for expanded in expand_groups(pattern[:match.start()] + option + pattern[match.end():])]
+
+
+def spelling_variants(text, rng, count=5):
+    variants = [text, text.upper()]
+    for _ in range(count):
+        chars = [rng.choice(SPELLINGS.get(char, char)) for char in text]
+        # تشكيل عشوائي بين الحروف
+        variants.append(''.join(char + (rng.choice('ًَُِّْ') if rng.random() < 0.3 else '') for char in chars))
+    return variants
+
+
+def lexicon_texts(rng):
+    phrases = list(CRISIS_KEYWORDS)
+    for pattern in HIGH_RISK_PATTERNS:
+        expansions = expand_groups(pattern)
+        assert all(re.fullmatch(pattern, text) for text in expansions)
+        phrases += expansions
+    fillers = generate_corpus(50, seed=1)
+    for phrase in phrases:
+        for variant in spelling_variants(phrase, rng):
+            yield variant
+            yield f"{rng.choice(fillers)} {variant}"
+            yield f"{rng.choice(fillers)}{variant}{rng.choice(fillers)}"
+
+
+def test_required_literals():
+    assert required_literals(r'(عايز|عاوز) (أموت|أنتحر)') == {'عايز أموت', 'عايز أنتحر', 'عاوز أموت', 'عاوز أنتحر'}
+    assert required_literals(r'x{1,2}y[ab]') == {'xya', 'xyb', 'xxya', 'xxyb'}
+    assert required_literals(r'.*foo\w+barbaz') == {'barbaz'}
+    assert required_literals(r'\w+') is None
+    assert required_literals(r'(?i)abc') is None
+
+
+def test_literal_expansions():
+    assert literal_expansions(r'(عايز|عاوز) أموت') == {'عايز أموت', 'عاوز أموت'}
+    assert literal_expansions(r'x{1,2}y') == {'xy', 'xxy'}
+    assert literal_expansions(r'\bfoo') is None
+    assert literal_expansions(r'a?') is None
+    assert literal_expansions(r'.*foo') is None
+
+
+def test_no_false_negatives_over_full_lexicon():
+    rng = random.Random(11)
+    matcher = RiskDetector().matcher
+    assert matcher.prefilter is not None
+    for text in lexicon_texts(rng):
+        if matcher.regex.search(matcher.normalize(text)):
+            assert matcher.prefilter.might_match(text), text
+
+
+def test_detect_risk_unchanged_by_prefilter():
+    detector = RiskDetector()
+    matcher = detector.matcher
+    texts = list(lexicon_texts(random.Random(12))) + generate_corpus(500, seed=3)
+    with_filter = [detector.detect_risk(text) for text in texts]
+    prefilter, matcher.prefilter = matcher.prefilter, None
+    try:
+        without_filter = [detector.detect_risk(text) for text in texts]
+    finally:
+        matcher.prefilter = prefilter
+    assert with_filter == without_filter
+
+
+def test_rejects_ordinary_messages():
+    matcher = RiskDetector().matcher
+    for text in ['يومي كان حلو الحمد لله', 'انا مبسوط النهارده', 'I had a great day', '']:
+        assert not matcher.prefilter.might_match(text)
+    assert matcher.prefilter.might_match('I want to DIE')
+
+
+def test_random_keywords_never_missed():
+    rng = random.Random(4)
+    alphabet = 'ابتثجحأى ةه'
+    keywords = {''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 7))) for _ in range(60)}
+    matcher = RiskMatcher([], [(k, 'medium') for k in keywords], ARABIC_NORMALIZE_TABLE, prefilter=False)
+    prefilter = NgramPrefilter(keywords, ARABIC_NORMALIZE_TABLE)
+    for _ in range(2000):
+        text = ''.join(rng.choice(alphabet + 'ًَإآ') for _ in range(rng.randint(0, 30)))
+        if matcher.scan(text):
+            assert prefilter.might_match(text), text
+
+
+def test_case_folding_never_missed():
+    # حروف كبيرة غير الحرف المقابل المعتاد (K علامة كلفن، Σ في آخر الكلمة تصبح ς)
+    keywords = ['kill', 'ασ', 'ας']
+    matcher = RiskMatcher([], [(k, 'medium') for k in keywords], prefilter=False)
+    prefilter = NgramPrefilter(keywords)
+    for text in ['\u212aILL', 'ΑΣ', 'ΑΣΑ', 'Kill']:
+        assert matcher.scan(text), text
+        assert prefilter.might_match(text), text
+
+
+def test_pattern_without_literals_disables_prefilter():
+    matcher = RiskMatcher([(r'\w+', 'high')], [('أموت', 'medium')])
+    assert matcher.prefilter is None
+    assert matcher.scan('بيت')
@@ -0,0 +1,62 @@
+import random
+
+from utils.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, backoff_delay
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=FakeClock())
+    breaker.record_failure()
+    breaker.record_success()
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    stats = breaker.stats()
+    assert stats['opens'] == 1 and stats['rejected'] == 1 and stats['failures'] == 4
+
+
+def test_half_open_allows_one_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    # فشل الطلب التجريبي يعيد الفتح فوراً
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.stats()['opens'] == 2
+
+    clock.now = 20
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow_request()
+
+
+def test_cancelled_probe_frees_half_open_slot():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=1, clock=clock)
+    breaker.record_failure()
+    clock.now = 1
+    assert breaker.allow_request()
+    breaker.record_cancelled()
+    assert breaker.allow_request()
+
+
+def test_backoff_is_jittered_and_capped():
+    rng = random.Random(3)
+    delays = [backoff_delay(attempt, base=0.5, cap=2.0, rng=rng) for attempt in range(6) for _ in range(50)]
+    assert all(0 <= delay <= 2.0 for delay in delays)
+    assert len(set(delays)) == len(delays)
+    assert max(backoff_delay(0, base=0.5, cap=2.0, rng=rng) for _ in range(50)) <= 0.5
@@ -0,0 +1,70 @@
+import random
+import time
+
+from utils.response_cache import ResponseCache, normalize_message
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_normalized_openers_share_a_key():
+    cache = ResponseCache()
+    assert normalize_message('  صباح   الفل!! 🌞') == 'صباح الفل'
+    key = cache.make_key('صباح الفل', 'happiness')
+    assert cache.make_key('صباح الفل 😊', 'happiness') == key
+    assert cache.make_key('إزيك؟', 'neutral') == cache.make_key('ازيك', 'neutral')
+    assert cache.make_key('صباح الفل', 'neutral') != key
+    assert cache.make_key('صباح الفل', 'happiness', 'المستخدم: اهلا\n') != key
+
+
+def test_long_and_empty_messages_are_not_cached():
+    cache = ResponseCache(max_chars=10)
+    assert cache.make_key('!!!', 'neutral') is None
+    assert cache.make_key('رسالة طويلة جداً عن يومي', 'neutral') is None
+    assert cache.get(None) is None and cache.stats()['misses'] == 0
+
+
+def test_hits_after_variant_pool_fills_and_rotate():
+    cache = ResponseCache(variants=3, rng=random.Random(1))
+    key = cache.make_key('صباح الفل', 'happiness')
+    for reply in ('صباح النور', 'صباح الورد', 'صباح الياسمين'):
+        assert cache.get(key) is None
+        cache.put(key, reply)
+    cache.put(key, 'رد رابع لا يُضاف')
+
+    served = [cache.get(key) for _ in range(30)]
+    assert set(served) == {'صباح النور', 'صباح الورد', 'صباح الياسمين'}
+    assert all(a != b for a, b in zip(served, served[1:]))
+    stats = cache.stats()
+    assert stats['hits'] == 30 and stats['api_calls_saved'] == 30 and stats['misses'] == 3
+    assert stats['avg_hit_ms'] < 1
+
+
+def test_ttl_and_lru_eviction():
+    clock = FakeClock()
+    cache = ResponseCache(max_entries=2, ttl=10, variants=1, clock=clock)
+    keys = [cache.make_key(text, 'neutral') for text in ('اهلا', 'ازيك', 'مساء الخير')]
+    cache.put(keys[0], 'أهلاً بيك')
+    cache.put(keys[1], 'الحمد لله')
+    assert cache.get(keys[0]) == 'أهلاً بيك'
+    cache.put(keys[2], 'مساء النور')
+    assert cache.get(keys[1]) is None and cache.stats()['evictions'] == 1
+
+    clock.now = 10
+    assert cache.get(keys[0]) is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_hit_is_sub_millisecond():
+    cache = ResponseCache(variants=1)
+    key = cache.make_key('صباح الفل', 'happiness')
+    cache.put(key, 'صباح النور')
+    started = time.perf_counter()
+    for _ in range(1000):
+        cache.get(key)
+    assert (time.perf_counter() - started) / 1000 < 0.001
@@ -43,3 +43,213 @@ def test_generate_ai_response_failure(mock_model_class, response_generator):
     response = response_generator.generate_ai_response("أنا قلقان", "anxiety", "")
     assert isinstance(response, str)
     assert len(response) > 0
+
+def make_usage_response(text, prompt_tokens, reply_tokens):
+    response = MagicMock()
+    response.text = text
+    response.usage_metadata.prompt_token_count = prompt_tokens
+    response.usage_metadata.candidates_token_count = reply_tokens
+    return response
+
+@patch('google.generativeai.GenerativeModel')
+def test_model_is_built_once_with_system_instruction(mock_model_class, response_generator):
+    mock_model_class.return_value.generate_content.return_value = make_usage_response("رد", 100, 20)
+
+    response_generator.generate_ai_response("أنا قلقان", "anxiety", "")
+    response_generator.generate_ai_response("لسه قلقان", "anxiety", "")
+
+    mock_model_class.assert_called_once_with(
+        response_generator.model_name, system_instruction=response_generator.system_prompt
+    )
+    sent = mock_model_class.return_value.generate_content.call_args[0][0]
+    assert response_generator.system_prompt not in sent
+    assert "لسه قلقان" in sent
+
+@patch('google.generativeai.GenerativeModel')
+def test_chat_session_per_user_sends_only_the_turn(mock_model_class, response_generator):
+    model = mock_model_class.return_value
+    chats = {}
+
+    def start_chat(history):
+        chat = MagicMock()
+        chat.seed = history
+        chat.history = []
+        chat.send_message.return_value = make_usage_response("رد", 100, 20)
+        chats[len(chats)] = chat
+        return chat
+
+    model.start_chat.side_effect = start_chat
+    turns = [{'user': 'مرحبا', 'assistant': 'أهلاً بيك'}]
+
+    response_generator.generate_ai_response("أنا قلقان", "anxiety", "", session_id="a", turns=turns)
+    response_generator.generate_ai_response("لسه قلقان", "anxiety", "", session_id="a", turns=turns)
+    response_generator.generate_ai_response("أنا مبسوط", "happiness", "", session_id="b")
+
+    assert len(chats) == 2
+    assert chats[0].seed == [{'role': 'user', 'parts': ['مرحبا']}, {'role': 'model', 'parts': ['أهلاً بيك']}]
+    assert chats[1].seed == []
+    sent = [call[0][0] for call in chats[0].send_message.call_args_list]
+    assert sent == [response_generator.build_turn("أنا قلقان", "anxiety"),
+                    response_generator.build_turn("لسه قلقان", "anxiety")]
+
+    response_generator.end_chat("a")
+    response_generator.generate_ai_response("تاني", "neutral", "", session_id="a")
+    assert len(chats) == 3
+
+@patch('google.generativeai.GenerativeModel')
+def test_token_usage_is_recorded_against_legacy_estimate(mock_model_class, response_generator):
+    from utils.token_usage import get_token_stats
+
+    get_token_stats().reset()
+    mock_model_class.return_value.generate_content.return_value = make_usage_response("رد", 300, 40)
+    history = "المستخدم: أنا قلقان\nالمساعد: إيه اللي مقلقك؟\n"
+
+    response_generator.generate_ai_response("الامتحانات", "anxiety", history)
+
+    stats = get_token_stats().stats()
+    assert stats['turns'] == 1
+    assert stats['avg_prompt_tokens'] == 300 and stats['avg_reply_tokens'] == 40
+    assert stats['avg_legacy_prompt_tokens'] > 300
+    assert stats['modes']['stateless']['turns'] == 1
+
+class FakeStream:
+    """رد متدفق يفشل بعد عدد من الأجزاء (fail_after) إذا حُدد"""
+
+    def __init__(self, pieces, fail_after=None):
+        self.pieces = pieces
+        self.fail_after = fail_after
+        self.usage_metadata = MagicMock(prompt_token_count=50, candidates_token_count=10)
+
+    def __iter__(self):
+        for index, piece in enumerate(self.pieces):
+            if index == self.fail_after:
+                raise Exception("stream broken")
+            yield MagicMock(text=piece)
+
+@patch('google.generativeai.GenerativeModel')
+def test_stream_yields_growing_reply_and_records_timing(mock_model_class, response_generator):
+    from utils.reply_timing import get_reply_timing
+
+    get_reply_timing().reset()
+    mock_model_class.return_value.generate_content.return_value = FakeStream(["أنا ", "سامعاك", ""])
+
+    updates = list(response_generator.stream_ai_response("أنا قلقان", "anxiety", ""))
+
+    assert updates == ["أنا ", "أنا سامعاك"]
+    assert mock_model_class.return_value.generate_content.call_args[1]['stream'] is True
+    timing = get_reply_timing().stats()
+    assert timing['turns'] == 1 and timing['fallbacks'] == 0
+    assert timing['last_ttft_ms'] <= timing['last_total_ms']
+
+@patch('google.generativeai.GenerativeModel')
+def test_stream_failure_midway_ends_with_fallback(mock_model_class, response_generator):
+    from utils.reply_timing import get_reply_timing
+
+    get_reply_timing().reset()
+    mock_model_class.return_value.generate_content.return_value = FakeStream(["أنا ", "سامعاك"], fail_after=1)
+
+    updates = list(response_generator.stream_ai_response("أنا قلقان", "anxiety", ""))
+
+    assert updates[0] == "أنا "
+    assert len(updates) == 2 and updates[-1] != "أنا " and len(updates[-1]) > 0
+    assert get_reply_timing().stats()['fallbacks'] == 1
+
+def fast_retries(generator, retries=2):
+    generator.reply_retries = retries
+    generator.retry_base_delay = 0.001
+    generator.retry_max_delay = 0.001
+
+@patch('google.generativeai.GenerativeModel')
+def test_stream_retries_then_succeeds(mock_model_class, response_generator):
+    fast_retries(response_generator)
+    model = mock_model_class.return_value
+    model.generate_content.side_effect = [Exception("503"), FakeStream(["رد بعد المحاولة"])]
+
+    updates = list(response_generator.stream_ai_response("أنا قلقان", "anxiety", ""))
+
+    assert updates == ["رد بعد المحاولة"]
+    stats = response_generator.breaker.stats()
+    assert stats['retries'] == 1 and stats['failures'] == 1 and stats['state'] == 'closed'
+    # كل محاولة تنتظر فقط ما تبقى من المهلة الكلية
+    first, second = (call[1]['request_options']['timeout'] for call in model.generate_content.call_args_list)
+    assert second < first <= response_generator.reply_deadline
+
+@patch('google.generativeai.GenerativeModel')
+def test_stream_deadline_serves_fallback(mock_model_class, response_generator):
+    import time
+
+    from utils.hedged_reply import FallbackReply
+
+    def slow_failure(content, **kwargs):
+        time.sleep(0.03)
+        raise Exception("deadline exceeded")
+
+    fast_retries(response_generator, retries=10)
+    response_generator.reply_deadline = 0.05
+    model = mock_model_class.return_value
+    model.generate_content.side_effect = slow_failure
+
+    started = time.perf_counter()
+    updates = list(response_generator.stream_ai_response("أنا قلقان", "anxiety", ""))
+
+    assert time.perf_counter() - started < 1
+    assert len(updates) == 1 and isinstance(updates[0], FallbackReply)
+    assert model.generate_content.call_count <= 2
+
+@patch('google.generativeai.GenerativeModel')
+def test_open_circuit_skips_network(mock_model_class, response_generator):
+    fast_retries(response_generator, retries=0)
+    model = mock_model_class.return_value
+    model.generate_content.side_effect = Exception("503")
+    response_generator.breaker.failure_threshold = 2
+
+    for _ in range(2):
+        list(response_generator.stream_ai_response("أنا قلقان", "anxiety", ""))
+    assert response_generator.breaker.state == 'open'
+
+    updates = list(response_generator.stream_ai_response("أنا قلقان", "anxiety", ""))
+    response_generator.generate_ai_response("أنا قلقان", "anxiety", "")
+    assert len(updates) == 1 and updates[0].strip()
+    assert model.generate_content.call_count == 2
+    assert response_generator.breaker.stats()['rejected'] == 2
+
+@patch('google.generativeai.GenerativeModel')
+def test_cached_turn_is_added_to_chat_session(mock_model_class, response_generator):
+    chat = MagicMock()
+    chat.history = [{'role': 'user', 'parts': ['مرحبا']}, {'role': 'model', 'parts': ['أهلاً']}]
+    mock_model_class.return_value.start_chat.return_value = chat
+    response_generator.get_chat("a")
+
+    response_generator.record_turn("a", "صباح الفل", "happiness", "صباح النور")
+    response_generator.record_turn("missing", "صباح الفل", "happiness", "صباح النور")
+
+    assert chat.history[-1] == {'role': 'model', 'parts': ['صباح النور']}
+    assert chat.history[-2]['parts'] == [response_generator.build_turn("صباح الفل", "happiness")]
+
+def make_blocked_response():
+    response = MagicMock()
+    type(response).text = property(lambda self: (_ for _ in ()).throw(ValueError("blocked")))
+    return response
+
+@patch('google.generativeai.GenerativeModel')
+def test_sync_blocked_or_empty_reply_is_not_a_breaker_failure(mock_model_class, response_generator):
+    model = mock_model_class.return_value
+    for blocked in (make_blocked_response(), make_usage_response("  ", 10, 0)):
+        model.generate_content.return_value = blocked
+        reply = response_generator.generate_ai_response("أنا قلقان", "anxiety", "")
+        assert isinstance(reply, str) and reply.strip()
+    stats = response_generator.breaker.stats()
+    assert stats['failures'] == 0 and stats['successes'] == 2
+
+@patch('google.generativeai.GenerativeModel')
+def test_stream_blocked_or_empty_reply_is_not_a_breaker_failure(mock_model_class, response_generator):
+    fast_retries(response_generator)
+    model = mock_model_class.return_value
+    model.generate_content.side_effect = [iter([make_blocked_response()]), FakeStream([""])]
+    for _ in range(2):
+        updates = list(response_generator.stream_ai_response("أنا قلقان", "anxiety", ""))
+        assert len(updates) == 1 and updates[0].strip()
+    # الرد المحجوب لا يُعاد طلبه
+    assert model.generate_content.call_count == 2
+    stats = response_generator.breaker.stats()
+    assert stats['failures'] == 0 and stats['successes'] == 2 and stats['retries'] == 0
@@ -0,0 +1,104 @@
+import random
+import re
+
+from utils.risk_detector import CRISIS_KEYWORDS, HIGH_RISK_PATTERNS, RiskDetector
+from utils.risk_matcher import RiskMatcher
+from utils.text_cleaner import ARABIC_NORMALIZE_TABLE
+
+
+def legacy_detect_risk(text):
+    """التطبيق القديم (Regex لكل نمط ثم فحص كل كلمة) للمقارنة"""
+    text_lower = text.lower()
+    for pattern in HIGH_RISK_PATTERNS:
+        if re.search(pattern, text_lower):
+            return 'high'
+    matches = [word for word in CRISIS_KEYWORDS if word in text_lower]
+    if matches:
+        return 'high' if len(matches) > 1 else 'medium'
+    return 'none'
+
+
+def test_trie_matches_naive_substring_scan():
+    rng = random.Random(5)
+    alphabet = 'ابتثج '
+    keywords = sorted({''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 5))) for _ in range(200)})
+    matcher = RiskMatcher([], [(k, 'medium') for k in keywords])
+
+    for _ in range(200):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        found = {word for word, _, _ in matcher.scan(text)}
+        assert found == {k for k in keywords if k in text}
+
+
+def test_normalized_spellings_match():
+    detector = RiskDetector()
+    assert detector.detect_risk('انا عايز اموت')['level'] == 'high'
+    assert detector.detect_risk('حياتى ملهاش قيمه')['level'] == 'high'
+    assert detector.detect_risk('هروح أقتل نفسى')['level'] == 'medium'
+    assert detector.detect_risk('I want to DIE')['level'] == 'medium'
+
+
+def test_matches_report_name_and_severity():
+    matcher = RiskMatcher(
+        [(r'عايز (أموت|انتحر)', 'high')],
+        [('أموت', 'medium'), ('اموت', 'medium'), ('يأس', 'low')],
+        ARABIC_NORMALIZE_TABLE
+    )
+    found = matcher.scan('أنا عايز اموت من اليأس')
+    assert found == [
+        (r'عايز (أموت|انتحر)', 'high', 'pattern'),
+        ('أموت', 'medium', 'keyword'),
+        ('اموت', 'medium', 'keyword'),
+        ('يأس', 'low', 'keyword'),
+    ]
+
+
+def test_pattern_and_keyword_at_same_position_are_both_reported():
+    matches = RiskDetector().detect_risk('مش عايز أعيش')['matches']
+    kinds = {(name, kind) for name, _, kind in matches}
+    assert ('مش عايز أعيش', 'keyword') in kinds
+    assert any(kind == 'pattern' for _, kind in kinds)
+
+    matcher = RiskMatcher([(r'عايز', 'high'), (r'عايز \w+', 'high')], [('عايز', 'medium')])
+    assert [kind for _, _, kind in matcher.scan('عايز اموت')] == ['pattern', 'pattern', 'keyword']
+
+
+def test_detect_risk_matches_legacy_on_original_spellings():
+    detector = RiskDetector()
+    texts = list(CRISIS_KEYWORDS) + [
+        'انا عايز أموت', 'هقتل نفسي', 'حياتي ملهاش معنى', 'مفيش أمل خلاص ومش عايز أعيش',
+        'يومي كان حلو', 'I want to die', 'أنهي حياتي وأموت', ''
+    ]
+    for text in texts:
+        result = detector.detect_risk(text)
+        assert result['level'] == legacy_detect_risk(text), text
+        assert result['is_risk'] == (result['level'] != 'none')
+
+
+def test_matcher_rebuilt_only_when_lexicon_changes():
+    detector = RiskDetector()
+    matcher = detector.matcher
+    detector.detect_risk('يومي كان حلو')
+    assert detector.matcher is matcher
+
+    detector.crisis_keywords = CRISIS_KEYWORDS + ['مخنوق']
+    assert detector.matcher is not matcher
+    assert detector.detect_risk('انا مخنوق')['level'] == 'medium'
+
+    detector.high_risk_patterns = [r'مخنوق جدا']
+    assert detector.detect_risk('انا مخنوق جدا')['level'] == 'high'
+
+
+def test_finite_patterns_match_like_regex_search():
+    rng = random.Random(9)
+    alphabet = 'ابتث '
+
+    def word():
+        return ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 3)))
+
+    patterns = [f'({word()}|{word()}){word()}' for _ in range(40)] + [r'ب\w+ت']
+    matcher = RiskMatcher([(p, 'high') for p in patterns], [(word(), 'medium') for _ in range(10)])
+    for _ in range(300):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 20)))
+        found = {name for name, _, kind in matcher.scan(text) if kind == 'pattern'}
+        assert found == {p for p in patterns if re.search(p, text)}, text
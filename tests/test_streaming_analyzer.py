@@ -0,0 +1,73 @@
+import time
+
+from emotion_model import EmotionDetector
+from utils.risk_detector import RiskDetector
+from utils.streaming_analyzer import StreamingAnalyzer, split_sentences
+
+
+def test_split_sentences_handles_arabic_punctuation_and_long_runs():
+    text = "أنا قلقان. مش عارف أنام؟ الشغل كتير؛ والدنيا زحمة\nبس الحمد لله!"
+    assert list(split_sentences(text)) == [
+        "أنا قلقان.", "مش عارف أنام؟", "الشغل كتير؛", "والدنيا زحمة", "بس الحمد لله!"
+    ]
+    chunks = list(split_sentences("كلمة " * 1000, max_chars=50))
+    assert all(len(chunk) <= 50 for chunk in chunks)
+    assert len(list(split_sentences("جملة. " * 10000, max_sentences=5))) == 5
+
+
+def test_per_sentence_breakdown_and_distribution():
+    analyzer = StreamingAnalyzer(EmotionDetector())
+    result = analyzer.analyze("أنا قلقان جدا. ذهب أحمد إلى المدرسة. أنا خايف ومتوتر")
+    assert [s['emotion'] for s in result['sentences']] == ['anxiety', 'neutral', 'anxiety']
+    assert result['emotion'] == 'anxiety'
+    assert result['distribution'] == {'anxiety': 1.0}
+    assert result['stop_reason'] is None
+
+
+def test_stops_once_label_is_settled():
+    analyzer = StreamingAnalyzer(EmotionDetector(), max_sentences=20)
+    result = analyzer.analyze("أنا قلقان جدا. " * 10)
+    # بعد 6 جمل قلق: الفرق 6 أكبر من الجمل المتبقية (4)
+    assert result['stop_reason'] == 'settled'
+    assert len(result['sentences']) == 6
+
+
+def test_stops_immediately_on_confirmed_risk():
+    analyzer = StreamingAnalyzer(EmotionDetector(), RiskDetector())
+    text = "اليوم كان صعب. أنا عايز أموت. " + "أنا مبسوط. " * 50
+    result = analyzer.analyze(text)
+    assert result['stop_reason'] == 'risk'
+    assert result['risk']['level'] == 'high'
+    assert len(result['sentences']) == 2
+    assert result['sentences'][1]['risk_level'] == 'high'
+
+
+def test_risk_after_settle_point_is_still_detected():
+    analyzer = StreamingAnalyzer(EmotionDetector(), RiskDetector())
+    result = analyzer.analyze("أنا قلقان جدا. " * 7 + "أنا عايز أموت.")
+    assert result['stop_reason'] == 'settled'
+    assert len(result['sentences']) == 5
+    assert result['risk']['level'] == 'high'
+
+    limited = StreamingAnalyzer(EmotionDetector(), RiskDetector(), max_sentences=3)
+    result = limited.analyze("ذهب أحمد إلى المدرسة. " * 5 + "أنا عايز أموت.")
+    assert result['stop_reason'] == 'limit'
+    assert result['risk']['level'] == 'high'
+
+
+def test_latency_is_bounded_by_sentence_limit():
+    detector = EmotionDetector()
+    analyzer = StreamingAnalyzer(detector, max_sentences=10)
+    huge = "ذهب أحمد إلى المدرسة. " * 200000
+    started = time.perf_counter()
+    result = analyzer.analyze(huge)
+    assert time.perf_counter() - started < 1
+    assert len(result['sentences']) == 10
+    assert result['stop_reason'] == 'limit'
+
+
+def test_detector_streaming_result_matches_detect_emotion_shape():
+    result = EmotionDetector().detect_emotion_streaming("أنا حزين. أنا مكتئب ومش قادر.")
+    assert result['emotion'] == 'depression'
+    assert result['source'] == 'Sentence Analysis'
+    assert result['description_ar'] == 'حالة حزن واكتئاب'
@@ -0,0 +1,94 @@
+import json
+from pathlib import Path
+
+import pytest
+
+emoji = pytest.importorskip('emoji')
+
+from benchmarks.bench_text_cleaner import legacy_clean_text
+from benchmarks.corpus import generate_corpus
+from utils import text_cleaner
+from utils.dialect_rewriter import DialectRewriter
+from utils.text_cleaner import ArabicTextCleaner
+
+
+@pytest.fixture
+def cleaner():
+    return ArabicTextCleaner()
+
+
+def test_clean_text_matches_legacy_on_corpus(cleaner):
+    for text in generate_corpus(3000, seed=7):
+        assert cleaner.clean_text(text) == legacy_clean_text(text)
+
+
+def test_clean_text_matches_legacy_on_every_emoji(cleaner):
+    for e in emoji.unicode_codes.EMOJI_UNICODE['en'].values():
+        text = f"أنا {e}زهقان{e} 12"
+        assert cleaner.clean_text(text) == legacy_clean_text(text)
+
+
+def test_clean_text_matches_legacy_on_every_bmp_char(cleaner):
+    chars = ''.join(chr(i) for i in range(0x10000) if not 0xD800 <= i <= 0xDFFF)
+    for i in range(0, len(chars), 500):
+        text = f" إِنتَ {chars[i:i + 500]} مستشفى ة "
+        assert cleaner.clean_text(text) == legacy_clean_text(text)
+
+
+def test_remove_emojis_matches_emoji_package(cleaner):
+    mood_history = Path(__file__).resolve().parent.parent / 'data' / 'mood_history.json'
+    texts = [entry['user_text'] for entry in json.loads(mood_history.read_text(encoding='utf-8'))]
+    texts += generate_corpus(2000, seed=13)
+    texts += [f"ا{e}ب {e}{e} 1{e}‍x" for e in emoji.unicode_codes.EMOJI_UNICODE['en'].values()]
+    for text in texts:
+        assert cleaner.remove_emojis(text) == emoji.replace_emoji(text, replace='')
+
+
+def test_normalize_arabic(cleaner):
+    assert cleaner.normalize_arabic("أإآى ة مُتعَب") == "اااي ه متعب"
+
+
+def test_map_egyptian_to_standard_matches_word_lookup(cleaner):
+    for text in generate_corpus(500, seed=11):
+        text = cleaner.clean_text(text)
+        mapping = {k.translate(text_cleaner.ARABIC_NORMALIZE_TABLE): v for k, v in cleaner.egyptian_to_standard.items()}
+        expected = ' '.join(mapping.get(w, w) for w in text.split())
+        assert cleaner.map_egyptian_to_standard(text) == expected
+
+
+def test_dialect_rewriter_longest_phrase_and_whole_words():
+    rewriter = DialectRewriter({'مش': 'لا', 'مش عارف': 'لا أعرف', 'ده': 'هذا'})
+    assert rewriter.rewrite('انا مش عارف ده') == 'انا لا أعرف هذا'
+    # لا يتم الاستبدال داخل كلمات أخرى ولا عبر علامات الترقيم
+    assert rewriter.rewrite('مشكلة ده، مش، عارف') == 'مشكلة هذا، لا، عارف'
+
+
+def test_dialect_keys_match_normalized_text(cleaner):
+    # مفاتيح فيها ة/أ/ى تُطبع مثل النص المنظف
+    assert 'حاجة' in cleaner.egyptian_to_standard
+    standard = cleaner.preprocess_for_model('عايز حاجة كدة دلوقتي', keep_egyptian=False)
+    assert 'حاجه' not in standard.split()
+    rewriter = DialectRewriter({'مرة': 'أحياناً'}, text_cleaner.ARABIC_NORMALIZE_TABLE)
+    assert rewriter.rewrite('مره واحده') == 'أحياناً واحده'
+
+
+def test_dialect_rewriter_word_fast_path_matches_regex(cleaner):
+    rewriter = DialectRewriter({'مش': 'لا', 'مش عارف': 'لا أعرف', 'حاجة': 'شيء'},
+                               text_cleaner.ARABIC_NORMALIZE_TABLE)
+    # نص منظف (المسار السريع) ونص خام فيه تشكيل وهمزات وترقيم (مسار الـ Regex)
+    for text in ['مش حاجه خالص', 'حاجه مش', 'مش  عارف', 'مشكله حاجات', 'مشً حاجة، مش\tعارف']:
+        assert rewriter.rewrite(text) == rewriter.regex.sub(rewriter._replace, ' ' + text)[1:]
+    assert rewriter.rewrite('مش حاجه خالص') == 'لا شيء خالص'
+    assert rewriter.rewrite('مشً حاجة، مش\tعارف') == 'لا شيء، لا أعرف'
+
+
+def test_clean_many_inline_preserves_order(cleaner):
+    corpus = generate_corpus(200, seed=5)
+    assert list(cleaner.clean_many(corpus, workers=4)) == [cleaner.clean_text(t) for t in corpus]
+
+
+def test_clean_many_process_pool_preserves_order(cleaner, monkeypatch):
+    monkeypatch.setattr(text_cleaner, 'PARALLEL_MIN_ITEMS', 100)
+    corpus = generate_corpus(1000, seed=9)
+    result = cleaner.clean_many(iter(corpus), workers=2, chunksize=64, keep_egyptian=False)
+    assert list(result) == [cleaner.preprocess_for_model(t, keep_egyptian=False) for t in corpus]
@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+
+from utils.warmup import READY, REFRESHING, ResourceHolder, WarmupManager
+
+
+def test_cold_get_waits_for_background_load():
+    holder = ResourceHolder('model', lambda: {'loaded': True})
+    assert holder.status()['state'] == 'cold'
+    assert holder.get() == {'loaded': True}
+    assert holder.status()['state'] == READY
+
+
+def test_expired_resource_is_served_stale_while_reloading():
+    release = threading.Event()
+    versions = iter(range(10))
+
+    def loader():
+        version = next(versions)
+        if version > 0:
+            release.wait(5)
+        return version
+
+    holder = ResourceHolder('model', loader, ttl=0.05)
+    assert holder.get() == 0
+    time.sleep(0.06)
+
+    # النسخة القديمة تُرجع فوراً بينما التحديث جارٍ في الخلفية
+    started = time.perf_counter()
+    assert holder.get() == 0
+    assert time.perf_counter() - started < 0.5
+    assert holder.status()['state'] == REFRESHING
+    assert holder.get() == 0
+
+    release.set()
+    deadline = time.time() + 5
+    while holder.status()['state'] != READY and time.time() < deadline:
+        time.sleep(0.01)
+    assert holder.get() == 1
+    assert holder.status()['reloads'] == 1
+
+
+def test_failed_reload_keeps_previous_value():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        if len(calls) > 1:
+            raise RuntimeError("reload failed")
+        return 'v1'
+
+    holder = ResourceHolder('model', loader, ttl=0)
+    assert holder.get() == 'v1'
+    assert holder.get() == 'v1'
+    deadline = time.time() + 5
+    while holder.status()['error'] is None and time.time() < deadline:
+        time.sleep(0.01)
+    assert holder.get() == 'v1'
+    assert holder.status()['error'] == 'reload failed'
+
+
+def test_cold_failure_raises_loader_error():
+    def loader():
+        raise ValueError("no model")
+
+    holder = ResourceHolder('model', loader)
+    with pytest.raises(ValueError):
+        holder.get()
+    assert holder.status()['state'] == 'failed'
+
+
+def test_manager_warms_registered_resources_and_exercises_them():
+    exercised = []
+    manager = WarmupManager()
+    manager.register('a', lambda: 'A', exercise=exercised.append)
+    manager.register('b', lambda: 'B')
+    # التسجيل المتكرر (مع كل تشغيل للسكريبت) لا يستبدل المورد
+    manager.register('a', lambda: 'other')
+    manager.start()
+    manager.start()
+
+    deadline = time.time() + 5
+    while not manager.is_ready() and time.time() < deadline:
+        time.sleep(0.01)
+    assert manager.readiness() == {'a': READY, 'b': READY}
+    assert manager.get('a') == 'A'
+    assert exercised == ['A']
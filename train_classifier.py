@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+تدريب المصنف الخطي المحلي وتقييمه (models/emotion_linear.npz)
+
+الاستخدام:
+    python train_classifier.py train [--data ملف.csv ...]
+    python train_classifier.py report [--folds 5]
+
+ملفات البيانات بصيغة docs/data/dataset.csv (الأعمدة: text, emotion)
+"""
+
+import argparse
+import csv
+import random
+import time
+from pathlib import Path
+
+from emotion_model import EMOTION_LABELS, LINEAR_MODEL_PATH, EmotionDetector
+from utils.linear_classifier import LinearEmotionClassifier
+
+DEFAULT_DATA = Path(__file__).resolve().parent / "docs" / "data" / "dataset.csv"
+
+
+def load_examples(paths):
+    """قراءة النصوص والحالات من ملفات CSV (تُتجاهل الحالات غير المعروفة)"""
+    texts, labels = [], []
+    for path in paths:
+        with open(path, encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                label = (row.get('emotion') or '').strip()
+                if label in EMOTION_LABELS and row.get('text', '').strip():
+                    texts.append(row['text'])
+                    labels.append(label)
+    return texts, labels
+
+
+def stratified_folds(labels, folds, seed=42):
+    """توزيع الأمثلة على Folds مع الحفاظ على نسبة كل حالة"""
+    by_label = {}
+    for index, label in enumerate(labels):
+        by_label.setdefault(label, []).append(index)
+    assignment = [0] * len(labels)
+    rng = random.Random(seed)
+    for indices in by_label.values():
+        rng.shuffle(indices)
+        for position, index in enumerate(indices):
+            assignment[index] = position % folds
+    return assignment
+
+
+def mean_latency(func, texts):
+    """متوسط زمن الرسالة بالميكروثانية"""
+    start = time.perf_counter()
+    for text in texts:
+        func(text)
+    return (time.perf_counter() - start) / len(texts) * 1e6
+
+
+def train(args):
+    detector = EmotionDetector()
+    texts, labels = load_examples(args.data)
+    cleaned = [detector.text_cleaner.preprocess_for_model(t) for t in texts]
+    classifier = LinearEmotionClassifier.train(cleaned, labels, epochs=args.epochs)
+    args.output.parent.mkdir(exist_ok=True)
+    classifier.save(args.output)
+    print(f"✅ {args.output} | {len(texts)} examples | classes: {', '.join(classifier.classes)}")
+
+
+def report(args):
+    detector = EmotionDetector()
+    texts, labels = load_examples(args.data)
+    cleaned = [detector.text_cleaner.preprocess_for_model(t) for t in texts]
+    assignment = stratified_folds(labels, args.folds)
+
+    correct = {'linear': 0, 'keywords': 0}
+    latency = {'linear': [], 'keywords': []}
+    for fold in range(args.folds):
+        train_idx = [i for i, f in enumerate(assignment) if f != fold]
+        test_idx = [i for i, f in enumerate(assignment) if f == fold]
+        if not test_idx:
+            continue
+        classifier = LinearEmotionClassifier.train(
+            [cleaned[i] for i in train_idx], [labels[i] for i in train_idx], epochs=args.epochs
+        )
+        held_out = [cleaned[i] for i in test_idx]
+        backends = {'linear': classifier.predict, 'keywords': detector.analyze_with_keywords}
+        for name, predict in backends.items():
+            correct[name] += sum(predict(cleaned[i])[0] == labels[i] for i in test_idx)
+            latency[name].append(mean_latency(predict, held_out))
+
+    print(f"Examples: {len(texts)} | {args.folds}-fold cross-validation")
+    for name in ('keywords', 'linear'):
+        accuracy = correct[name] / len(texts)
+        per_message = sum(latency[name]) / len(latency[name])
+        print(f"{name:>9}: accuracy {accuracy:6.1%} | {per_message:8.1f} µs/msg")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="المصنف الخطي المحلي للمشاعر")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for name, func in [('train', train), ('report', report)]:
+        sub = subparsers.add_parser(name)
+        sub.add_argument('--data', type=Path, nargs='+', default=[DEFAULT_DATA])
+        sub.add_argument('--epochs', type=int, default=300)
+        sub.set_defaults(func=func)
+    subparsers.choices['train'].add_argument('--output', type=Path, default=LINEAR_MODEL_PATH)
+    subparsers.choices['report'].add_argument('--folds', type=int, default=5)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ Utils Package
 أدوات مساعدة للمشروع
 """
 
-from .text_cleaner import ArabicTextCleaner, clean_arabic_text
+from .text_cleaner import ArabicTextCleaner, clean_arabic_text, clean_many
 
-__all__ = ['ArabicTextCleaner', 'clean_arabic_text']
+__all__ = ['ArabicTextCleaner', 'clean_arabic_text', 'clean_many']
 __version__ = '1.0.0'
\ No newline at end of file
@@ -0,0 +1,114 @@
+"""
+Cache مشترك لنتائج تحليل النصوص (Content-Addressed LRU)
+Streamlit يعيد تشغيل السكريبت مع كل تفاعل، فنفس النصوص (التحيات، الرسائل
+المكررة، إعادة عرض السجل) تُحلل مرة واحدة فقط على مستوى العملية كلها
+المفتاح = Hash للنص الخام + إصدار القواميس + معاملات الدالة
+"""
+
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+from .lexicon_store import lexicon_version
+
+
+def _estimate_size(value):
+    """تقدير تقريبي لحجم القيمة بالبايت"""
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            _estimate_size(k) + _estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class AnalysisCache:
+    def __init__(self, max_bytes, enabled=True):
+        """
+        Args:
+            max_bytes: الحد الأقصى لحجم الـ Cache بالبايت (تُحذف الأقدم استخداماً)
+            enabled: تعطيل الـ Cache بالكامل إذا كانت False
+        """
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(namespace, text, *params):
+        """مفتاح المحتوى: Hash للنص الخام مع إصدار القواميس والمعاملات"""
+        digest = hashlib.blake2b(text.encode('utf-8'), digest_size=16)
+        digest.update(repr((namespace, lexicon_version(), params)).encode('utf-8'))
+        return digest.hexdigest()
+
+    def get_or_compute(self, key, compute):
+        """إرجاع النتيجة المخزنة أو حسابها وتخزينها"""
+        if not self.enabled:
+            return compute()
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        value = compute()
+        size = _estimate_size(key) + _estimate_size(value)
+        if size > self.max_bytes:
+            return value
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (value, size)
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, (_, evicted_size) = self._entries.popitem(last=False)
+                    self._bytes -= evicted_size
+                    self.evictions += 1
+        return value
+
+    def clear(self):
+        """مسح الـ Cache مع الإبقاء على الإحصائيات"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """إحصائيات الاستخدام"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0,
+                'entries': len(self._entries),
+                'size_bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions,
+            }
+
+
+_shared_cache = None
+_lock = threading.Lock()
+
+
+def get_analysis_cache():
+    """الـ Cache المشترك على مستوى العملية (حجمه من Config.PERFORMANCE_SETTINGS)"""
+    global _shared_cache
+    with _lock:
+        if _shared_cache is None:
+            from config import Config
+
+            settings = Config.PERFORMANCE_SETTINGS
+            _shared_cache = AnalysisCache(
+                max_bytes=settings['max_cache_size'] * 1024 * 1024,
+                enabled=settings['cache_enabled'],
+            )
+        return _shared_cache
@@ -0,0 +1,79 @@
+"""
+تراكم الخطر على مستوى المحادثة
+حالة صغيرة لكل جلسة تُحدَّث مع كل رسالة في O(1) بدلاً من إعادة فحص السجل:
+    - نقاط متناقصة: score = score * decay + وزن مستوى الرسالة
+    - نافذة آخر الرسائل (deque) مع عداد للرسائل المقلقة فيها
+تكرار المؤشرات المتوسطة في النافذة يرفع الخطر إلى عالٍ، والنقاط المتراكمة
+ترفع الرسالة الخالية إلى متوسط. الحالة تُحفظ في st.session_state فتبقى مع
+كل تشغيل للسكريبت دون إعادة حساب
+"""
+
+from collections import deque
+
+# وزن كل مستوى في النقاط المتراكمة
+LEVEL_WEIGHTS = {'none': 0.0, 'low': 0.5, 'medium': 1.0, 'high': 3.0}
+# ترتيب مستويات الخطر
+RISK_LEVELS = ('none', 'low', 'medium', 'high')
+
+
+class ConversationRiskState:
+    def __init__(self, decay=0.7, window=5, medium_hits_for_high=2, elevated_score=1.5):
+        """
+        Args:
+            decay: معامل تناقص النقاط مع كل رسالة (0 - 1)
+            window: عدد الرسائل الأخيرة التي تُعد فيها المؤشرات
+            medium_hits_for_high: عدد الرسائل المقلقة في النافذة الذي يرفع الخطر إلى عالٍ
+            elevated_score: النقاط المتراكمة التي ترفع الرسالة الخالية إلى متوسط
+        """
+        self.decay = decay
+        self.medium_hits_for_high = medium_hits_for_high
+        self.elevated_score = elevated_score
+        self._recent = deque(maxlen=window)
+        self.reset()
+
+    def reset(self):
+        """بداية محادثة جديدة"""
+        self.score = 0.0
+        self.hits = 0
+        self.messages = 0
+        self._recent.clear()
+
+    def update(self, risk_result):
+        """
+        إضافة نتيجة رسالة جديدة (من RiskDetector.detect_risk)
+
+        Returns:
+            dict: نتيجة الرسالة مع المستوى على مستوى المحادثة:
+                {'is_risk', 'level', 'reason', 'message_level', 'score',
+                 'recent_hits', 'escalated', ...}
+        """
+        message_level = risk_result['level']
+        is_hit = message_level in ('medium', 'high')
+
+        self.score = self.score * self.decay + LEVEL_WEIGHTS.get(message_level, 0.0)
+        self.messages += 1
+        # عداد النافذة يُحدَّث بالعنصر الداخل والخارج فقط
+        if len(self._recent) == self._recent.maxlen and self._recent[0]:
+            self.hits -= 1
+        self._recent.append(is_hit)
+        self.hits += is_hit
+
+        level = message_level
+        reason = risk_result.get('reason', '')
+        if is_hit and message_level != 'high' and self.hits >= self.medium_hits_for_high:
+            level = 'high'
+            reason = f"تكررت مؤشرات مقلقة في {self.hits} من آخر {len(self._recent)} رسائل"
+        elif RISK_LEVELS.index(level) < RISK_LEVELS.index('medium') and self.score >= self.elevated_score:
+            level = 'medium'
+            reason = 'مؤشرات مقلقة متراكمة في الرسائل الأخيرة'
+
+        return dict(
+            risk_result,
+            is_risk=level != 'none',
+            level=level,
+            reason=reason,
+            message_level=message_level,
+            score=round(self.score, 3),
+            recent_hits=self.hits,
+            escalated=level != message_level,
+        )
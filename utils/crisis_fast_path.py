@@ -0,0 +1,207 @@
+"""
+المسار السريع لرسائل الأزمات
+كشف الخطر يعمل أولاً في Thread السكريبت (قبل تحليل المشاعر)، فإذا كان الخطر
+عالياً تُعرض رسالة الطوارئ فوراً ولا يُرسل طلب Gemini أصلاً. طلب الرد يُرسل في
+Thread خلفي ويمكن إلغاؤه قبل إرساله (أو تجاهل رده إن كان قد أُرسل)، فلا ينتظر
+المستخدم رد النموذج ولا تُستهلك حصة الـ API على رسائل الأزمات. الرد المتدفق (start_reply_stream) يُقرأ
+في نفس الـ Thread الخلفي وتصل أجزاؤه للسكريبت عبر Queue ليعرضها أولاً بأول
+
+الوحدة تعيش في sys.modules، فالـ Thread Pool والإحصائيات مشتركة بين كل
+تشغيلات السكريبت والجلسات
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+# مصير طلب النموذج في رسائل الأزمات
+LLM_CANCELLED = 'cancelled'  # أُلغي قبل الإرسال (لم تُستهلك حصة)
+LLM_DISCARDED = 'discarded'  # كان قد أُرسل، وتم تجاهل رده
+# نهاية أجزاء الرد المتدفق
+_STREAM_END = object()
+
+
+class CrisisStats:
+    def __init__(self):
+        """عدادات المسار السريع: عدد الأزمات ومصير طلبات النموذج وزمن العرض"""
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """تصفير العدادات"""
+        with self._lock:
+            self.messages = 0
+            self.crises = 0
+            self.llm = {LLM_CANCELLED: 0, LLM_DISCARDED: 0}
+            self._render_seconds = []
+
+    def record_message(self, crisis=False):
+        """تسجيل رسالة (أزمة أو عادية)"""
+        with self._lock:
+            self.messages += 1
+            if crisis:
+                self.crises += 1
+
+    def record_llm(self, outcome):
+        """تسجيل مصير طلب نموذج أُلغي بسبب أزمة"""
+        with self._lock:
+            self.llm[outcome] += 1
+
+    def record_render(self, seconds):
+        """تسجيل الزمن من كشف الخطر حتى عرض رسالة الطوارئ"""
+        with self._lock:
+            self._render_seconds.append(seconds)
+            del self._render_seconds[:-1000]
+
+    def stats(self):
+        """
+        Returns:
+            dict: {'messages', 'crises', 'llm_cancelled', 'llm_discarded',
+                   'avg_render_ms', 'max_render_ms', 'last_render_ms'}
+        """
+        with self._lock:
+            renders = list(self._render_seconds)
+            return {
+                'messages': self.messages,
+                'crises': self.crises,
+                'llm_cancelled': self.llm[LLM_CANCELLED],
+                'llm_discarded': self.llm[LLM_DISCARDED],
+                'avg_render_ms': round(sum(renders) * 1000 / len(renders), 3) if renders else None,
+                'max_render_ms': round(max(renders) * 1000, 3) if renders else None,
+                'last_render_ms': round(renders[-1] * 1000, 3) if renders else None,
+            }
+
+
+class PendingReply:
+    def __init__(self, future, cancel_event, stats, updates=None):
+        """طلب رد جارٍ في الخلفية (انظر start_reply و start_reply_stream)"""
+        self.future = future
+        self.cancel_event = cancel_event
+        self._stats = stats
+        self._updates = updates
+        self._finished = False
+
+    def result(self, timeout=None):
+        """انتظار الرد"""
+        return self.future.result(timeout)
+
+    def next_update(self, timeout=None):
+        """
+        نص الرد حتى الآن عند وصول الجزء التالي، أو None عند اكتمال الرد
+        (الرد غير المتدفق يظهر مرة واحدة عند اكتماله)
+
+        Raises:
+            queue.Empty: لم يصل جزء جديد خلال timeout ثانية
+        """
+        if self._updates is None:
+            if self._finished:
+                return None
+            try:
+                text = self.result(timeout)
+            except FutureTimeoutError:
+                raise queue.Empty from None
+            self._finished = True
+            return text
+        text = self._updates.get(timeout=timeout)
+        if text is _STREAM_END:
+            self._updates.put(_STREAM_END)  # نهاية الرد تظل متاحة لأي استدعاء لاحق
+            return None
+        return text
+
+    def updates(self, timeout=None):
+        """
+        نص الرد حتى الآن كلما وصل جزء جديد
+
+        Args:
+            timeout: أقصى انتظار لكل جزء بالثواني (queue.Empty عند تجاوزه)
+        """
+        while (text := self.next_update(timeout)) is not None:
+            yield text
+
+    def cancel(self):
+        """
+        إلغاء الطلب: إذا لم يبدأ بعد لا يُنفذ، وإذا بدأ يتوقف قبل الإرسال
+        (مولد الرد يفحص cancel_event)، وإذا كان قد أُرسل يُتجاهل رده
+        """
+        self.cancel_event.set()
+        if self.future.cancel():
+            self._stats.record_llm(LLM_CANCELLED)
+            return
+        # مولد الرد يُرجع None إذا أوقفه الإلغاء قبل الإرسال
+        self.future.add_done_callback(lambda future: self._stats.record_llm(
+            LLM_CANCELLED if future.exception() is None and future.result() is None else LLM_DISCARDED
+        ))
+
+
+_executor = None
+_stats = CrisisStats()
+_lock = threading.Lock()
+
+
+def get_reply_executor():
+    """الـ Thread Pool المشترك لطلبات الرد (حجمه من Config.PERFORMANCE_SETTINGS)"""
+    global _executor
+    with _lock:
+        if _executor is None:
+            from config import Config
+
+            _executor = ThreadPoolExecutor(
+                max_workers=Config.PERFORMANCE_SETTINGS['reply_workers'],
+                thread_name_prefix="reply",
+            )
+        return _executor
+
+
+def get_crisis_stats():
+    """إحصائيات المسار السريع المشتركة"""
+    return _stats
+
+
+def start_reply(generate, **kwargs):
+    """
+    بدء توليد الرد في الخلفية
+
+    Args:
+        generate: دالة الرد؛ تستقبل cancel_event وتُرجع None إذا أُلغي الطلب قبل الإرسال
+        kwargs: معاملات دالة الرد
+
+    Returns:
+        PendingReply
+    """
+    cancel_event = threading.Event()
+    future = get_reply_executor().submit(generate, cancel_event=cancel_event, **kwargs)
+    return PendingReply(future, cancel_event, _stats)
+
+
+def start_reply_stream(stream, **kwargs):
+    """
+    بدء توليد رد متدفق في الخلفية
+
+    Args:
+        stream: دالة Generator تستقبل cancel_event وتُرجع نص الرد حتى الآن بعد كل
+                جزء (لا تُرجع شيئاً إذا أُلغي الطلب قبل الإرسال)
+        kwargs: معاملات دالة الرد
+
+    Returns:
+        PendingReply: أجزاء الرد من updates() ونصه الكامل من result()
+        (None إذا أُلغي قبل الإرسال)
+    """
+    cancel_event = threading.Event()
+    updates = queue.Queue()
+
+    def consume():
+        text = None
+        replies = stream(cancel_event=cancel_event, **kwargs)
+        try:
+            for text in replies:
+                if cancel_event.is_set():
+                    break  # رسالة أزمة: التوقف عن قراءة الرد
+                updates.put(text)
+        finally:
+            replies.close()
+            updates.put(_STREAM_END)
+        return text
+
+    future = get_reply_executor().submit(consume)
+    return PendingReply(future, cancel_event, _stats, updates)
@@ -0,0 +1,122 @@
+"""
+محول اللهجة المصرية القائم على Trie للكلمات
+يستبدل الكلمات والعبارات (متعددة الكلمات) بأطول تطابق في مرور واحد
+دون المساس بأجزاء الكلمات الأخرى، وسرعته لا تعتمد على حجم القاموس.
+العبارات تُجمع كـ Trie داخل Regex واحد يبدأ بالفاصل قبل الكلمة، فالبحث في C
+يتوقف فقط عند بدايات الكلمات، والتطبيع داخل الـ Regex (كل حرف يقبل صيغه قبل
+التطبيع والتشكيل مسموح بعد أي حرف) فالنص لا يُطبع قبل البحث
+"""
+
+import re
+
+# حروف الكلمة: حروف وأرقام مع التشكيل المتصل بها
+WORD_CHARS = r'\w\u064B-\u065F\u0670'
+
+# مفتاح نهاية العبارة داخل عقدة الـ Trie (الحروف نصوص فلا تتعارض معه)
+_END = None
+
+
+class DialectRewriter:
+    def __init__(self, mapping, translate_table=None):
+        """
+        بناء الـ Trie من قاموس التحويل
+
+        Args:
+            mapping: قاموس {الكلمة أو العبارة: البديل}
+            translate_table: جدول str.translate لتطبيع الكلمات والنص قبل المطابقة
+                (نفس تطبيع النص المنظف، فتتطابق "حاجة" مع "حاجه")
+        """
+        self.translate_table = translate_table
+        # العبارة المطبعة (كلماتها بمسافة واحدة) -> البديل
+        self._replacements = {}
+        for phrase, replacement in mapping.items():
+            key = ' '.join(self.normalize(phrase).split())
+            if key:
+                self._replacements[key] = replacement
+        # أول كلمة في كل عبارة، وأول كلمة في العبارات متعددة الكلمات
+        self._heads = frozenset(key.split(' ', 1)[0] for key in self._replacements)
+        self._phrase_heads = frozenset(key.split(' ', 1)[0] for key in self._replacements if ' ' in key)
+
+        variants = {}
+        deleted = []
+        for source, target in (translate_table or {}).items():
+            if isinstance(target, int):
+                target = chr(target)
+            if not target:
+                deleted.append(chr(source))
+            elif len(target) == 1:
+                variants[target] = variants.get(target, target) + chr(source)
+        # حروف الكلمات التي يغيرها التطبيع (وجودها يمنع المسار السريع؛ التشكيل يمنعه isalnum)
+        sources = [char for forms in variants.values() for char in forms[1:] if char.isalnum()]
+        self._sources = re.compile('[' + ''.join(map(re.escape, sources)) + ']') if sources else None
+        self.regex = self._compile(variants, '[' + ''.join(map(re.escape, deleted)) + ']*' if deleted else '')
+
+    def to_data(self):
+        """قاموس التحويل المطبع {العبارة المطبعة: البديل} كبيانات بسيطة قابلة للحفظ كـ JSON"""
+        return dict(self._replacements)
+
+    @classmethod
+    def from_data(cls, data, translate_table=None):
+        """إعادة بناء المحول من ناتج to_data (المفاتيح المطبعة لا يغيرها التطبيع مرة أخرى)"""
+        return cls(data, translate_table)
+
+    def normalize(self, text):
+        """تطبيع النص بنفس طريقة تطبيع مفاتيح القاموس"""
+        if self.translate_table:
+            text = text.translate(self.translate_table)
+        return text
+
+    def _compile(self, variants, skip):
+        """
+        Regex واحد لكل العبارات: (الفاصل قبل الكلمة)(العبارة) والعبارة تنتهي بنهاية كلمة
+        الفروع الأطول تُجرب أولاً فيكون التطابق هو الأطول
+        """
+        root = {}
+        for key in self._replacements:
+            node = root
+            for char in key:
+                node = node.setdefault(char, {})
+            node[_END] = True
+
+        def char_pattern(char):
+            if char == ' ':
+                return r'\s+'
+            forms = variants.get(char, char)
+            escaped = re.escape(forms) if len(forms) == 1 else '[' + ''.join(map(re.escape, forms)) + ']'
+            return escaped + skip
+
+        def emit(node):
+            branches = [char_pattern(char) + emit(child)
+                        for char, child in sorted((c, n) for c, n in node.items() if c is not _END)]
+            body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+            if _END not in node:
+                return body
+            end = f'(?![{WORD_CHARS}])'
+            return f'(?:{body}|{end})' if branches else end
+
+        if not root:
+            return re.compile('(?!)')
+        return re.compile(f'([^{WORD_CHARS}])({skip}{emit(root)})')
+
+    def _replace(self, match):
+        separator, phrase = match.groups()
+        replacement = self._replacements.get(phrase)
+        if replacement is None:
+            replacement = self._replacements[' '.join(self.normalize(phrase).split())]
+        return separator + replacement
+
+    def rewrite(self, text):
+        """
+        تحويل النص مع الحفاظ على المسافات وعلامات الترقيم كما هي
+        العبارات متعددة الكلمات تُطابق فقط إذا كان بين كلماتها مسافات
+        """
+        # المسار السريع: كلمات مطبعة بينها مسافات فقط (مثل النص المنظف بدون ترقيم)
+        if text.replace(' ', '').isalnum() and not (self._sources and self._sources.search(text)):
+            words = text.split(' ')
+            if self._heads.isdisjoint(words):
+                return text
+            if self._phrase_heads.isdisjoint(words):
+                get = self._replacements.get
+                return ' '.join([get(word, word) for word in words])
+        # النص يبدأ بفاصل مؤقت حتى تُطابق الكلمة الأولى أيضاً
+        return self.regex.sub(self._replace, ' ' + text)[1:]
@@ -0,0 +1,244 @@
+"""
+طرق تحليل المشاعر القابلة للتبديل (Backends) لـ EmotionDetector
+كل طريقة تحلل دفعة نصوص وتُرجع (التصنيف، الثقة) لكل نص:
+    - LinearBackend: المصنف الخطي المحلي (utils/linear_classifier.py)
+    - OnnxSentimentBackend: نموذج CAMeL-BERT مُصدَّر إلى ONNX ويعمل بـ ONNX Runtime
+      على الـ CPU بدون torch (يدعم الأوزان المضغوطة int8)
+
+تصدير النموذج:
+    python export_onnx_model.py
+"""
+
+import ast
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from .linear_classifier import LinearEmotionClassifier
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+MODEL_CONFIG_PATH = ROOT_DIR / "models" / "config.txt"
+ONNX_MODEL_DIR = ROOT_DIR / "models" / "emotion_onnx"
+
+# القيم الافتراضية إذا لم توجد في models/config.txt
+DEFAULT_MODEL_CONFIG = {
+    'DEVICE': -1,
+    'BATCH_SIZE': 1,
+    'MAX_INPUT_LENGTH': 512,
+    'INTRA_OP_THREADS': 0,
+}
+
+
+def _parse_value(value):
+    """تحويل القيمة لنوعها في Python (مع إزالة التعليق في آخر السطر)"""
+    for candidate in (value, value.split('#')[0]):
+        try:
+            return ast.literal_eval(candidate.strip())
+        except (ValueError, SyntaxError):
+            continue
+    return value.split('#')[0].strip()
+
+
+def load_model_config(path=MODEL_CONFIG_PATH):
+    """
+    قراءة إعدادات النماذج من models/config.txt (أسطر KEY = value)
+    القوائم متعددة الأسطر مدعومة، وما بعد أول كتلة نصية (\"\"\") يُتجاهل
+
+    Returns:
+        dict: الإعدادات مدموجة فوق DEFAULT_MODEL_CONFIG
+    """
+    config = dict(DEFAULT_MODEL_CONFIG)
+    try:
+        lines = Path(path).read_text(encoding='utf-8').splitlines()
+    except OSError:
+        return config
+
+    pending = None
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith('"""'):
+            break
+        if pending:
+            # استكمال قائمة متعددة الأسطر
+            pending[1].append(stripped.split('#')[0])
+            if stripped.startswith(']'):
+                config[pending[0]] = _parse_value(' '.join(pending[1]))
+                pending = None
+            continue
+        if not stripped or stripped.startswith('#') or '=' not in stripped:
+            continue
+        key, value = (part.strip() for part in stripped.split('=', 1))
+        if not key.isupper():
+            continue
+        if value.startswith('[') and ']' not in value:
+            pending = (key, [value])
+            continue
+        config[key] = _parse_value(value)
+    return config
+
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class EmotionBackend:
+    """الواجهة المشتركة لطرق التحليل"""
+
+    # اسم المرحلة في التحليل المتدرج، والمصدر الظاهر في النتيجة
+    name = 'backend'
+    source = 'Backend'
+    # النماذج التي تصنف الإيجابية/السلبية فقط تحتاج تحسيناً بالكلمات المفتاحية
+    polarity_only = False
+    # أكبر دفعة مفيدة؛ 1 يعني أن التجميع بين الجلسات لا فائدة منه
+    batch_size = 1
+    model_path = None
+
+    def predict(self, texts):
+        """
+        Args:
+            texts: قائمة نصوص منظفة
+
+        Returns:
+            list: [(التصنيف، الثقة)] بنفس ترتيب النصوص
+        """
+        raise NotImplementedError
+
+    def predict_one(self, text):
+        return self.predict([text])[0]
+
+
+class LinearBackend(EmotionBackend):
+    name = 'linear'
+    source = 'Linear Classifier'
+
+    def __init__(self, model_path):
+        self.model_path = Path(model_path)
+        self.classifier = LinearEmotionClassifier.load(model_path)
+
+    def predict(self, texts):
+        return [self.classifier.predict(text) for text in texts]
+
+
+# جلسات ONNX Runtime المفتوحة (تحميل النموذج مكلف، فتُشارك بين كل الكائنات)
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _get_session(model_path, providers, intra_op_threads):
+    """جلسة ONNX Runtime مشتركة لكل (ملف، أجهزة، عدد Threads)"""
+    import onnxruntime as ort
+
+    key = (str(model_path), tuple(providers), intra_op_threads)
+    with _sessions_lock:
+        if key not in _sessions:
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            options.intra_op_num_threads = intra_op_threads
+            options.inter_op_num_threads = 1
+            _sessions[key] = ort.InferenceSession(
+                str(model_path), sess_options=options, providers=list(providers)
+            )
+        return _sessions[key]
+
+
+def _load_tokenizer(model_dir, max_length):
+    """Tokenizer سريع من tokenizer.json أو vocab.txt (مكتبة tokenizers بدون transformers)"""
+    from tokenizers import Tokenizer
+    from tokenizers.implementations import BertWordPieceTokenizer
+
+    model_dir = Path(model_dir)
+    if (model_dir / "tokenizer.json").exists():
+        tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+    else:
+        tokenizer = BertWordPieceTokenizer(str(model_dir / "vocab.txt"))
+    pad_id = tokenizer.token_to_id('[PAD]') or 0
+    tokenizer.enable_truncation(max_length=max_length)
+    tokenizer.enable_padding(pad_id=pad_id, pad_token='[PAD]')
+    return tokenizer
+
+
+class OnnxSentimentBackend(EmotionBackend):
+    name = 'onnx'
+    source = 'CAMeL-BERT (ONNX)'
+    polarity_only = True
+
+    def __init__(self, model_dir=ONNX_MODEL_DIR, config=None, intra_op_threads=None):
+        """
+        Args:
+            model_dir: مجلد يحتوي model.onnx أو model.int8.onnx (المضغوط أولاً)
+                مع tokenizer.json أو vocab.txt و config.json (id2label)
+            config: إعدادات DEVICE و BATCH_SIZE و MAX_INPUT_LENGTH
+                (الافتراضي من models/config.txt)
+            intra_op_threads: عدد Threads لكل عملية حسابية (0 = تلقائي)
+
+        Raises:
+            ImportError: إذا لم تكن onnxruntime أو tokenizers مثبتة
+            FileNotFoundError: إذا لم يوجد ملف النموذج
+        """
+        import onnxruntime as ort
+
+        config = config or load_model_config()
+        model_dir = Path(model_dir)
+        candidates = [model_dir / "model.int8.onnx", model_dir / "model.onnx"]
+        self.model_path = next((p for p in candidates if p.exists()), None)
+        if self.model_path is None:
+            raise FileNotFoundError(f"لا يوجد نموذج ONNX في {model_dir}")
+
+        self.batch_size = max(1, int(config['BATCH_SIZE']))
+        self.max_length = int(config['MAX_INPUT_LENGTH'])
+        if intra_op_threads is None:
+            intra_op_threads = int(config.get('INTRA_OP_THREADS', 0))
+
+        device = int(config['DEVICE'])
+        providers = ['CPUExecutionProvider']
+        if device >= 0 and 'CUDAExecutionProvider' in ort.get_available_providers():
+            providers.insert(0, 'CUDAExecutionProvider')
+        self.session = _get_session(self.model_path, providers, intra_op_threads)
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.output_name = self.session.get_outputs()[0].name
+
+        self.tokenizer = _load_tokenizer(model_dir, self.max_length)
+        id2label = json.loads((model_dir / "config.json").read_text(encoding='utf-8'))['id2label']
+        self.labels = [id2label[key] for key in sorted(id2label, key=int)]
+
+    def _encode(self, texts):
+        """تحويل دفعة نصوص لمدخلات النموذج (بطول أطول نص في الدفعة)"""
+        encodings = self.tokenizer.encode_batch(texts)
+        feeds = {
+            'input_ids': np.array([e.ids for e in encodings], dtype=np.int64),
+            'attention_mask': np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            'token_type_ids': np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        return {name: value for name, value in feeds.items() if name in self.input_names}
+
+    def predict(self, texts):
+        results = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = list(texts[start:start + self.batch_size])
+            logits = self.session.run([self.output_name], self._encode(batch))[0]
+            probabilities = _softmax(logits.astype(np.float64))
+            for row in probabilities:
+                best = int(row.argmax())
+                results.append((self.labels[best], float(row[best])))
+        return results
+
+
+def quantize_model(model_path, output_path=None):
+    """
+    ضغط أوزان النموذج إلى int8 (Dynamic Quantization): ملف أصغر بحوالي 4 مرات
+    واستدلال أسرع على الـ CPU
+
+    Returns:
+        Path: مسار النموذج المضغوط
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    model_path = Path(model_path)
+    output_path = Path(output_path or model_path.with_name("model.int8.onnx"))
+    quantize_dynamic(str(model_path), str(output_path), weight_type=QuantType.QInt8)
+    return output_path
+
@@ -0,0 +1,112 @@
+"""
+الرد المتحوط (Hedged Reply) لحد زمني للرد
+إذا لم يصل أول جزء من رد Gemini خلال المهلة يظهر فوراً رد احتياطي مناسب
+للمشاعر، ثم يحل محله رد Gemini (أو يظهر بعده) عندما يصل. إذا فشل Gemini
+نفسه ورجع برد احتياطي آخر يبقى الرد المعروض كما هو
+"""
+
+import queue
+import threading
+import time
+
+# مصدر كل نص يُرجعه hedged_updates
+REPLY = 'reply'  # رد Gemini قبل المهلة
+HEDGE = 'hedge'  # الرد الاحتياطي عند انتهاء المهلة
+LATE = 'late'  # رد Gemini بعد الرد الاحتياطي
+
+# طريقة عرض الرد المتأخر
+HEDGE_REPLACE = 'replace'  # يحل محل الرد الاحتياطي
+HEDGE_FOLLOW = 'follow'  # يظهر في رسالة بعده
+
+
+class FallbackReply(str):
+    """نص رد احتياطي (ليس من Gemini)؛ يُعامل كنص عادي في كل مكان آخر"""
+
+
+class HedgeStats:
+    def __init__(self):
+        """عدادات التحوط: كم رداً احتاج رداً احتياطياً، وكم مرة استُخدم الرد المتأخر"""
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """تصفير العدادات"""
+        with self._lock:
+            self.turns = 0
+            self.hedged = 0
+            self.late_used = 0
+            self._late_seconds = 0.0
+
+    def record(self, hedged=False, late_used=False, late_after=None):
+        """
+        تسجيل رد واحد
+
+        Args:
+            hedged: ظهر الرد الاحتياطي لانتهاء المهلة
+            late_used: وصل رد Gemini بعده واستُخدم
+            late_after: الثواني من ظهور الرد الاحتياطي حتى أول جزء من الرد المتأخر
+        """
+        with self._lock:
+            self.turns += 1
+            self.hedged += int(hedged)
+            self.late_used += int(late_used)
+            if late_used and late_after is not None:
+                self._late_seconds += late_after
+
+    def stats(self):
+        """
+        Returns:
+            dict: {'turns', 'hedged', 'late_used', 'hedge_rate', 'late_use_rate', 'avg_late_ms'}
+        """
+        with self._lock:
+            return {
+                'turns': self.turns,
+                'hedged': self.hedged,
+                'late_used': self.late_used,
+                'hedge_rate': round(self.hedged / self.turns, 3) if self.turns else 0.0,
+                'late_use_rate': round(self.late_used / self.hedged, 3) if self.hedged else 0.0,
+                'avg_late_ms': round(self._late_seconds * 1000 / self.late_used, 1) if self.late_used else None,
+            }
+
+
+_stats = HedgeStats()
+
+
+def get_hedge_stats():
+    """إحصائيات التحوط المشتركة بين كل الجلسات"""
+    return _stats
+
+
+def hedged_updates(pending, fallback, deadline, stats=None):
+    """
+    أجزاء الرد مع رد احتياطي إذا تأخر أول جزء عن المهلة
+
+    Args:
+        pending: PendingReply لرد متدفق (انظر start_reply_stream)
+        fallback: دالة بدون معاملات تُرجع الرد الاحتياطي
+        deadline: الثواني قبل عرض الرد الاحتياطي (None: بدون تحوط)
+        stats: HedgeStats (الافتراضي المشتركة)
+
+    Yields:
+        tuple: (نص الرد حتى الآن، المصدر REPLY أو HEDGE أو LATE)
+    """
+    stats = stats or _stats
+    try:
+        text = pending.next_update(timeout=deadline)
+    except queue.Empty:
+        hedged_at = time.perf_counter()
+        yield FallbackReply(fallback()), HEDGE
+        late_after = None
+        while (text := pending.next_update()) is not None:
+            if isinstance(text, FallbackReply) and late_after is None:
+                continue  # Gemini فشل بعد المهلة: الرد الاحتياطي المعروض يكفي
+            if late_after is None:
+                late_after = time.perf_counter() - hedged_at
+            yield text, LATE
+        stats.record(hedged=True, late_used=late_after is not None, late_after=late_after)
+        return
+
+    stats.record()
+    while text is not None:
+        yield text, REPLY
+        text = pending.next_update()
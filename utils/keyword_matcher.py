@@ -0,0 +1,212 @@
+"""
+مطابق الكلمات المتعددة (Trie مُجمَّع كـ Regex)
+مطابق واحد يُبنى مرة واحدة من كل القواميس (المشاعر، الأزمات، اللهجة المصرية)
+ويكشف كل الكلمات الموجودة في الرسالة بما فيها المتداخلة.
+الكلمات تُبنى كـ Trie داخل Regex واحد لكل فئة (البادئات المشتركة تُكتب مرة
+واحدة)، فالبحث كله في C ولا يزيد الزمن كثيراً مهما زاد حجم القواميس.
+التطبيع نفسه داخل الـ Regex (كل حرف يقبل صيغه قبل التطبيع، وما يحذفه التطبيع
+كالتشكيل مسموح بين حروف الكلمة)، فالنص يُبحث فيه كما هو بدون نسخة مطبعة
+"""
+
+import re
+
+# مفتاح نهاية الكلمة داخل عقدة الـ Trie
+_END = None
+
+
+def trie_pattern(entries, variants=None, skip='', named=True):
+    """
+    بناء Regex على شكل Trie من كلمات حرفية
+
+    Args:
+        entries: قائمة (الكلمة المطبعة، اسم المجموعة)
+        variants: {الحرف: كل الحروف التي تُطبع إليه} لمطابقة النص قبل تطبيعه
+        skip: Regex لما يحذفه التطبيع (مسموح به بين حروف الكلمة)
+        named: False لنفس الـ Trie بدون مجموعات (لاستخدامه مرتين في نفس الـ Regex)
+
+    Returns:
+        tuple: (الـ Regex، {اسم المجموعة: أسماء الكلمات التي هي بادئة لها})
+        نهاية الكلمة مجموعة مسماة فارغة يليها امتداد اختياري (الأطول يُجرب أولاً)،
+        فالمجموعة الأخيرة المطابقة تحدد أطول كلمة وبادئاتها معروفة مسبقاً.
+        فروع الجذر حروف حرفية فقط (كل صيغة لأول حرف فرع مستقل بأسماء مجموعات
+        مختلفة) حتى يتخطى البحث في C كل موضع لا تبدأ عنده أي كلمة
+    """
+    root = {}
+    for word, name in entries:
+        node = root
+        for char in word:
+            node = node.setdefault(char, {})
+        node.setdefault(_END, name)
+
+    prefixes = {}
+    variants = variants or {}
+
+    def char_pattern(char):
+        raw = variants.get(char, char)
+        return re.escape(raw) if len(raw) == 1 else '[' + ''.join(map(re.escape, raw)) + ']'
+
+    def emit(node, ancestors, suffix):
+        if _END in node:
+            ancestors = ancestors + (node[_END],)
+            group = node[_END] + suffix
+            prefixes[group] = ancestors
+        branches = [char_pattern(char) + emit(child, ancestors, suffix)
+                    for char, child in sorted((c, n) for c, n in node.items() if c is not _END)]
+        body = skip + (branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')')
+        if _END not in node:
+            return body
+        marker = f'(?P<{group}>)' if named else ''
+        return f'{marker}(?:{body})?' if branches else marker
+
+    branches = [re.escape(variant) + emit(child, (), f'_{index}' if index else '')
+                for char, child in sorted((c, n) for c, n in root.items() if c is not _END)
+                for index, variant in enumerate(variants.get(char, char))]
+    return ('(?:' + '|'.join(branches) + ')', prefixes) if branches else (None, {})
+
+
+class KeywordMatcher:
+    def __init__(self, translate_table=None):
+        """
+        Args:
+            translate_table: جدول str.translate لتطبيع الكلمات والنص قبل المطابقة
+                (مثل تطبيع الهمزات وإزالة التشكيل) حتى تتطابق الصيغ المختلفة
+        """
+        self.translate_table = translate_table
+        # الصيغة المطبعة -> [(الوسم، الكلمة الأصلية)]
+        self._tags = {}
+        # الفئة (أو None لكل الفئات) -> (الـ Regex، البادئات، اسم الكلمة -> الكلمة،
+        # اسم المجموعة -> كل (الوسم، الكلمة الأصلية) المكتشفة عند مطابقتها)
+        self._compiled = {}
+        # الحروف التي يحذفها التطبيع (مسموح بها بين حروف كل كلمة)
+        deleted = [chr(code) for code, target in (translate_table or {}).items() if not target]
+        self._skip = '[' + ''.join(map(re.escape, deleted)) + ']*' if deleted else ''
+
+    def to_data(self):
+        """
+        الكلمات المطبعة ووسومها كبيانات بسيطة قابلة للحفظ كـ JSON
+
+        Returns:
+            list: [[الصيغة المطبعة، [[الوسم، الكلمة الأصلية], ...]], ...]
+        """
+        return [[key, [[list(tag), keyword] for tag, keyword in tags]] for key, tags in self._tags.items()]
+
+    @classmethod
+    def from_data(cls, data, translate_table=None):
+        """إعادة بناء المطابق من ناتج to_data بدون إعادة تطبيع الكلمات"""
+        matcher = cls(translate_table)
+        for key, tags in data:
+            matcher._tags[key] = [(tuple(tag), keyword) for tag, keyword in tags]
+        return matcher
+
+    def normalize(self, text):
+        """تطبيع النص بنفس طريقة تطبيع الكلمات"""
+        text = text.lower()
+        if self.translate_table:
+            text = text.translate(self.translate_table)
+        return text
+
+    def add(self, keyword, tag):
+        """
+        إضافة كلمة للمطابق مع وسم يحدد مصدرها
+
+        Args:
+            keyword: الكلمة أو العبارة
+            tag: وسم الفئة، مثل ('emotion', 'anxiety')
+        """
+        key = self.normalize(keyword)
+        if not key:
+            return
+        tags = self._tags.setdefault(key, [])
+        if (tag, keyword) not in tags:
+            tags.append((tag, keyword))
+        self._compiled.clear()
+
+    def add_lexicon(self, category, lexicon):
+        """إضافة قاموس كامل بصيغة {التصنيف: [الكلمات]}"""
+        for label, keywords in lexicon.items():
+            for keyword in keywords:
+                self.add(keyword, (category, label))
+
+    def _variants(self, keys):
+        """صيغ كل حرف قبل التطبيع: الحرف الكبير ومصادره في جدول التطبيع"""
+        variants = {}
+        for char in {char for key in keys for char in key}:
+            upper = char.upper()
+            if upper != char and len(upper) == 1 and upper.lower() == char:
+                variants[char] = char + upper
+        for source, target in (self.translate_table or {}).items():
+            if isinstance(target, int):
+                target = chr(target)
+            if target and len(target) == 1:
+                variants[target] = variants.get(target, target) + chr(source)
+        return variants
+
+    def _compile(self, category):
+        """Regex الـ Trie لكلمات فئة واحدة (أو كل الفئات إذا كانت None)"""
+        compiled = self._compiled.get(category)
+        if compiled is None:
+            keys, tags = {}, {}
+            for index, (key, key_tags) in enumerate(self._tags.items()):
+                key_tags = [(tag, keyword) for tag, keyword in key_tags
+                            if category is None or tag[0] == category]
+                if key_tags:
+                    keys[f'k{index}'], tags[f'k{index}'] = key, key_tags
+            entries = [(key, name) for name, key in keys.items()]
+            pattern, prefixes = trie_pattern(entries, self._variants(keys.values()), self._skip)
+            found = {group: tuple(hit for name in names for hit in tags[name])
+                     for group, names in prefixes.items()}
+            # Regex لا يطابق شيئاً إذا لم توجد كلمات
+            compiled = (re.compile(pattern or '(?!)'), prefixes, keys, found)
+            self._compiled[category] = compiled
+        return compiled
+
+    def build(self):
+        """تجميع الـ Trie لكل الفئات مسبقاً"""
+        self._compile(None)
+        for category in {tag[0] for tags in self._tags.values() for tag, _ in tags}:
+            self._compile(category)
+        return self
+
+    def iter_matches(self, text, category=None):
+        """
+        كل الكلمات الموجودة في النص (بما فيها المتداخلة والتي هي بادئة لغيرها)
+
+        Args:
+            category: فئة القاموس فقط (مثل 'emotion')، أو None لكل الفئات
+
+        Yields:
+            tuple: (موضع البداية في النص الأصلي، الصيغة المطبعة للكلمة)
+        """
+        regex, prefixes, keys, _ = self._compile(category)
+        search = regex.search
+        match = search(text)
+        while match:
+            start = match.start()
+            for name in prefixes[match.lastgroup]:
+                yield start, keys[name]
+            match = search(text, start + 1)
+
+    def find(self, text, category=None):
+        """
+        الكشف عن كل الكلمات في النص مجمعة حسب الوسم
+
+        Args:
+            category: فئة القاموس فقط، أو None لكل الفئات
+
+        Returns:
+            dict: {الوسم: [الكلمات الأصلية المكتشفة بدون تكرار]}
+        """
+        regex, _, _, found = self._compiled.get(category) or self._compile(category)
+        hits = {}
+        search = regex.search
+        match = search(text)
+        while match:
+            for tag, keyword in found[match.lastgroup]:
+                keywords = hits.setdefault(tag, [])
+                if keyword not in keywords:
+                    keywords.append(keyword)
+            match = search(text, match.start() + 1)
+        return hits
+
+    def __len__(self):
+        return len(self._tags)
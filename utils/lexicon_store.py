@@ -0,0 +1,179 @@
+"""
+مخزن القواميس المُجمَّعة (Compiled Lexicons)
+يجمع كل القواميس (كلمات المشاعر، الأزمات، اللهجة المصرية) في ملف JSON واحد
+مُطبَّع ومُرقَّم بالإصدار، ويُحمَّل بقراءة واحدة مرة واحدة لكل عملية بدلاً من
+إعادة البناء مع كل كائن.
+الملف بيانات بسيطة فقط (كلمات مطبعة وجداول تحويل) تُبنى منها الكائنات عند
+التحميل، فلا يُنفذ أي كود من الملف ويُرفض إذا تغير كود المطابقة أو التطبيع
+
+بناء الملف:
+    python build_lexicons.py
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from . import dialect_rewriter, keyword_matcher
+from .dialect_rewriter import DialectRewriter
+from .keyword_matcher import KeywordMatcher
+
+# يُرفع عند تغيير شكل الملف
+ARTIFACT_FORMAT = 3
+ARTIFACT_PATH = Path(__file__).resolve().parent.parent / "models" / "lexicons.json"
+
+# القواميس المسجلة من الوحدات المالكة لها
+_KEYWORD_LEXICONS = {}
+_DIALECT_MAPS = {}
+_compiled = None
+_lock = threading.Lock()
+
+
+def register_lexicon(category, lexicon):
+    """
+    تسجيل قاموس كلمات في الآلة المشتركة
+
+    Args:
+        category: اسم الفئة، مثل 'emotion' أو 'crisis'
+        lexicon: قاموس {التصنيف: [الكلمات]}
+    """
+    global _compiled
+    with _lock:
+        _KEYWORD_LEXICONS[category] = lexicon
+        _compiled = None
+
+
+def register_dialect_map(name, mapping):
+    """
+    تسجيل قاموس تحويل لهجة يُبنى له DialectRewriter
+
+    Args:
+        name: اسم القاموس
+        mapping: قاموس {الكلمة أو العبارة: البديل}
+    """
+    global _compiled
+    with _lock:
+        _DIALECT_MAPS[name] = mapping
+        _compiled = None
+
+
+def _fingerprint(source):
+    """بصمة محتوى قاموس واحد مع إصدار صيغة الملف"""
+    payload = json.dumps([ARTIFACT_FORMAT, source], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def _source_fingerprints():
+    """بصمات كل القواميس المسجلة حالياً"""
+    fingerprints = {f'lexicon:{k}': _fingerprint(v) for k, v in _KEYWORD_LEXICONS.items()}
+    fingerprints.update({f'dialect:{k}': _fingerprint(v) for k, v in _DIALECT_MAPS.items()})
+    return fingerprints
+
+
+def _code_version():
+    """بصمة كود المطابقة وجدول التطبيع اللذين تُبنى بهما الكائنات من الملف"""
+    from .text_cleaner import ARABIC_NORMALIZE_TABLE
+
+    digest = hashlib.sha256()
+    for module in (keyword_matcher, dialect_rewriter):
+        digest.update(Path(module.__file__).read_bytes())
+    digest.update(json.dumps(sorted(ARABIC_NORMALIZE_TABLE.items())).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def compile_lexicons():
+    """
+    تجميع كل القواميس المسجلة: كلمات مطبعة داخل KeywordMatcher واحد
+    و Trie لكل قاموس لهجة
+
+    Returns:
+        dict: {'format', 'code', 'version', 'sources', 'matcher', 'rewriters'}
+    """
+    from .text_cleaner import ARABIC_NORMALIZE_TABLE
+
+    matcher = KeywordMatcher(ARABIC_NORMALIZE_TABLE)
+    for category, lexicon in _KEYWORD_LEXICONS.items():
+        matcher.add_lexicon(category, lexicon)
+    sources = _source_fingerprints()
+    return {
+        'format': ARTIFACT_FORMAT,
+        'code': _code_version(),
+        'version': _fingerprint(sources),
+        'sources': sources,
+        'matcher': matcher.build(),
+        'rewriters': {name: DialectRewriter(m, ARABIC_NORMALIZE_TABLE) for name, m in _DIALECT_MAPS.items()},
+    }
+
+
+def save_artifact(path=ARTIFACT_PATH):
+    """بناء الملف المجمع وحفظه كـ JSON (كتابة ذرية لتجنب قراءة ملف ناقص)"""
+    path = Path(path)
+    path.parent.mkdir(exist_ok=True)
+    compiled = compile_lexicons()
+    data = dict(compiled)
+    data['matcher'] = compiled['matcher'].to_data()
+    data['rewriters'] = {name: rewriter.to_data() for name, rewriter in compiled['rewriters'].items()}
+    temp_path = path.with_suffix('.tmp')
+    temp_path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    os.replace(temp_path, path)
+    return compiled
+
+
+def load_artifact(path=ARTIFACT_PATH):
+    """
+    تحميل الملف المجمع بقراءة واحدة وإعادة بناء المطابق والمحولات منه
+
+    Returns:
+        dict أو None إذا كان الملف غير موجود أو تالفاً أو بُني بكود مختلف
+        أو لا يغطي القواميس الحالية
+    """
+    from .text_cleaner import ARABIC_NORMALIZE_TABLE
+
+    try:
+        data = json.loads(Path(path).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get('format') != ARTIFACT_FORMAT:
+        return None
+    if data.get('code') != _code_version():
+        return None
+    # الملف صالح إذا احتوى كل القواميس المسجلة بنفس المحتوى
+    # (قد يحتوي قواميس إضافية غير مستخدمة في هذه العملية)
+    current = _source_fingerprints()
+    if any(data['sources'].get(key) != value for key, value in current.items()):
+        return None
+    data['matcher'] = KeywordMatcher.from_data(data['matcher'], ARABIC_NORMALIZE_TABLE).build()
+    data['rewriters'] = {name: DialectRewriter.from_data(mapping, ARABIC_NORMALIZE_TABLE)
+                         for name, mapping in data['rewriters'].items()}
+    return data
+
+
+def get_compiled():
+    """القواميس المجمعة المشتركة على مستوى العملية (من الملف إن أمكن)"""
+    global _compiled
+    # المسار المعتاد بدون قفل: القواميس مجمعة بالفعل
+    compiled = _compiled
+    if compiled is not None:
+        return compiled
+    with _lock:
+        if _compiled is None:
+            _compiled = load_artifact() or compile_lexicons()
+        return _compiled
+
+
+def get_shared_matcher():
+    """المطابق المشترك المبني من كل القواميس المسجلة"""
+    return get_compiled()['matcher']
+
+
+def get_rewriter(name):
+    """الـ DialectRewriter الخاص بقاموس لهجة مسجل"""
+    return get_compiled()['rewriters'][name]
+
+
+def lexicon_version():
+    """إصدار القواميس المستخدمة حالياً (يتغير مع أي تعديل في المحتوى)"""
+    return get_compiled()['version']
+
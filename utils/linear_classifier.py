@@ -0,0 +1,211 @@
+"""
+مصنف مشاعر خطي صغير (Hashing Vectorizer + Logistic Regression) بـ NumPy فقط
+مستوى وسط بين الكلمات المفتاحية ونماذج Transformers: يُدرَّب Offline من
+docs/data/dataset.csv ويُحفظ كملف .npz يمكن فتحه بـ mmap، والاستدلال أقل من
+مللي ثانية للرسالة على الـ CPU
+
+التدريب والتقرير:
+    python train_classifier.py train
+    python train_classifier.py report
+"""
+
+import json
+import struct
+import zipfile
+import zlib
+
+import numpy as np
+
+# يُرفع عند تغيير طريقة استخراج الخصائص (الملفات القديمة تصبح غير صالحة)
+FEATURE_VERSION = 1
+
+
+class HashingVectorizer:
+    def __init__(self, n_features=2 ** 15, ngram_range=(2, 4)):
+        """
+        تحويل النص لمتجه خصائص متفرق من Character N-grams داخل حدود الكلمات
+
+        Args:
+            n_features: عدد الخانات (قوة للعدد 2)
+            ngram_range: أقل وأكبر طول للـ N-gram
+        """
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+
+    def transform_one(self, text):
+        """
+        Returns:
+            tuple: (indices, values) متجه متفرق مُطبَّع (L2)
+        """
+        low, high = self.ngram_range
+        counts = {}
+        for word in text.split():
+            padded = f' {word} '
+            for n in range(low, high + 1):
+                for start in range(len(padded) - n + 1):
+                    # crc32 ثابت بين العمليات (عكس hash المدمجة في Python)
+                    h = zlib.crc32(padded[start:start + n].encode('utf-8'))
+                    index = h % self.n_features
+                    # إشارة من بت مستقل تقلل أثر التصادمات
+                    sign = 1.0 if h & 0x80000000 else -1.0
+                    counts[index] = counts.get(index, 0.0) + sign
+        if not counts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        norm = np.linalg.norm(values)
+        if norm:
+            values /= norm
+        return indices, values
+
+    def transform(self, texts):
+        """
+        تحويل مجموعة نصوص لمصفوفة CSR (indptr, indices, values)
+        """
+        indptr = [0]
+        all_indices = []
+        all_values = []
+        for text in texts:
+            indices, values = self.transform_one(text)
+            all_indices.append(indices)
+            all_values.append(values)
+            indptr.append(indptr[-1] + len(indices))
+        return (
+            np.array(indptr, dtype=np.int64),
+            np.concatenate(all_indices) if all_indices else np.zeros(0, dtype=np.int64),
+            np.concatenate(all_values) if all_values else np.zeros(0, dtype=np.float32),
+        )
+
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class LinearEmotionClassifier:
+    def __init__(self, weights, bias, classes, vectorizer):
+        """
+        Args:
+            weights: مصفوفة (n_features × n_classes)
+            bias: متجه (n_classes)
+            classes: أسماء الحالات بنفس ترتيب الأعمدة
+            vectorizer: HashingVectorizer المستخدم في التدريب
+        """
+        self.weights = weights
+        self.bias = bias
+        self.classes = [str(c) for c in classes]
+        self.vectorizer = vectorizer
+
+    @classmethod
+    def train(cls, texts, labels, n_features=2 ** 15, ngram_range=(2, 4),
+              epochs=300, learning_rate=1.0, l2=1e-4):
+        """
+        تدريب Logistic Regression متعدد الفئات بـ Gradient Descent على كامل البيانات
+
+        Args:
+            texts: النصوص (منظفة بنفس طريقة الاستدلال)
+            labels: الحالة لكل نص
+        """
+        vectorizer = HashingVectorizer(n_features, ngram_range)
+        classes = sorted(set(labels))
+        y = np.zeros((len(labels), len(classes)), dtype=np.float32)
+        y[np.arange(len(labels)), [classes.index(label) for label in labels]] = 1.0
+
+        indptr, indices, values = vectorizer.transform(texts)
+        rows = np.repeat(np.arange(len(texts)), np.diff(indptr))
+        weights = np.zeros((n_features, len(classes)), dtype=np.float32)
+        bias = np.zeros(len(classes), dtype=np.float32)
+
+        for _ in range(epochs):
+            # logits = X @ W + b باستخدام التمثيل المتفرق
+            contributions = weights[indices] * values[:, None]
+            logits = np.zeros_like(y)
+            np.add.at(logits, rows, contributions)
+            error = (_softmax(logits + bias) - y) / len(texts)
+
+            gradient = np.zeros_like(weights)
+            np.add.at(gradient, indices, values[:, None] * error[rows])
+            weights -= learning_rate * (gradient + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0)
+
+        return cls(weights, bias, classes, vectorizer)
+
+    def predict_proba(self, text):
+        """احتمالات كل حالة لنص واحد"""
+        indices, values = self.vectorizer.transform_one(text)
+        logits = values @ self.weights[indices] + self.bias
+        return _softmax(logits.astype(np.float64))
+
+    def predict(self, text):
+        """
+        Returns:
+            tuple: (الحالة، الثقة)
+        """
+        probabilities = self.predict_proba(text)
+        best = int(probabilities.argmax())
+        return self.classes[best], float(probabilities[best])
+
+    def save(self, path):
+        """حفظ كملف .npz غير مضغوط (شرط لإمكانية فتحه بـ mmap)"""
+        config = {
+            'feature_version': FEATURE_VERSION,
+            'n_features': self.vectorizer.n_features,
+            'ngram_range': list(self.vectorizer.ngram_range),
+        }
+        np.savez(
+            path,
+            weights=np.ascontiguousarray(self.weights, dtype=np.float32),
+            bias=np.asarray(self.bias, dtype=np.float32),
+            classes=np.array(self.classes),
+            config=np.array(json.dumps(config)),
+        )
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        تحميل المصنف؛ مع mmap تُقرأ الأوزان من الملف عند الحاجة وتتشاركها
+        كل العمليات عبر الـ Page Cache بدلاً من نسخة لكل عملية
+
+        Raises:
+            ValueError: إذا كان الملف من إصدار خصائص مختلف
+        """
+        arrays = _load_npz_mmap(path) if mmap else dict(np.load(path))
+        config = json.loads(str(arrays['config']))
+        if config.get('feature_version') != FEATURE_VERSION:
+            raise ValueError(f"إصدار الخصائص غير متوافق: {config.get('feature_version')}")
+        vectorizer = HashingVectorizer(config['n_features'], config['ngram_range'])
+        return cls(arrays['weights'], np.array(arrays['bias']), arrays['classes'], vectorizer)
+
+
+def _load_npz_mmap(path):
+    """
+    فتح مصفوفات ملف .npz غير مضغوط كـ np.memmap
+    (np.load يتجاهل mmap_mode مع ملفات .npz)
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{info.filename} مضغوط ولا يمكن فتحه بـ mmap")
+            # الـ Local Header: 30 بايت ثابتة + اسم الملف + الحقل الإضافي
+            f.seek(info.header_offset)
+            header = f.read(30)
+            name_length, extra_length = struct.unpack('<HH', header[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                header = np.lib.format.read_array_header_1_0(f)
+            else:
+                header = np.lib.format.read_array_header_2_0(f)
+            shape, fortran_order, dtype = header
+            name = info.filename[:-len('.npy')]
+            if not shape:
+                arrays[name] = np.fromfile(f, dtype=dtype, count=1)[0]
+                continue
+            arrays[name] = np.memmap(
+                path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                order='F' if fortran_order else 'C',
+            )
+    return arrays
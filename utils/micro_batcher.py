@@ -0,0 +1,174 @@
+"""
+تجميع طلبات التحليل المتزامنة في دفعات (Micro-Batching)
+كل جلسة Streamlit تعمل في Thread منفصل؛ بدلاً من أن ينفذ كل منها النموذج
+على نص واحد وتتنافس كلها على نفس الأنوية، تُجمع الطلبات المتزامنة في دفعة
+واحدة (حتى حجم أقصى أو مهلة قصيرة) وتُعاد النتيجة لكل طالب عبر Future
+"""
+
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+# عدد آخر القياسات المحفوظة لحساب زمن الانتظار
+_LATENCY_WINDOW = 1000
+
+
+class MicroBatcher:
+    def __init__(self, fn, max_batch_size=16, max_wait_ms=5.0, name='batcher', timeout=10.0):
+        """
+        Args:
+            fn: دالة تستقبل قائمة عناصر وتُرجع قائمة نتائج بنفس الترتيب
+            max_batch_size: أكبر عدد عناصر في الدفعة الواحدة
+            max_wait_ms: أقصى انتظار بعد أول عنصر لتجميع عناصر أخرى
+            name: اسم الـ Thread والإحصائيات
+            timeout: أقصى انتظار افتراضي للنتيجة بالثواني عند الاستدعاء المباشر
+        """
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.timeout = timeout
+        self.name = name
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+        self.submitted = 0
+        self.batches = 0
+        self.max_queue_depth = 0
+        self.batch_sizes = Counter()
+        self._waits = deque(maxlen=_LATENCY_WINDOW)
+
+    def submit(self, item):
+        """
+        إضافة عنصر للطابور
+
+        Returns:
+            Future: نتيجته بعد تنفيذ الدفعة التي تحتويه
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"{self.name} مغلق")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self.submitted += 1
+            self._queue.put((item, future, time.perf_counter()))
+            self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return future
+
+    def __call__(self, item, timeout=None):
+        """
+        إضافة عنصر وانتظار نتيجته
+
+        Raises:
+            concurrent.futures.TimeoutError: إذا لم تصل النتيجة خلال timeout
+                (الافتراضي self.timeout)
+        """
+        return self.submit(item).result(self.timeout if timeout is None else timeout)
+
+    def _collect(self):
+        """أول عنصر متاح ثم كل ما يصل حتى امتلاء الدفعة أو انتهاء المهلة"""
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                # إشارة الإغلاق: تنفيذ الدفعة الحالية أولاً
+                self._queue.put(None)
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            started = time.perf_counter()
+            items = [item for item, _, _ in batch]
+            futures = [future for _, future, _ in batch]
+            with self._lock:
+                self.batches += 1
+                self.batch_sizes[len(batch)] += 1
+                self._waits.extend(started - enqueued for _, _, enqueued in batch)
+            try:
+                results = list(self.fn(items))
+                if len(results) != len(futures):
+                    raise ValueError(f"{self.name}: {len(results)} نتيجة لـ {len(futures)} عنصر")
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            for future, result in zip(futures, results):
+                future.set_result(result)
+
+    def close(self):
+        """إيقاف الـ Thread بعد تنفيذ العناصر المنتظرة"""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def stats(self):
+        """
+        Returns:
+            dict: عمق الطابور، توزيع أحجام الدفعات، والزمن المضاف بالانتظار (ms)
+        """
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                'submitted': self.submitted,
+                'batches': self.batches,
+                'queue_depth': self._queue.qsize(),
+                'max_queue_depth': self.max_queue_depth,
+                'avg_batch_size': round(sum(s * n for s, n in self.batch_sizes.items()) / self.batches, 2)
+                if self.batches else 0.0,
+                'batch_size_histogram': dict(sorted(self.batch_sizes.items())),
+                'avg_wait_ms': round(sum(waits) / len(waits) * 1000, 3) if waits else 0.0,
+                'p95_wait_ms': round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 3)
+                if waits else 0.0,
+            }
+
+
+# الـ Batchers المشتركة على مستوى العملية (واحد لكل نموذج)
+_batchers = {}
+_lock = threading.Lock()
+
+
+def get_micro_batcher(key, fn, **settings):
+    """
+    الـ Batcher المشترك لمفتاح معين (يُنشأ عند أول طلب)
+
+    Args:
+        key: مفتاح النموذج، مثل ('onnx', مسار الملف)
+        fn: دالة الدفعة؛ إذا تغيرت (نموذج أُعيد تحميله بنفس المفتاح) تحل محل
+            القديمة في الدفعات التالية
+        settings: max_batch_size و max_wait_ms و timeout
+    """
+    with _lock:
+        batcher = _batchers.get(key)
+        if batcher is None:
+            batcher = _batchers[key] = MicroBatcher(fn, name=f"batcher:{key[0]}", **settings)
+        elif batcher.fn != fn:
+            batcher.fn = fn
+        return batcher
+
+
+def batcher_stats():
+    """إحصائيات كل الـ Batchers الحالية"""
+    with _lock:
+        batchers = dict(_batchers)
+    return {key: batcher.stats() for key, batcher in batchers.items()}
@@ -0,0 +1,166 @@
+"""
+فهرس MinHash/LSH للرسائل المتشابهة (اختلافات الإملاء البسيطة)
+كل رسالة تتحول لمجموعة N-grams من الحروف، ثم توقيع MinHash (أصغر Hash لكل
+دالة من num_perm دالة). التوقيع مقسم لـ bands؛ رسالتان في نفس الـ Bucket لأي
+band مرشحتان للتشابه، فالبحث يفحص المرشحين فقط وليس كل الرسائل المخزنة، ثم
+يُحسب تشابه Jaccard الفعلي للمرشحين
+
+احتمال أن تصبح رسالتان بتشابه s مرشحتين = 1 - (1 - s^rows)^bands
+(الافتراضي 128 دالة و 32 band: 0.87 عند s = 0.5، و 0.23 عند s = 0.3، وأكثر
+من 0.99 عند s = 0.7)
+
+N-grams من حرفين تناسب الرسائل القصيرة: "قلقان اوي" و "قلقانه قوي" تشابههما
+0.54، بينما "انا تعبان" و "انا جعان" 0.42
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def shingles(text, ngram=2):
+    """N-grams الحروف للنص (مع مسافة في البداية والنهاية لتمييز أطراف الكلمات)"""
+    padded = f' {text} '
+    if len(padded) <= ngram:
+        return {padded}
+    return {padded[i:i + ngram] for i in range(len(padded) - ngram + 1)}
+
+
+class MinHashIndex:
+    def __init__(self, num_perm=128, bands=32, threshold=0.5, max_entries=2000, ngram=2, seed=1):
+        """
+        Args:
+            num_perm: عدد دوال الـ Hash (طول التوقيع)
+            bands: عدد الـ bands (يجب أن يقسم num_perm)
+            threshold: أقل تشابه Jaccard لاعتبار الرسالتين متشابهتين
+            max_entries: أقصى عدد رسائل (تُحذف الأقدم استخداماً)
+            ngram: طول N-gram الحروف
+            seed: بذرة دوال الـ Hash
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ngram = ngram
+        # Hash عام بالضرب والإزاحة: (a * x + b) >> 32 بحساب uint64 (a فردي)
+        rng = np.random.default_rng(seed)
+        self._a = (rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+        self._entries = OrderedDict()
+        self._buckets = [{} for _ in range(bands)]
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """تصفير الإحصائيات"""
+        with self._lock:
+            self.queries = 0
+            self.matches = 0
+            self.candidates = 0
+            self.evictions = 0
+            self._query_seconds = 0.0
+
+    def signature(self, grams):
+        """توقيع MinHash لمجموعة N-grams (uint32 لكل دالة)"""
+        values = np.fromiter((hash(gram) for gram in grams), dtype=np.int64, count=len(grams)).view(np.uint64)
+        hashed = (self._a[:, None] * values[None, :] + self._b[:, None]) >> np.uint64(32)
+        return hashed.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature, tag):
+        # الـ Buckets مقسمة حسب tag: الرسائل بقيم tag مختلفة لا تصبح مرشحة أصلاً
+        tag_hash = hash(tag)
+        return [(tag_hash, band.tobytes()) for band in signature.reshape(self.bands, self.rows)]
+
+    def add(self, text, value, tag=None):
+        """
+        إضافة رسالة مع القيمة المرتبطة بها
+
+        Args:
+            tag: قيمة يجب أن تتطابق عند البحث (مثل المشاعر)
+
+        Returns:
+            int: معرف الرسالة
+        """
+        grams = frozenset(shingles(text, self.ngram))
+        keys = self._band_keys(self.signature(grams), tag)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (grams, keys, value, tag)
+            for buckets, key in zip(self._buckets, keys):
+                buckets.setdefault(key, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return entry_id
+
+    def _remove(self, entry_id):
+        _, keys, _, _ = self._entries.pop(entry_id)
+        for buckets, key in zip(self._buckets, keys):
+            bucket = buckets[key]
+            bucket.discard(entry_id)
+            if not bucket:
+                del buckets[key]
+
+    def remove(self, entry_id):
+        """حذف رسالة"""
+        with self._lock:
+            if entry_id in self._entries:
+                self._remove(entry_id)
+
+    def query(self, text, tag=None):
+        """
+        الرسائل المشابهة للنص (بنفس tag) من المرشحين في نفس الـ Buckets فقط
+
+        Returns:
+            list: [(التشابه، القيمة)] من الأكثر تشابهاً، فوق threshold
+        """
+        started = time.perf_counter()
+        grams = shingles(text, self.ngram)
+        keys = self._band_keys(self.signature(grams), tag)
+        with self._lock:
+            candidates = set()
+            for buckets, key in zip(self._buckets, keys):
+                bucket = buckets.get(key)
+                if bucket:
+                    candidates.update(bucket)
+            found = []
+            for entry_id in candidates:
+                entry_grams, _, value, entry_tag = self._entries[entry_id]
+                if entry_tag != tag:
+                    continue
+                similarity = len(grams & entry_grams) / len(grams | entry_grams)
+                if similarity >= self.threshold:
+                    found.append((similarity, entry_id, value))
+            found.sort(key=lambda item: (-item[0], -item[1]))
+            for _, entry_id, _ in found:
+                self._entries.move_to_end(entry_id)
+            self.queries += 1
+            self.matches += int(bool(found))
+            self.candidates += len(candidates)
+            self._query_seconds += time.perf_counter() - started
+        return [(similarity, value) for similarity, _, value in found]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """
+        Returns:
+            dict: {'entries', 'queries', 'matches', 'avg_candidates', 'avg_query_ms', 'evictions'}
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'queries': self.queries,
+                'matches': self.matches,
+                'avg_candidates': round(self.candidates / self.queries, 2) if self.queries else 0.0,
+                'avg_query_ms': round(self._query_seconds * 1000 / self.queries, 4) if self.queries else None,
+                'evictions': self.evictions,
+            }
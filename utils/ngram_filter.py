@@ -0,0 +1,257 @@
+"""
+فلتر N-grams (مرحلة رفض سريعة قبل المطابقة الكاملة)
+يُبنى من الكلمات الحرفية التي لا بد أن تظهر في النص حتى يطابق أي نمط أو كلمة:
+لكل كلمة N-gram واحد (الأندر) ولا بد من وجوده حتى توجد الكلمة.
+الـ N-grams المختارة Trie واحد مُجمَّع كـ Regex يعمل على النص الخام مباشرة
+(كل حرف يقبل كل صيغه قبل التطبيع، وما يحذفه التطبيع مسموح بين الحروف)، فالرفض
+بحث واحد في C بدون تطبيع النص أو نسخه، وفروع الجذر حروف حرفية فيتخطى البحث
+كل موضع لا يبدأ عنده أي N-gram
+
+لا توجد نتائج سلبية خاطئة: كل نص يطابقه النمط أو الكلمة يمر من الفلتر
+(قد تمر نصوص لا تطابق، والمطابقة الكاملة تحسمها)
+"""
+
+import re
+from functools import lru_cache
+
+from .keyword_matcher import trie_pattern
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# أقصى عدد بدائل حرفية لجزء واحد من النمط قبل التوقف عن التوسيع
+MAX_EXPANSIONS = 256
+# الحروف من الأكثر للأقل شيوعاً (العربية ثم الإنجليزية) لاختيار الـ N-gram الأندر
+COMMON_CHARS = ' اليمونهرتبكعدسفقحجشصطزخثذضغظ' + 'etaoinsrhldcumfpgwybvkxjqz'
+
+
+@lru_cache(maxsize=1)
+def _lowercase_sources():
+    """
+    الحروف الكبيرة لكل حرف صغير (حروف BMP فقط؛ لا يوجد حرف خارجها يتحول لحرف داخلها)
+
+    Returns:
+        tuple: ({أول حرف من الحرف الصغير: الحروف التي تتحول إليه}، الحروف غير الثابتة)
+        الحروف غير الثابتة قد تظهر في النص المطبع دون أن تقابل حرفاً في النص
+        الخام: الحروف الزائدة حين يتحول حرف لأكثر من حرف (İ) و ς (تعتمد على السياق)
+    """
+    sources = {}
+    unstable = {'ς'}
+    for code in range(0x10000):
+        char = chr(code)
+        lower = char.lower()
+        if lower != char:
+            sources[lower[0]] = sources.get(lower[0], '') + char
+            unstable.update(lower[1:])
+    return sources, frozenset(unstable)
+
+
+def _expand(items, limit, anchors=True):
+    """
+    كل النصوص الحرفية التي يطابقها تسلسل من النمط
+
+    Args:
+        anchors: تجاهل المراسي (^ و \\b)؛ False يعتبرها غير قابلة للتوسيع
+
+    Returns:
+        set | None: البدائل، أو None إذا كان التسلسل غير منتهٍ أو أكبر من limit
+    """
+    results = {''}
+    for op, av in items:
+        options = _expand_item(op, av, limit, anchors)
+        if options is None:
+            return None
+        results = {prefix + option for prefix in results for option in options}
+        if len(results) > limit:
+            return None
+    return results
+
+
+def _expand_item(op, av, limit, anchors=True):
+    if op is sre_parse.LITERAL:
+        return {chr(av)}
+    if op is sre_parse.SUBPATTERN:
+        return _expand(av[3], limit, anchors)
+    if op is sre_parse.BRANCH:
+        options = set()
+        for branch in av[1]:
+            expanded = _expand(branch, limit, anchors)
+            if expanded is None:
+                return None
+            options |= expanded
+        return options if len(options) <= limit else None
+    if op is sre_parse.IN:
+        chars = set()
+        for item_op, item_av in av:
+            if item_op is sre_parse.LITERAL:
+                chars.add(chr(item_av))
+            elif item_op is sre_parse.RANGE and item_av[1] - item_av[0] < 16:
+                chars.update(chr(c) for c in range(item_av[0], item_av[1] + 1))
+            else:
+                return None
+        return chars
+    if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+        low, high, body = av
+        if high is sre_parse.MAXREPEAT or high > 4:
+            return None
+        body = _expand(body, limit, anchors)
+        if body is None:
+            return None
+        options = set()
+        for count in range(low, high + 1):
+            repeated = {''}
+            for _ in range(count):
+                repeated = {prefix + option for prefix in repeated for option in body}
+                if len(repeated) > limit:
+                    return None
+            options |= repeated
+        return options if len(options) <= limit else None
+    if op is sre_parse.AT and anchors:
+        return {''}  # المراسي لا تستهلك حروفاً
+    return None
+
+
+def literal_expansions(pattern, limit=MAX_EXPANSIONS):
+    """
+    كل النصوص التي يطابقها النمط إذا كانت منتهية (حروف ومجموعات بدائل وتكرار محدود فقط)
+    النمط يطابق عند موضع إذا وفقط إذا بدأ عنده أحد هذه النصوص، فيمكن مطابقته كمجموعة كلمات
+
+    Returns:
+        set | None: النصوص، أو None إذا كان النمط غير منتهٍ أو فيه مراسٍ أو يطابق نصاً فارغاً
+    """
+    parsed = sre_parse.parse(pattern)
+    if parsed.state.flags & (re.IGNORECASE | re.VERBOSE):
+        return None
+    expanded = _expand(parsed, limit, anchors=False)
+    if not expanded or '' in expanded:
+        return None
+    return expanded
+
+
+def required_literals(pattern, limit=MAX_EXPANSIONS):
+    """
+    نصوص حرفية لا بد أن يحتوي النص على واحد منها على الأقل حتى يطابقه النمط
+
+    التسلسل الأعلى للنمط يُقسم لأجزاء منتهية (حروف، مجموعات، بدائل، تكرار
+    محدود) يفصلها ما لا يمكن توسيعه (مثل .* أو \\w)، ويُختار الجزء الذي أقصر
+    بدائله أطول
+
+    Returns:
+        set | None: البدائل، أو None إذا لم يوجد جزء حرفي (النمط مرشح دائماً)
+    """
+    parsed = sre_parse.parse(pattern)
+    if parsed.state.flags & (re.IGNORECASE | re.VERBOSE):
+        return None
+
+    segments = []
+    current = {''}
+    for op, av in parsed:
+        options = _expand_item(op, av, limit)
+        combined = None
+        if options is not None:
+            combined = {prefix + option for prefix in current for option in options}
+        if combined is None or len(combined) > limit:
+            segments.append(current)
+            current = options if options is not None else {''}
+        else:
+            current = combined
+    segments.append(current)
+
+    best = max(segments, key=lambda segment: min(map(len, segment)))
+    return best if min(map(len, best)) > 0 else None
+
+
+class NgramPrefilter:
+    def __init__(self, literals, translate_table=None, max_ngram=4, common_texts=()):
+        """
+        Args:
+            literals: النصوص الحرفية (كلمات، أو بدائل required_literals للأنماط)
+            translate_table: جدول str.translate الذي تستخدمه المطابقة الكاملة (بعد lower)
+            max_ngram: طول الـ N-gram (الكلمات الأقصر تُضاف كاملة)
+            common_texts: كلمات يومية شائعة تُتجنب N-grams الموجودة فيها عند الاختيار
+        """
+        self.translate_table = translate_table
+        lowercase_sources, unstable = _lowercase_sources()
+
+        # صيغ كل حرف مطبع في النص الخام: مصادره في جدول التطبيع والحروف الكبيرة
+        # لكل منها (الحرف الأول فقط عند التحويل لأكثر من حرف)
+        targets = {}
+        deleted = []
+        for source, target in (translate_table or {}).items():
+            if isinstance(target, int):
+                target = chr(target)
+            if target:
+                targets[target[0]] = targets.get(target[0], '') + chr(source)
+                unstable |= set(target[1:])
+            else:
+                deleted.append(chr(source) + lowercase_sources.get(chr(source), ''))
+        skip = '[' + ''.join(map(re.escape, ''.join(deleted))) + ']*' if deleted else ''
+
+        common = set()
+        for text in common_texts:
+            text = self.normalize(text)
+            for n in range(1, max_ngram + 1):
+                common.update(text[i:i + n] for i in range(len(text) - n + 1))
+
+        # الفلتر معطل (كل نص مرشح) إذا لم يوجد لكلمة ما N-gram ثابت
+        self.always_candidate = False
+        self.n = max_ngram
+        chosen = set()
+        for literal in {self.normalize(literal) for literal in literals} - {''}:
+            # الحروف خارج BMP وغير الثابتة لا تُستخدم (قد لا تظهر بنفس الشكل في النص)
+            stable = [ord(char) <= 0xFFFF and char not in unstable for char in literal]
+            grams = [literal[i:i + self.n] for i in range(max(len(literal) - self.n + 1, 1))
+                     if all(stable[i:i + self.n])]
+            if not grams:
+                self.always_candidate = True
+                continue
+            chosen.add(_pick_ngram(grams, common))
+        self.ngrams = sorted(chosen)
+
+        variants = {}
+        for char in {char for gram in self.ngrams for char in gram}:
+            forms = char + targets.get(char, '')
+            variants[char] = forms + ''.join(lowercase_sources.get(form, '') for form in forms)
+        pattern, _ = trie_pattern([(gram, f'n{index}') for index, gram in enumerate(self.ngrams)],
+                                  variants, skip, named=False)
+        self.regex = re.compile(pattern) if pattern else None
+
+    def normalize(self, text):
+        """نفس تطبيع المطابقة الكاملة (لاختيار الـ N-grams فقط، النص لا يُطبع عند الفحص)"""
+        text = text.lower()
+        if self.translate_table:
+            text = text.translate(self.translate_table)
+        return text
+
+    def might_match(self, text):
+        """
+        Returns:
+            bool: False إذا كان النص بالتأكيد لا يحتوي أي كلمة
+        """
+        if self.always_candidate:
+            return True
+        return self.regex is not None and self.regex.search(text) is not None
+
+
+def _pick_ngram(grams, common):
+    """
+    اختيار N-gram واحد يمثل الكلمة في الفلتر (وجوده شرط لوجود الكلمة)
+    يُفضَّل N-gram غير موجود في الكلمات اليومية، ثم N-gram يعبر بين كلمتين
+    (تجاور الكلمتين أندر من أي كلمة منفردة مثل "نفسي" أو "حياتي")، ثم الذي
+    يبدأ بحرف أندر (البحث يتوقف فقط عند أول حرف من كل N-gram)، ثم الأندر حسب
+    ترتيب شيوع الحروف
+    """
+    def rank(char):
+        return len(COMMON_CHARS) - COMMON_CHARS.index(char) if char in COMMON_CHARS else 0
+
+    def commonness(gram):
+        return (
+            gram in common,
+            ' ' not in gram.strip(),
+            rank(gram[0]),
+            sum(map(rank, gram)),
+        )
+
+    return min(grams, key=commonness)
@@ -0,0 +1,70 @@
+"""
+توقيت الردود المتدفقة من Gemini
+لكل رد يُسجل الزمن حتى أول جزء يظهر للمستخدم (TTFT) والزمن الكلي حتى اكتمال الرد
+"""
+
+import threading
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ReplyTimingStats:
+    def __init__(self, keep=1000):
+        """
+        Args:
+            keep: عدد الردود الأخيرة المحفوظة لحساب المتوسط والـ p95
+        """
+        self.keep = keep
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """تصفير العدادات"""
+        with self._lock:
+            self.turns = 0
+            self.fallbacks = 0
+            self._ttft = []
+            self._total = []
+
+    def record(self, ttft, total, fallback=False):
+        """
+        تسجيل رد واحد
+
+        Args:
+            ttft: الثواني حتى أول جزء من الرد
+            total: الثواني حتى اكتمال الرد
+            fallback: الرد (أو بقيته) من الردود الاحتياطية بعد فشل Gemini
+        """
+        with self._lock:
+            self.turns += 1
+            self.fallbacks += int(fallback)
+            self._ttft.append(ttft)
+            self._total.append(total)
+            del self._ttft[:-self.keep]
+            del self._total[:-self.keep]
+
+    def stats(self):
+        """
+        Returns:
+            dict: {'turns', 'fallbacks', 'avg_ttft_ms', 'p95_ttft_ms',
+                   'avg_total_ms', 'p95_total_ms', 'last_ttft_ms', 'last_total_ms'}
+        """
+        with self._lock:
+            ttft, total = list(self._ttft), list(self._total)
+            result = {'turns': self.turns, 'fallbacks': self.fallbacks}
+        for name, values in (('ttft', ttft), ('total', total)):
+            result[f'avg_{name}_ms'] = round(sum(values) * 1000 / len(values), 1) if values else None
+            result[f'p95_{name}_ms'] = round(_percentile(values, 0.95) * 1000, 1) if values else None
+            result[f'last_{name}_ms'] = round(values[-1] * 1000, 1) if values else None
+        return result
+
+
+_stats = ReplyTimingStats()
+
+
+def get_reply_timing():
+    """توقيت الردود المشترك بين كل الجلسات"""
+    return _stats
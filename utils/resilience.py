@@ -0,0 +1,128 @@
+"""
+حماية طلبات Gemini من أعطال الخدمة
+    - Circuit Breaker: بعد عدد من الفشل المتتالي تُرفض الطلبات فوراً (الرد
+      الاحتياطي بدون انتظار الشبكة) لفترة، ثم يُسمح بطلب تجريبي واحد
+    - Backoff عشوائي بين المحاولات (Full Jitter) حتى لا تتزامن إعادة المحاولات
+      من كل الجلسات على الخدمة في نفس اللحظة
+"""
+
+import random
+import threading
+import time
+
+# حالات الـ Circuit Breaker
+CLOSED = 'closed'  # الطلبات تمر عادياً
+OPEN = 'open'  # الطلبات تُرفض فوراً
+HALF_OPEN = 'half_open'  # طلب تجريبي واحد يحدد الإغلاق أو إعادة الفتح
+
+
+class CircuitOpenError(Exception):
+    """الطلب رُفض بدون إرساله لأن الـ Circuit مفتوح"""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        """
+        Args:
+            failure_threshold: عدد الفشل المتتالي الذي يفتح الـ Circuit
+            reset_timeout: الثواني قبل السماح بطلب تجريبي بعد الفتح
+            clock: دالة الوقت (للاختبارات)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """إغلاق الـ Circuit وتصفير العدادات"""
+        with self._lock:
+            self._state = CLOSED
+            self._opened_at = None
+            self._probing = False
+            self.consecutive_failures = 0
+            self.successes = 0
+            self.failures = 0
+            self.rejected = 0
+            self.opens = 0
+            self.retries = 0
+
+    def _current_state(self):
+        if self._state == OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+        return self._state
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def allow_request(self):
+        """
+        Returns:
+            bool: True إذا كان الطلب مسموحاً (في HALF_OPEN طلب تجريبي واحد فقط)
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED or (state == HALF_OPEN and not self._probing):
+                self._probing = state == HALF_OPEN
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        """الطلب نجح: إغلاق الـ Circuit"""
+        with self._lock:
+            self.successes += 1
+            self.consecutive_failures = 0
+            self._state = CLOSED
+            self._probing = False
+
+    def record_failure(self):
+        """الطلب فشل: فتح الـ Circuit عند الحد (أو فوراً إذا فشل الطلب التجريبي)"""
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self._current_state() == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.opens += 1
+                self._state = OPEN
+                self._opened_at = self.clock()
+            self._probing = False
+
+    def record_cancelled(self):
+        """الطلب أُلغي بدون نتيجة (لا يُحسب نجاحاً أو فشلاً)"""
+        with self._lock:
+            self._probing = False
+
+    def record_retry(self):
+        """تسجيل إعادة محاولة"""
+        with self._lock:
+            self.retries += 1
+
+    def stats(self):
+        """
+        Returns:
+            dict: {'state', 'consecutive_failures', 'successes', 'failures',
+                   'rejected', 'opens', 'retries'}
+        """
+        with self._lock:
+            return {
+                'state': self._current_state(),
+                'consecutive_failures': self.consecutive_failures,
+                'successes': self.successes,
+                'failures': self.failures,
+                'rejected': self.rejected,
+                'opens': self.opens,
+                'retries': self.retries,
+            }
+
+
+def backoff_delay(attempt, base=0.5, cap=4.0, rng=random):
+    """
+    زمن الانتظار قبل إعادة المحاولة (Full Jitter): عشوائي بين 0 و min(cap, base * 2^attempt)
+
+    Args:
+        attempt: رقم المحاولة التي فشلت (من 0)
+    """
+    return rng.uniform(0, min(cap, base * 2 ** attempt))
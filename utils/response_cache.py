@@ -0,0 +1,288 @@
+"""
+Cache الردود للرسائل المتكررة (التحيات والرسائل الشائعة القصيرة)
+نفس الرسالة بعد التطبيع مع نفس المشاعر ونفس آخر أدوار المحادثة ترد من الـ Cache
+بدون طلب Gemini. لكل رسالة مجموعة ردود (Variants) تُملأ من أول طلبات Gemini ثم
+يُختار منها عشوائياً (بدون تكرار آخر رد) حتى لا تبدو الردود آلية
+
+المفتاح = Hash للنص المطبع + المشاعر + Hash لنص آخر أدوار المحادثة
+
+NearDuplicateCache يكمل الـ Cache للرسائل المتشابهة إملائياً ("قلقان اوي" و
+"قلقانه قوي") عبر فهرس MinHash/LSH، بنفس المشاعر وآخر أدوار المحادثة والنفي،
+وبنفس الكلمات في نفس الترتيب مع اختلاف الإملاء فقط (is_spelling_variant)
+"""
+
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from .minhash_index import MinHashIndex, shingles
+from .text_cleaner import ARABIC_NORMALIZE_TABLE
+
+_NON_WORD = re.compile(r'[^\w\s]')
+# كلمات النفي (بعد التطبيع): "انا مبسوط" و "انا مش مبسوط" متشابهتان إملائياً فقط
+NEGATION_WORDS = {'مش', 'مو', 'ما', 'لا', 'لم', 'لن', 'ليس', 'مفيش', 'مافيش', 'بلاش',
+                  'not', 'no', 'dont', 'never', 'cant'}
+
+
+def normalize_message(text):
+    """تطبيع الرسالة للمفتاح: الحروف والتشكيل وحالة الأحرف وعلامات الترقيم والإيموجي والمسافات"""
+    return ' '.join(_NON_WORD.sub(' ', text.translate(ARABIC_NORMALIZE_TABLE).lower()).split())
+
+
+class ResponseCache:
+    def __init__(self, max_entries=500, ttl=3600, variants=3, max_chars=200, enabled=True,
+                 clock=time.monotonic, rng=None):
+        """
+        Args:
+            max_entries: أقصى عدد رسائل مخزنة (تُحذف الأقدم استخداماً)
+            ttl: صلاحية الرسالة بالثواني من أول رد خُزن لها
+            variants: عدد الردود المختلفة لكل رسالة قبل الرد من الـ Cache
+            max_chars: الرسائل الأطول (بعد التطبيع) لا تُخزن
+            enabled: تعطيل الـ Cache بالكامل إذا كانت False
+            clock: دالة الوقت (للاختبارات)
+            rng: random.Random لاختيار الرد (للاختبارات)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.variants = variants
+        self.max_chars = max_chars
+        self.enabled = enabled
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """تصفير الإحصائيات"""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+            self._hit_seconds = 0.0
+
+    def make_key(self, text, emotion, history=''):
+        """
+        Returns:
+            str | None: المفتاح، أو None إذا كانت الرسالة لا تُخزن (فارغة أو طويلة)
+        """
+        normalized = normalize_message(text)
+        if not normalized or len(normalized) > self.max_chars:
+            return None
+        digest = hashlib.blake2b(normalized.encode('utf-8'), digest_size=16)
+        digest.update(repr((emotion, hashlib.blake2b(history.encode('utf-8'), digest_size=8).hexdigest()))
+                      .encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Returns:
+            str | None: رد من مجموعة الرسالة إذا اكتملت Variants، وإلا None (يُطلب من Gemini)
+        """
+        if not self.enabled or key is None:
+            return None
+        started = time.perf_counter()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.clock() - entry['created'] >= self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None or len(entry['replies']) < self.variants:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            choices = [i for i in range(len(entry['replies'])) if i != entry['last']] or [entry['last']]
+            entry['last'] = self.rng.choice(choices)
+            self.hits += 1
+            self._hit_seconds += time.perf_counter() - started
+            return entry['replies'][entry['last']]
+
+    def put(self, key, reply):
+        """إضافة رد من Gemini لمجموعة الرسالة (حتى variants ردود مختلفة)"""
+        if not self.enabled or key is None or not reply:
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self.clock() - entry['created'] >= self.ttl:
+                entry = {'replies': [], 'last': None, 'created': self.clock()}
+                self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if reply not in entry['replies'] and len(entry['replies']) < self.variants:
+                entry['replies'].append(reply)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """مسح الـ Cache مع الإبقاء على الإحصائيات"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Returns:
+            dict: {'hits', 'misses', 'hit_rate', 'api_calls_saved', 'avg_hit_ms',
+                   'entries', 'evictions', 'expirations'}
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0,
+                # كل رد من الـ Cache هو طلب Gemini لم يُرسل
+                'api_calls_saved': self.hits,
+                'avg_hit_ms': round(self._hit_seconds * 1000 / self.hits, 4) if self.hits else None,
+                'entries': len(self._entries),
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+def negations(normalized):
+    """كلمات النفي في الرسالة المطبعة (مع صيغة م...ش المصرية مثل "مبحبش")"""
+    return frozenset(
+        word for word in normalized.split()
+        if word in NEGATION_WORDS or (len(word) > 3 and word.startswith('م') and word.endswith('ش'))
+    )
+
+
+def near_duplicate_tag(normalized):
+    """ما يجب أن يتطابق بين رسالتين متشابهتين إملائياً: عدد الكلمات وكلمات النفي"""
+    return len(normalized.split()), negations(normalized)
+
+
+def is_spelling_variant(normalized, previous, min_word_similarity=0.3):
+    """
+    هل الرسالتان نفس الكلمات بنفس الترتيب مع اختلاف إملائي؟ كل كلمة تقابل كلمة
+    في نفس الموضع تشترك معها في min_word_similarity على الأقل من N-grams الحروف
+    ("قلقان اوي" و "قلقانه قوي" نعم؛ "خايف" و "خايف عايز" أو "حقا النهارده" و
+    "النهارده لا" لا، رغم تشابه الحروف)
+    """
+    words, previous_words = normalized.split(), previous.split()
+    if len(words) != len(previous_words):
+        return False
+    for word, previous_word in zip(words, previous_words):
+        if word != previous_word:
+            grams, previous_grams = shingles(word), shingles(previous_word)
+            if len(grams & previous_grams) / len(grams | previous_grams) < min_word_similarity:
+                return False
+    return True
+
+
+class NearDuplicateCache:
+    def __init__(self, threshold=0.5, max_entries=2000, max_chars=200, enabled=True):
+        """
+        Args:
+            threshold: أقل تشابه Jaccard (N-grams من حرفين) للرد من رسالة سابقة
+            max_entries: أقصى عدد رسائل في الفهرس (تُحذف الأقدم استخداماً)
+            max_chars: الرسائل الأطول (بعد التطبيع) لا تُفهرس
+            enabled: تعطيل الـ Cache بالكامل إذا كانت False
+        """
+        self.index = MinHashIndex(threshold=threshold, max_entries=max_entries)
+        self.max_chars = max_chars
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """تصفير الإحصائيات"""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+        self.index.reset_stats()
+
+    def _normalize(self, text, emotion, history):
+        normalized = normalize_message(text)
+        if not self.enabled or not normalized or len(normalized) > self.max_chars:
+            return None, None
+        history_hash = hashlib.blake2b(history.encode('utf-8'), digest_size=8).hexdigest()
+        return normalized, (emotion, history_hash) + near_duplicate_tag(normalized)
+
+    def get(self, text, emotion, history=''):
+        """
+        Returns:
+            str | None: رد أقرب رسالة سابقة مشابهة (وليست مطابقة؛ المطابقة لـ ResponseCache)
+        """
+        normalized, tag = self._normalize(text, emotion, history)
+        if normalized is None:
+            return None
+        for _, (previous, reply) in self.index.query(normalized, tag):
+            if previous != normalized and is_spelling_variant(normalized, previous):
+                with self._lock:
+                    self.hits += 1
+                return reply
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, text, emotion, history, reply):
+        """فهرسة رسالة مع رد Gemini عليها"""
+        normalized, tag = self._normalize(text, emotion, history)
+        if normalized is not None and reply:
+            self.index.add(normalized, (normalized, reply), tag)
+
+    def stats(self):
+        """
+        Returns:
+            dict: {'hits', 'misses', 'hit_rate', 'api_calls_saved', 'entries',
+                   'avg_query_ms', 'avg_candidates', 'evictions'}
+        """
+        index = self.index.stats()
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0,
+                'api_calls_saved': self.hits,
+                'entries': index['entries'],
+                'avg_query_ms': index['avg_query_ms'],
+                'avg_candidates': index['avg_candidates'],
+                'evictions': index['evictions'],
+            }
+
+
+_shared_cache = None
+_shared_near_cache = None
+_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Cache الردود المشترك على مستوى العملية (إعداداته من Config.PERFORMANCE_SETTINGS)"""
+    global _shared_cache
+    with _lock:
+        if _shared_cache is None:
+            from config import Config
+
+            settings = Config.PERFORMANCE_SETTINGS
+            _shared_cache = ResponseCache(
+                max_entries=settings['response_cache_entries'],
+                ttl=settings['response_cache_ttl'],
+                variants=settings['response_cache_variants'],
+                max_chars=settings['response_cache_max_chars'],
+                enabled=settings['cache_enabled'],
+            )
+        return _shared_cache
+
+
+def get_near_duplicate_cache():
+    """Cache الرسائل المتشابهة المشترك (إعداداته من Config.PERFORMANCE_SETTINGS)"""
+    global _shared_near_cache
+    with _lock:
+        if _shared_near_cache is None:
+            from config import Config
+
+            settings = Config.PERFORMANCE_SETTINGS
+            _shared_near_cache = NearDuplicateCache(
+                threshold=settings['near_duplicate_threshold'],
+                max_entries=settings['near_duplicate_entries'],
+                max_chars=settings['response_cache_max_chars'],
+                enabled=settings['cache_enabled'],
+            )
+        return _shared_near_cache
@@ -1,74 +1,120 @@
-"""
-نظام الكشف عن المخاطر والأزمات
-يحلل النصوص للكشف عن مؤشرات الانتحار أو إيذاء النفس
-"""
-
-import re
-
-class RiskDetector:
-    def __init__(self):
-        self.crisis_keywords = [
-            "انتحار", "أموت", "أنهي حياتي", "أقتل نفسي", "مش عايز أعيش",
-            "خلاص تعبت", "مفيش فايدة", "بكره حياتي", "عايز ارتاح",
-            "suicide", "kill myself", "die", "end my life"
-        ]
-        
-        self.high_risk_patterns = [
-            r"(عايز|عاوز|بفكر) (أموت|أنتحر|أخلص من حياتي)",
-            r"(مش (قادر|عايز)) (أكمل|أعيش)",
-            r"(حياتي (ملهاش|بدون) (معنى|قيمة|لزمه))"
-        ]
-
-    def detect_risk(self, text):
-        """
-        فحص النص للكشف عن المخاطر
-        Returns:
-            dict: {
-                'is_risk': bool,
-                'level': 'high' | 'medium' | 'low' | 'none',
-                'reason': str
-            }
-        """
-        text_lower = text.lower()
-        
-        # 1. فحص الأنماط عالية الخطورة (Regex)
-        for pattern in self.high_risk_patterns:
-            if re.search(pattern, text_lower):
-                return {
-                    'is_risk': True,
-                    'level': 'high',
-                    'reason': 'تم رصد عبارات تشير لرغبة مباشرة في إنهاء الحياة'
-                }
-
-        # 2. فحص الكلمات المفتاحية
-        matches = [word for word in self.crisis_keywords if word in text_lower]
-        if len(matches) > 0:
-            # إذا كان هناك أكثر من كلمة مفتاحية، نعتبره خطر متوسط/عالي
-            level = 'high' if len(matches) > 1 else 'medium'
-            return {
-                'is_risk': True,
-                'level': level,
-                'reason': f"تم رصد كلمات مقلقة: {', '.join(matches)}"
-            }
-
-        return {
-            'is_risk': False,
-            'level': 'none',
-            'reason': ''
-        }
-
-    def get_crisis_response(self):
-        """رسالة طوارئ موحدة"""
-        return """
-        ⚠️ **تنبيه هام جداً**
-        
-        أنا هنا عشان أسمعك وأساعدك، لكن أنا مجرد برنامج ذكاء اصطناعي.
-        الكلام اللي بتقوله ده مهم جداً ومحتاج حد متخصص يسمعه حالاً.
-        
-        أرجوك، لو حاسس إنك ممكن تأذي نفسك، اتصل حالاً بـ:
-        📞 **الخط الساخن للدعم النفسي في مصر: 08008880700**
-        📞 **أو الإسعاف: 123**
-        
-        حياتك غالية ومهمة، وفيه ناس كتير مستعدة تساعدك وتسمعك دلوقتي.
-        ممكن نتكلم في أي حاجة تانية، بس أرجوك اطلب المساعدة المتخصصة دي.
-        """
+"""
+نظام الكشف عن المخاطر والأزمات
+يحلل النصوص للكشف عن مؤشرات الانتحار أو إيذاء النفس
+"""
+
+from .lexicon_store import register_lexicon
+from .risk_matcher import compile_risk_matcher
+
+CRISIS_KEYWORDS = [
+    "انتحار", "أموت", "أنهي حياتي", "أقتل نفسي", "مش عايز أعيش",
+    "خلاص تعبت", "مفيش فايدة", "بكره حياتي", "عايز ارتاح",
+    "suicide", "kill myself", "die", "end my life"
+]
+
+register_lexicon('crisis', {'crisis': CRISIS_KEYWORDS})
+
+HIGH_RISK_PATTERNS = [
+    r"(عايز|عاوز|بفكر) (أموت|أنتحر|أخلص من حياتي)",
+    r"(مش (قادر|عايز)) (أكمل|أعيش)",
+    r"(حياتي (ملهاش|بدون) (معنى|قيمة|لزمه))"
+]
+
+# درجة الخطورة لكل مصدر
+PATTERN_SEVERITY = 'high'
+KEYWORD_SEVERITY = 'medium'
+
+class RiskDetector:
+    def __init__(self):
+        self.crisis_keywords = CRISIS_KEYWORDS
+        
+        self.high_risk_patterns = HIGH_RISK_PATTERNS
+    
+    @property
+    def crisis_keywords(self):
+        return self._crisis_keywords
+
+    @crisis_keywords.setter
+    def crisis_keywords(self, keywords):
+        self._crisis_keywords = keywords
+        self._matcher = None
+
+    @property
+    def high_risk_patterns(self):
+        return self._high_risk_patterns
+
+    @high_risk_patterns.setter
+    def high_risk_patterns(self, patterns):
+        self._high_risk_patterns = patterns
+        self._matcher = None
+
+    @property
+    def matcher(self):
+        """
+        المطابق المُجمَّع للأنماط والكلمات الحالية (مشترك على مستوى العملية)
+        يُحفظ في الكائن ولا يُعاد البحث عنه إلا بعد تغيير الأنماط أو الكلمات
+        """
+        if self._matcher is None:
+            self._matcher = compile_risk_matcher(
+                tuple((pattern, PATTERN_SEVERITY) for pattern in self._high_risk_patterns),
+                tuple((word, KEYWORD_SEVERITY) for word in self._crisis_keywords)
+            )
+        return self._matcher
+
+    def detect_risk(self, text):
+        """
+        فحص النص للكشف عن المخاطر
+        Returns:
+            dict: {
+                'is_risk': bool,
+                'level': 'high' | 'medium' | 'low' | 'none',
+                'reason': str,
+                'matches': [(النمط أو الكلمة، الخطورة، النوع)]
+            }
+        """
+        # مرور واحد على النص المطبع يكشف كل الأنماط والكلمات مع خطورتها
+        found = self.matcher.scan(text)
+        
+        # 1. الأنماط عالية الخطورة
+        if any(kind == 'pattern' for _, _, kind in found):
+            return {
+                'is_risk': True,
+                'level': 'high',
+                'reason': 'تم رصد عبارات تشير لرغبة مباشرة في إنهاء الحياة',
+                'matches': found
+            }
+
+        # 2. الكلمات المفتاحية
+        matches = [word for word, _, kind in found if kind == 'keyword']
+        if len(matches) > 0:
+            # إذا كان هناك أكثر من كلمة مفتاحية، نعتبره خطر متوسط/عالي
+            level = 'high' if len(matches) > 1 else 'medium'
+            return {
+                'is_risk': True,
+                'level': level,
+                'reason': f"تم رصد كلمات مقلقة: {', '.join(matches)}",
+                'matches': found
+            }
+
+        return {
+            'is_risk': False,
+            'level': 'none',
+            'reason': '',
+            'matches': []
+        }
+
+    def get_crisis_response(self):
+        """رسالة طوارئ موحدة"""
+        return """
+        ⚠️ **تنبيه هام جداً**
+        
+        أنا هنا عشان أسمعك وأساعدك، لكن أنا مجرد برنامج ذكاء اصطناعي.
+        الكلام اللي بتقوله ده مهم جداً ومحتاج حد متخصص يسمعه حالاً.
+        
+        أرجوك، لو حاسس إنك ممكن تأذي نفسك، اتصل حالاً بـ:
+        📞 **الخط الساخن للدعم النفسي في مصر: 08008880700**
+        📞 **أو الإسعاف: 123**
+        
+        حياتك غالية ومهمة، وفيه ناس كتير مستعدة تساعدك وتسمعك دلوقتي.
+        ممكن نتكلم في أي حاجة تانية، بس أرجوك اطلب المساعدة المتخصصة دي.
+        """
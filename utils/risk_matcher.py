@@ -0,0 +1,151 @@
+"""
+مطابق الخطر المُجمَّع (Regex واحد بمجموعات مسماة)
+كل أنماط الخطر العالي وكلمات الأزمات في Regex واحد مُجمَّع مسبقاً يعمل على
+النص المطبع (الهمزات، الياء، التاء المربوطة، التشكيل) ويُرجع كل نمط أو كلمة
+مع درجة خطورتها في مرور واحد.
+الكلمات والأنماط المنتهية (حروف وبدائل فقط) تُبنى كـ Trie داخل الـ Regex
+(البادئات المشتركة تُكتب مرة واحدة) مع مجموعة مسماة فارغة في نهاية كل نص،
+فلا يزيد الزمن مع زيادة عدد الكلمات أو الأنماط.
+قبل الـ Regex فلتر N-grams على النص الخام يرفض الرسائل الخالية من أي كلمة مرشحة
+بدون تطبيعها
+"""
+
+import re
+from functools import lru_cache
+
+from .keyword_matcher import trie_pattern
+from .ngram_filter import NgramPrefilter, literal_expansions, required_literals
+
+class RiskMatcher:
+    def __init__(self, patterns, keywords, translate_table=None, prefilter=True, common_texts=()):
+        """
+        Args:
+            patterns: قائمة (Regex، الخطورة)؛ الحروف العربية فيها تُطبع مثل النص
+                (بدون تحويل للحروف الصغيرة حتى لا تتغير رموز الـ Regex، فتُكتب بحروف صغيرة)
+            keywords: قائمة (كلمة، الخطورة)؛ تُطابق كجزء من النص بعد التطبيع
+            translate_table: جدول str.translate المستخدم للتطبيع
+            prefilter: استخدام فلتر الـ N-grams قبل الـ Regex (يُعطل تلقائياً إذا
+                وُجد نمط بدون نص حرفي إلزامي)
+            common_texts: كلمات يومية شائعة لاختيار N-grams أندر في الفلتر
+        """
+        self.translate_table = translate_table
+        # اسم المجموعة -> (النمط أو الكلمة الأصلية، الخطورة، النوع)
+        self._groups = {}
+        # النصوص الحرفية التي لا بد أن يحتوي النص أحدها حتى يطابق أي شيء
+        literals = set()
+        # النص المطبع -> أسماء الأنماط والكلمات التي تطابقه (الأنماط أولاً)
+        names_by_key = {}
+        # الأنماط غير المنتهية في Lookahead اختياري لكل منها: كل نمط يطابق عند
+        # الموضع يملأ مجموعته
+        alternatives = []
+        resolvers = []
+        self._pattern_names = []
+        for index, (pattern, severity) in enumerate(patterns):
+            name = f'p{index}'
+            self._groups[name] = (pattern, severity, 'pattern')
+            if self.translate_table:
+                pattern = pattern.translate(self.translate_table)
+            required = required_literals(pattern) if prefilter else None
+            if required is None:
+                prefilter = False
+            else:
+                literals |= required
+            # النمط المنتهي (حروف وبدائل فقط) يُضاف للـ Trie مثل الكلمات بكل نصوصه،
+            # فلا يزيد الزمن مع زيادة عدد الأنماط
+            expansions = literal_expansions(pattern)
+            if expansions is not None:
+                for key in expansions:
+                    names_by_key.setdefault(key, []).append(name)
+                continue
+            alternatives.append(f'(?:{pattern})')
+            resolvers.append(f'(?:(?=(?P<{name}>{pattern})))?')
+            self._pattern_names.append(name)
+
+        for index, (keyword, severity) in enumerate(keywords):
+            name = f'k{index}'
+            key = self.normalize(keyword)
+            if key:
+                self._groups[name] = (keyword, severity, 'keyword')
+                names_by_key.setdefault(key, []).append(name)
+                literals.add(key)
+
+        # كل نص مطبع مجموعة واحدة في الـ Trie، ومعها كل أسماء بادئاته عند مطابقتها
+        entries = [(key, f'e{index}') for index, key in enumerate(names_by_key)]
+        trie, prefixes = trie_pattern(entries)
+        names_by_entry = {entry: names_by_key[key] for key, entry in entries}
+        self._found = {}
+        for group, ancestors in prefixes.items():
+            names = [name for entry in ancestors for name in names_by_entry[entry]]
+            self._found[group] = sorted(names, key=lambda name: self._groups[name][2] != 'pattern')
+        if trie:
+            alternatives.append(trie_pattern(entries, named=False)[0])
+            # الـ Trie آخر Lookahead، فآخر مجموعة مغلقة (lastgroup) هي أطول نص
+            resolvers.append(f'(?:(?={trie}))?')
+
+        # Lookahead: المطابقة عند كل موضع دون استهلاك النص، فتظهر الكلمات
+        # المتداخلة التي تبدأ في موضع مختلف. البديل المجمع (بدون مجموعات)
+        # يحدد المواضع، وبعده الأنماط غير المنتهية والـ Trie كمجموعات مسماة في
+        # نفس الـ Regex، فكل ما يبدأ عند الموضع (أكثر من نمط، أو نمط وكلمة)
+        # يظهر في نفس المطابقة بدون إعادة تشغيل أي نمط
+        if not alternatives:
+            self.regex = None
+        elif not self._pattern_names:
+            self.regex = re.compile(f'(?={trie})')
+        else:
+            self.regex = re.compile('(?=(?:' + '|'.join(alternatives) + '))' + ''.join(resolvers))
+        self.prefilter = NgramPrefilter(
+            literals, self.translate_table, common_texts=common_texts
+        ) if prefilter else None
+
+    def normalize(self, text):
+        """تطبيع النص (أو نص النمط) للمطابقة"""
+        text = text.lower()
+        if self.translate_table:
+            text = text.translate(self.translate_table)
+        return text
+
+    def scan(self, text):
+        """
+        مرور واحد على النص المطبع
+
+        Returns:
+            list: [(النمط أو الكلمة، الخطورة، النوع)] بترتيب الظهور وبدون تكرار
+        """
+        if self.regex is None:
+            return []
+        if self.prefilter is not None and not self.prefilter.might_match(text):
+            return []
+        found = []
+        seen = set()
+        normalized = self.normalize(text)
+        for match in self.regex.finditer(normalized):
+            for name in self._names_at(match):
+                if name not in seen:
+                    seen.add(name)
+                    found.append(self._groups[name])
+        return found
+
+    def _names_at(self, match):
+        """كل الأنماط ثم كل الكلمات (مع بادئاتها والكلمات المطابقة لها) التي تبدأ عند موضع المطابقة"""
+        group = match.group
+        names = [name for name in self._pattern_names if group(name) is not None]
+        return names + self._found.get(match.lastgroup, [])
+
+    def __len__(self):
+        return len(self._groups)
+
+
+@lru_cache(maxsize=8)
+def compile_risk_matcher(patterns, keywords):
+    """
+    مطابق مشترك لكل مجموعة أنماط وكلمات (يُبنى مرة واحدة لكل عملية)
+    قاموس المشاعر يُستخدم ككلمات يومية شائعة لاختيار N-grams الفلتر
+
+    Args:
+        patterns: tuple من (Regex، الخطورة)
+        keywords: tuple من (كلمة، الخطورة)
+    """
+    from .text_cleaner import ARABIC_NORMALIZE_TABLE, EMOTION_KEYWORDS
+
+    common_texts = [word for words in EMOTION_KEYWORDS.values() for word in words]
+    return RiskMatcher(patterns, keywords, ARABIC_NORMALIZE_TABLE, common_texts=common_texts)
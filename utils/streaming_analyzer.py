@@ -0,0 +1,166 @@
+"""
+تحليل الرسائل الطويلة جملة بجملة (Streaming) مع توقف مبكر
+يقسم النص لجمل ويحلل كل جملة على حدة مع توزيع تراكمي للمشاعر، ويتوقف
+فور تأكيد الخطر أو حسم الحالة (حين لا تستطيع الجمل المتبقية تغييرها).
+عدد الجمل وطول كل جملة محدودان، فزمن تحليل المشاعر محدود مهما طال النص.
+فحص الخطر لا يتوقف بحسم الحالة أو بالحد الأقصى للجمل: باقي النص يُفحص مرة واحدة
+"""
+
+import re
+from itertools import islice
+
+# الجملة: كل ما قبل علامة نهاية الجملة أو سطر جديد
+SENTENCE_PATTERN = re.compile(r'[^.!?؟؛\n]+[.!?؟؛]*')
+
+# ترتيب مستويات الخطر
+RISK_LEVELS = ('none', 'low', 'medium', 'high')
+
+
+def split_sentences(text, max_sentences=None, max_chars=400):
+    """
+    تقسيم النص لجمل بشكل كسول (لا يُقرأ من النص أكثر من المطلوب)
+    الجمل الأطول من max_chars تُقسم عند أقرب مسافة
+
+    Yields:
+        str: الجمل بالترتيب
+    """
+    def chunks():
+        for match in SENTENCE_PATTERN.finditer(text):
+            sentence = match.group().strip()
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(' ', 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                yield sentence[:cut].strip()
+                sentence = sentence[cut:].strip()
+            if sentence:
+                yield sentence
+
+    return islice(chunks(), max_sentences)
+
+
+class StreamingAnalyzer:
+    def __init__(self, emotion_detector, risk_detector=None, max_sentences=20, max_sentence_chars=400):
+        """
+        Args:
+            emotion_detector: كائن فيه detect_emotion(text)
+            risk_detector: كائن فيه detect_risk(text) (اختياري)
+            max_sentences: أقصى عدد جمل تُحلل من الرسالة
+            max_sentence_chars: أقصى طول للجملة الواحدة
+        """
+        self.emotion_detector = emotion_detector
+        self.risk_detector = risk_detector
+        self.max_sentences = max_sentences
+        self.max_sentence_chars = max_sentence_chars
+
+    def iter_analyze(self, text):
+        """
+        تحليل الجمل واحدة تلو الأخرى
+
+        Yields:
+            dict: حالة التحليل بعد كل جملة (انظر analyze)
+        """
+        # جملة زائدة واحدة فقط لمعرفة هل قُطع النص عند الحد الأقصى
+        sentences = list(split_sentences(text, self.max_sentences + 1, self.max_sentence_chars))
+        truncated = len(sentences) > self.max_sentences
+        sentences = sentences[:self.max_sentences]
+        # أوزان المشاعر (الثقة) من الجمل؛ الجمل الطبيعية لا تُحسب دليلاً على حالة
+        distribution = {}
+        neutral_weight = 0.0
+        breakdown = []
+        risk = {'is_risk': False, 'level': 'none', 'reason': ''}
+        medium_risk_sentences = 0
+
+        for index, sentence in enumerate(sentences):
+            result = self.emotion_detector.detect_emotion(sentence)
+            entry = {
+                'text': sentence,
+                'emotion': result['emotion'],
+                'confidence': result['confidence'],
+            }
+            if result['emotion'] == 'neutral':
+                neutral_weight += result['confidence']
+            else:
+                distribution[result['emotion']] = distribution.get(result['emotion'], 0.0) + result['confidence']
+
+            stop_reason = None
+            if self.risk_detector is not None:
+                sentence_risk = self.risk_detector.detect_risk(sentence)
+                entry['risk_level'] = sentence_risk['level']
+                if sentence_risk['level'] == 'medium':
+                    medium_risk_sentences += 1
+                if RISK_LEVELS.index(sentence_risk['level']) > RISK_LEVELS.index(risk['level']):
+                    risk = sentence_risk
+                # أكثر من جملة مقلقة = خطر عالٍ (مثل أكثر من كلمة في النص الكامل)
+                if medium_risk_sentences > 1 and risk['level'] != 'high':
+                    risk = dict(risk, level='high')
+                if risk['level'] == 'high':
+                    stop_reason = 'risk'
+            breakdown.append(entry)
+
+            remaining = len(sentences) - index - 1
+            if stop_reason is None and self._is_settled(distribution, remaining):
+                stop_reason = 'settled'
+            if stop_reason is None and remaining == 0 and truncated:
+                stop_reason = 'limit'
+            if stop_reason in ('settled', 'limit') and self.risk_detector is not None:
+                # جملة خطر بعد نقطة التوقف لا تُفوت
+                risk = self._full_text_risk(text, risk)
+
+            yield self._snapshot(distribution, neutral_weight, breakdown, risk, stop_reason)
+            if stop_reason in ('risk', 'settled'):
+                return
+
+    def _full_text_risk(self, text, risk):
+        """أعلى خطر بين ما رُصد في الجمل المحللة وفحص النص كاملاً"""
+        if risk['level'] == 'high':
+            return risk
+        full_risk = self.risk_detector.detect_risk(text)
+        if RISK_LEVELS.index(full_risk['level']) > RISK_LEVELS.index(risk['level']):
+            return full_risk
+        return risk
+
+    @staticmethod
+    def _is_settled(distribution, remaining):
+        """الحالة محسومة إذا كان فرق المتصدر أكبر من أقصى وزن ممكن للجمل المتبقية"""
+        if not distribution or not remaining:
+            return False
+        weights = sorted(distribution.values(), reverse=True) + [0.0]
+        return weights[0] - weights[1] > remaining
+
+    @staticmethod
+    def _snapshot(distribution, neutral_weight, breakdown, risk, stop_reason):
+        total = sum(distribution.values())
+        if total:
+            emotion = max(distribution, key=distribution.get)
+            confidence = distribution[emotion] / total
+            shares = {e: round(w / total, 3) for e, w in distribution.items()}
+        else:
+            emotion = 'neutral'
+            confidence = neutral_weight / len(breakdown) if breakdown else 0.5
+            shares = {'neutral': 1.0}
+        return {
+            'emotion': emotion,
+            'confidence': round(confidence, 2),
+            'distribution': shares,
+            'sentences': list(breakdown),
+            'risk': risk,
+            'stopped_early': stop_reason in ('risk', 'settled'),
+            'stop_reason': stop_reason,
+        }
+
+    def analyze(self, text):
+        """
+        تحليل الرسالة كاملة (حتى التوقف المبكر)
+
+        Returns:
+            dict: {
+                'emotion', 'confidence', 'distribution': نسبة كل حالة,
+                'sentences': [{'text', 'emotion', 'confidence', 'risk_level'}],
+                'risk': نتيجة أعلى خطر, 'stopped_early': bool,
+                'stop_reason': 'risk' | 'settled' | 'limit' | None
+            }
+        """
+        last = None
+        for last in self.iter_analyze(text):
+            pass
+        return last or self._snapshot({}, 0.0, [], {'is_risk': False, 'level': 'none', 'reason': ''}, None)
@@ -3,117 +3,170 @@ Text Cleaner للنصوص العربية واللهجة المصرية
 يقوم بتنظيف وتطبيع النص قبل التحليل
 """
 
+import os
 import re
-import emoji
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+from .analysis_cache import get_analysis_cache
+from .emoji_table import EMOJI_RANGES, KEYCAP_BASES, KEYCAP_VARIATION_OPTIONAL
+from .lexicon_store import (get_rewriter, get_shared_matcher,
+                            register_dialect_map, register_lexicon)
+
+
+# قاموس تطبيع اللهجة المصرية للفصحى
+EGYPTIAN_TO_STANDARD = {
+    'ازاي': 'كيف',
+    'ازيك': 'كيف حالك',
+    'عامل': 'كيف',
+    'ايه': 'ماذا',
+    'مش': 'لا',
+    'علشان': 'لأن',
+    'عشان': 'لأن',
+    'لسه': 'لا يزال',
+    'خالص': 'جداً',
+    'اوي': 'جداً',
+    'قوي': 'جداً',
+    'برضه': 'أيضاً',
+    'كمان': 'أيضاً',
+    'بقى': 'أصبح',
+    'يعني': 'أي',
+    'دلوقتي': 'الآن',
+    'حاجة': 'شيء',
+    'حاجات': 'أشياء',
+    'ناس': 'أشخاص',
+    'كده': 'هكذا',
+    'كدة': 'هكذا',
+    'هو': 'هو',
+    'هي': 'هي',
+}
+
+register_dialect_map('egyptian_to_standard', EGYPTIAN_TO_STANDARD)
+
+# كلمات دلالية للحالات النفسية باللهجة المصرية
+EMOTION_KEYWORDS = {
+    'anxiety': ['قلقان', 'خايف', 'متوتر', 'مش مرتاح', 'قلبي مش مطمن',
+                'خوف', 'توتر', 'قلق', 'مرعوب', 'خايف من المستقبل'],
+    'depression': ['زهقان', 'تعبان نفسياً', 'مكتئب', 'مش عايز حاجة',
+                   'حزين', 'مش لاقي معنى', 'مخنوق', 'يئست', 'بكره حياتي', 'زعلان', 'متضايق', 'موجوع'],
+    'stress': ['مضغوط', 'مش قادر', 'تحت ضغط', 'مرهق', 'متعب',
+               'ضغط شديد', 'مش مستحمل', 'كل حاجة صعبة'],
+    'happiness': ['فرحان', 'مبسوط', 'سعيد', 'حلو', 'كويس',
+                  'تمام', 'رايق', 'مستمتع'],
+    'neutral': ['عادي', 'مش عارف', 'عادي كده', 'طبيعي']
+}
+
+register_lexicon('emotion', EMOTION_KEYWORDS)
+
+
+# جدول تطبيع الحروف (الهمزات، الياء، التاء المربوطة) وحذف التشكيل في مرور واحد
+ARABIC_NORMALIZE_TABLE = str.maketrans(
+    {'إ': 'ا', 'أ': 'ا', 'آ': 'ا', 'ى': 'ي', 'ة': 'ه',
+     **{code: None for code in range(0x064B, 0x0660)}}
+)
+
+
+def _build_emoji_pattern():
+    """
+    Regex للإيموجي مبني من جدول النطاقات المُولَّد (بدون مكتبة emoji):
+    تسلسلات الـ Keycap، الأعلام، والإيموجي مع معدلاتها (لون البشرة، FE0F،
+    Tags) والمربوطة بـ ZWJ، ثم أي FE0F متبقي
+    """
+    emoji_class = ''.join(
+        f'\\U{start:08X}-\\U{end:08X}' if start != end else f'\\U{start:08X}'
+        for start, end in EMOJI_RANGES
+    )
+    modifiers = r'\uFE0F\U0001F3FB-\U0001F3FF\U000E0020-\U000E007F'
+    variation = r'\uFE0F?' if KEYCAP_VARIATION_OPTIONAL else r'\uFE0F'
+    keycap = f'[{re.escape(KEYCAP_BASES)}]{variation}\\u20E3'
+    flag = r'[\U0001F1E6-\U0001F1FF]{2}'
+    emoji = f'[{emoji_class}][{modifiers}]*'
+    return f'{keycap}|{flag}|{emoji}(?:\\u200D{emoji})*|\\uFE0F'
+
+
+EMOJI_PATTERN = re.compile(_build_emoji_pattern())
+
+# الحروف المسموح بها بعد التنظيف: حروف وأرقام، مسافات، العربية، وعلامات الترقيم الأساسية
+_ALLOWED_CHARS = r'\w\s\u0600-\u06FF.,!?؛،'
+
+
+def _build_strip_pattern():
+    """
+    بناء Regex واحد يحذف كل ما كانت تحذفه المراحل المنفصلة (الإيموجي، الرموز
+    الخاصة، والأرقام). كل حروف الإيموجي تُحذف أصلاً مع الرموز الخاصة والأرقام
+    ما عدا القليل المصنف كحروف (مثل ℹ) فيُضاف لفئة الحذف
+    """
+    is_allowed = re.compile(f'[{_ALLOWED_CHARS}]').match
+    survivors = ''.join(
+        re.escape(chr(cp))
+        for start, end in EMOJI_RANGES for cp in range(start, end + 1)
+        if is_allowed(chr(cp)) and not chr(cp).isdecimal()
+    )
+    return re.compile(f'[^{_ALLOWED_CHARS}]+|[\\d{survivors}]+')
+
+
+_STRIP_PATTERN = _build_strip_pattern()
+
+# أقل عدد نصوص يستحق تشغيل Process Pool (أقل من ذلك المعالجة المباشرة أسرع)
+PARALLEL_MIN_ITEMS = 20000
+
 
 class ArabicTextCleaner:
     def __init__(self):
         # قاموس تطبيع اللهجة المصرية للفصحى
-        self.egyptian_to_standard = {
-            'ازاي': 'كيف',
-            'ازيك': 'كيف حالك',
-            'عامل': 'كيف',
-            'ايه': 'ماذا',
-            'مش': 'لا',
-            'علشان': 'لأن',
-            'عشان': 'لأن',
-            'لسه': 'لا يزال',
-            'خالص': 'جداً',
-            'اوي': 'جداً',
-            'قوي': 'جداً',
-            'برضه': 'أيضاً',
-            'كمان': 'أيضاً',
-            'بقى': 'أصبح',
-            'يعني': 'أي',
-            'دلوقتي': 'الآن',
-            'حاجة': 'شيء',
-            'حاجات': 'أشياء',
-            'ناس': 'أشخاص',
-            'كده': 'هكذا',
-            'كدة': 'هكذا',
-            'هو': 'هو',
-            'هي': 'هي',
-        }
+        self.egyptian_to_standard = EGYPTIAN_TO_STANDARD
         
         # كلمات دلالية للحالات النفسية باللهجة المصرية
-        self.emotion_keywords = {
-            'anxiety': ['قلقان', 'خايف', 'متوتر', 'مش مرتاح', 'قلبي مش مطمن', 
-                       'خوف', 'توتر', 'قلق', 'مرعوب', 'خايف من المستقبل'],
-            'depression': ['زهقان', 'تعبان نفسياً', 'مكتئب', 'مش عايز حاجة', 
-                          'حزين', 'مش لاقي معنى', 'مخنوق', 'يئست', 'بكره حياتي', 'زعلان', 'متضايق', 'موجوع'],
-            'stress': ['مضغوط', 'مش قادر', 'تحت ضغط', 'مرهق', 'متعب', 
-                      'ضغط شديد', 'مش مستحمل', 'كل حاجة صعبة'],
-            'happiness': ['فرحان', 'مبسوط', 'سعيد', 'حلو', 'كويس', 
-                         'تمام', 'رايق', 'مستمتع'],
-            'neutral': ['عادي', 'مش عارف', 'عادي كده', 'طبيعي']
-        }
+        self.emotion_keywords = EMOTION_KEYWORDS
     
     def normalize_arabic(self, text):
-        """تطبيع الحروف العربية"""
-        # تطبيع الهمزات
-        text = re.sub('[إأآا]', 'ا', text)
-        # تطبيع الياء
-        text = re.sub('ى', 'ي', text)
-        # تطبيع التاء المربوطة
-        text = re.sub('ة', 'ه', text)
-        # إزالة التشكيل
-        text = re.sub(r'[\u064B-\u065F]', '', text)
-        return text
+        """تطبيع الحروف العربية (الهمزات، الياء، التاء المربوطة) وإزالة التشكيل"""
+        return text.translate(ARABIC_NORMALIZE_TABLE)
     
     def remove_emojis(self, text):
-        """إزالة الإيموجي من النص"""
-        return emoji.replace_emoji(text, replace='')
+        """إزالة الإيموجي من النص (جدول نطاقات Unicode بدون مكتبة خارجية)"""
+        return EMOJI_PATTERN.sub('', text)
     
     def clean_text(self, text):
-        """تنظيف شامل للنص"""
-        # تحويل للأحرف الصغيرة (للإنجليزي)
-        text = text.strip()
-        
-        # إزالة الإيموجي
-        text = self.remove_emojis(text)
-        
-        # إزالة الأرقام الزائدة
-        text = re.sub(r'\d+', '', text)
-        
-        # إزالة الرموز الخاصة (مع الاحتفاظ بعلامات الترقيم الأساسية)
-        text = re.sub(r'[^\w\s\u0600-\u06FF.,!?؛،]', '', text)
-        
-        # تطبيع العربية
-        text = self.normalize_arabic(text)
-        
-        # إزالة المسافات الزائدة
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        return text
+        """
+        تنظيف شامل للنص في ثلاث مراحل مدمجة بدل تسع مراحل منفصلة:
+        1. Regex واحد يحذف الإيموجي والأرقام والرموز الخاصة
+           (مع الاحتفاظ بعلامات الترقيم الأساسية)
+        2. جدول translate لتطبيع العربية وإزالة التشكيل
+        3. توحيد المسافات
+        النتيجة مطابقة تماماً للتنفيذ القديم متعدد المراحل
+        """
+        text = _STRIP_PATTERN.sub('', text)
+        text = text.translate(ARABIC_NORMALIZE_TABLE)
+        return ' '.join(text.split())
     
     def map_egyptian_to_standard(self, text):
-        """تحويل اللهجة المصرية للفصحى (اختياري)"""
-        words = text.split()
-        mapped_words = []
-        
-        for word in words:
-            if word in self.egyptian_to_standard:
-                mapped_words.append(self.egyptian_to_standard[word])
-            else:
-                mapped_words.append(word)
-        
-        return ' '.join(mapped_words)
+        """تحويل اللهجة المصرية للفصحى (اختياري) بأطول تطابق في مرور واحد"""
+        return get_rewriter('egyptian_to_standard').rewrite(text)
     
     def detect_emotion_keywords(self, text):
-        """الكشف عن الكلمات المفتاحية للمشاعر"""
-        text_lower = text.lower()
-        detected_emotions = []
-        
-        for emotion, keywords in self.emotion_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    detected_emotions.append(emotion)
-                    break
-        
-        return detected_emotions if detected_emotions else ['neutral']
+        """
+        الكشف عن الكلمات المفتاحية للمشاعر (مرور واحد بـ Trie قاموس المشاعر فقط)
+        الكلمات والنص يُطبَّعان بنفس الطريقة فتتطابق صيغ الهمزات والتشكيل
+        """
+        hits = get_shared_matcher().find(text, 'emotion')
+        if not hits:
+            return ['neutral']
+        # الترتيب حسب القاموس (مثل التنفيذ السابق) وليس حسب موضع الكلمة في النص
+        detected_emotions = [emotion for _, emotion in hits]
+        if len(detected_emotions) > 1:
+            detected_emotions.sort(key=list(self.emotion_keywords).index)
+        return detected_emotions
     
     def preprocess_for_model(self, text, keep_egyptian=True):
-        """معالجة كاملة للنص قبل إرساله للنموذج"""
+        """معالجة كاملة للنص قبل إرساله للنموذج (مع Cache مشترك للنصوص المتكررة)"""
+        cache = get_analysis_cache()
+        key = cache.make_key('preprocess_for_model', text, keep_egyptian)
+        return cache.get_or_compute(key, lambda: self._preprocess(text, keep_egyptian))
+    
+    def _preprocess(self, text, keep_egyptian=True):
+        """المعالجة الفعلية بدون Cache (تستخدمها المعالجة الجماعية أيضاً)"""
         # تنظيف أساسي
         cleaned = self.clean_text(text)
         
@@ -122,6 +175,56 @@ class ArabicTextCleaner:
             cleaned = self.map_egyptian_to_standard(cleaned)
         
         return cleaned
+    
+    def clean_many(self, texts, workers=None, chunksize=1000, keep_egyptian=True):
+        """
+        تنظيف مجموعة كبيرة من النصوص كـ Generator يحافظ على ترتيب المدخلات
+        
+        Args:
+            texts: أي Iterable من النصوص (يُقرأ تدريجياً دون تحميله كاملاً)
+            workers: عدد العمليات (الافتراضي عدد الأنوية، 1 = معالجة مباشرة)
+            chunksize: عدد النصوص في كل دفعة ترسل للعمليات
+            keep_egyptian: الإبقاء على اللهجة المصرية كما في preprocess_for_model
+            
+        Yields:
+            str: النص المنظف بنفس ترتيب المدخلات
+        """
+        workers = workers or os.cpu_count() or 1
+        texts = iter(texts)
+        head = list(islice(texts, max(PARALLEL_MIN_ITEMS, chunksize)))
+        
+        # المدخلات الصغيرة: المعالجة المباشرة أسرع من تشغيل العمليات
+        if workers <= 1 or len(head) < PARALLEL_MIN_ITEMS:
+            for text in chain(head, texts):
+                yield self._preprocess(text, keep_egyptian)
+            return
+        
+        source = chain(head, texts)
+        chunks = iter(lambda: list(islice(source, chunksize)), [])
+        executor = ProcessPoolExecutor(max_workers=workers)
+        pending = deque()
+        try:
+            # إبقاء عدد محدود من الدفعات قيد المعالجة للحفاظ على الذاكرة
+            for chunk in chunks:
+                pending.append(executor.submit(_clean_chunk, chunk, keep_egyptian))
+                if len(pending) >= workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# منظف خاص بكل عملية في الـ Process Pool
+_worker_cleaner = None
+
+
+def _clean_chunk(chunk, keep_egyptian):
+    """تنظيف دفعة نصوص داخل عملية فرعية"""
+    global _worker_cleaner
+    if _worker_cleaner is None:
+        _worker_cleaner = ArabicTextCleaner()
+    return [_worker_cleaner._preprocess(text, keep_egyptian) for text in chunk]
 
 
 # دالة مساعدة للاستخدام المباشر
@@ -131,6 +234,11 @@ def clean_arabic_text(text, keep_egyptian=True):
     return cleaner.preprocess_for_model(text, keep_egyptian)
 
 
+def clean_many(texts, workers=None, chunksize=1000, keep_egyptian=True):
+    """دالة سريعة لتنظيف مجموعة نصوص (انظر ArabicTextCleaner.clean_many)"""
+    return ArabicTextCleaner().clean_many(texts, workers, chunksize, keep_egyptian)
+
+
 # اختبار سريع
 if __name__ == "__main__":
     cleaner = ArabicTextCleaner()
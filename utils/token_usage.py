@@ -0,0 +1,68 @@
+"""
+إحصائيات استهلاك Tokens لطلبات Gemini
+لكل رد يُسجل عدد Tokens المرسلة فعلياً (usage_metadata) وتقدير ما كان سيُرسل
+بالطريقة القديمة (الـ system prompt والسجل كنص كامل في كل طلب) لقياس التوفير
+"""
+
+import threading
+
+
+class TokenUsageStats:
+    def __init__(self):
+        """عدادات Tokens لكل وضع (chat / stateless)"""
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """تصفير العدادات"""
+        with self._lock:
+            self.modes = {}
+            self.last = None
+
+    def record(self, mode, prompt_tokens, reply_tokens, legacy_prompt_tokens):
+        """
+        تسجيل رد واحد
+
+        Args:
+            mode: 'chat' (جلسة محادثة) أو 'stateless' (طلب مستقل)
+            prompt_tokens: Tokens المرسلة فعلياً (مع الـ system_instruction والسجل)
+            reply_tokens: Tokens الرد
+            legacy_prompt_tokens: تقدير Tokens الطلب بالطريقة القديمة
+        """
+        with self._lock:
+            totals = self.modes.setdefault(mode, {'turns': 0, 'prompt': 0, 'reply': 0, 'legacy_prompt': 0})
+            totals['turns'] += 1
+            totals['prompt'] += prompt_tokens
+            totals['reply'] += reply_tokens
+            totals['legacy_prompt'] += legacy_prompt_tokens
+            self.last = {'mode': mode, 'prompt_tokens': prompt_tokens, 'reply_tokens': reply_tokens,
+                         'legacy_prompt_tokens': legacy_prompt_tokens}
+
+    def stats(self):
+        """
+        Returns:
+            dict: {'turns', 'avg_prompt_tokens', 'avg_reply_tokens',
+                   'avg_legacy_prompt_tokens', 'prompt_saving', 'modes', 'last'}
+        """
+        with self._lock:
+            turns = sum(totals['turns'] for totals in self.modes.values())
+            prompt = sum(totals['prompt'] for totals in self.modes.values())
+            reply = sum(totals['reply'] for totals in self.modes.values())
+            legacy = sum(totals['legacy_prompt'] for totals in self.modes.values())
+            return {
+                'turns': turns,
+                'avg_prompt_tokens': round(prompt / turns, 1) if turns else 0.0,
+                'avg_reply_tokens': round(reply / turns, 1) if turns else 0.0,
+                'avg_legacy_prompt_tokens': round(legacy / turns, 1) if turns else 0.0,
+                'prompt_saving': round(1 - prompt / legacy, 3) if legacy else 0.0,
+                'modes': {mode: dict(totals) for mode, totals in self.modes.items()},
+                'last': dict(self.last) if self.last else None,
+            }
+
+
+_stats = TokenUsageStats()
+
+
+def get_token_stats():
+    """إحصائيات الـ Tokens المشتركة بين كل الجلسات"""
+    return _stats
@@ -0,0 +1,181 @@
+"""
+تجهيز النماذج في الخلفية (Warm-up) مع حالة جاهزية
+النماذج الثقيلة (محلل المشاعر، القواميس، عميل Gemini) تُحمَّل وتُجرَّب في
+Thread خلفي من أول تشغيل للسكريبت، فلا يدفع أول مستخدم زمن التحميل.
+عند انتهاء الصلاحية تُستخدم النسخة الحالية وتُحمَّل نسخة جديدة في الخلفية
+ثم تُستبدل (Stale-While-Revalidate) دون توقف ظاهر
+
+الوحدة تعيش في sys.modules، فالحالة مشتركة بين كل تشغيلات السكريبت والجلسات
+"""
+
+import threading
+import time
+
+# الحالات الممكنة لكل مورد
+COLD = 'cold'
+LOADING = 'loading'
+READY = 'ready'
+REFRESHING = 'refreshing'
+FAILED = 'failed'
+
+_MISSING = object()
+
+
+class ResourceHolder:
+    def __init__(self, name, loader, ttl=3600, exercise=None):
+        """
+        Args:
+            name: اسم المورد
+            loader: دالة بدون معاملات تُنشئ المورد
+            ttl: صلاحية النسخة بالثواني قبل إعادة التحميل في الخلفية
+            exercise: دالة تُستدعى على المورد الجديد قبل استخدامه (تسخين)
+        """
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+        self.exercise = exercise
+        self._lock = threading.Lock()
+        self._value = _MISSING
+        self._loaded_at = None
+        self._load_seconds = None
+        self._loading = None  # Event للتحميل الجاري
+        self._error = None
+        self.reloads = 0
+
+    def _start_load(self):
+        """بدء تحميل في الخلفية (واحد فقط في نفس الوقت)"""
+        with self._lock:
+            if self._loading is None:
+                self._loading = threading.Event()
+                threading.Thread(
+                    target=self._load, name=f"warmup:{self.name}", daemon=True
+                ).start()
+            return self._loading
+
+    def _load(self):
+        started = time.perf_counter()
+        try:
+            value = self.loader()
+            if self.exercise is not None:
+                self.exercise(value)
+        except Exception as e:
+            print(f"⚠️ تعذر تجهيز {self.name}: {e}")
+            with self._lock:
+                # النسخة القديمة (إن وجدت) تبقى مستخدمة وتُعاد المحاولة عند الطلب التالي
+                self._error = e
+                done, self._loading = self._loading, None
+        else:
+            with self._lock:
+                if self._value is not _MISSING:
+                    self.reloads += 1
+                self._value = value
+                self._loaded_at = time.monotonic()
+                self._load_seconds = time.perf_counter() - started
+                self._error = None
+                done, self._loading = self._loading, None
+        done.set()
+
+    def warm(self, timeout=None):
+        """تحميل المورد إن لم يكن محملاً وانتظار انتهائه"""
+        with self._lock:
+            if self._value is not _MISSING:
+                return True
+        return self._start_load().wait(timeout)
+
+    def get(self):
+        """
+        المورد الحالي؛ إذا لم يكن محملاً يُنتظر تحميله، وإذا انتهت صلاحيته
+        تُرجع النسخة الحالية ويبدأ التحديث في الخلفية
+
+        Raises:
+            Exception: خطأ التحميل إذا فشل ولا توجد نسخة سابقة
+        """
+        with self._lock:
+            value = self._value
+            expired = value is not _MISSING and time.monotonic() - self._loaded_at >= self.ttl
+        if value is _MISSING:
+            self._start_load().wait()
+            with self._lock:
+                if self._value is _MISSING:
+                    raise self._error
+                return self._value
+        if expired:
+            self._start_load()
+        return value
+
+    def status(self):
+        """
+        Returns:
+            dict: {'state', 'loaded_seconds_ago', 'load_seconds', 'reloads', 'error'}
+        """
+        with self._lock:
+            if self._value is _MISSING:
+                state = LOADING if self._loading else (FAILED if self._error else COLD)
+            else:
+                state = REFRESHING if self._loading else READY
+            return {
+                'state': state,
+                'loaded_seconds_ago': round(time.monotonic() - self._loaded_at, 1)
+                if self._loaded_at is not None else None,
+                'load_seconds': round(self._load_seconds, 3) if self._load_seconds is not None else None,
+                'reloads': self.reloads,
+                'error': str(self._error) if self._error else None,
+            }
+
+
+class WarmupManager:
+    def __init__(self):
+        """مجموعة الموارد المسجلة وترتيب تجهيزها"""
+        self._holders = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def register(self, name, loader, ttl=3600, exercise=None):
+        """
+        تسجيل مورد (التسجيل المتكرر بنفس الاسم يُتجاهل، فيمكن استدعاؤه مع كل تشغيل للسكريبت)
+        """
+        with self._lock:
+            if name not in self._holders:
+                self._holders[name] = ResourceHolder(name, loader, ttl, exercise)
+            return self._holders[name]
+
+    def start(self):
+        """بدء تجهيز كل الموارد بالترتيب في Thread خلفي (مرة واحدة)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            holders = list(self._holders.values())
+            self._thread = threading.Thread(
+                target=lambda: [holder.warm() for holder in holders],
+                name="warmup", daemon=True
+            )
+            self._thread.start()
+
+    def get(self, name):
+        """المورد المسجل بهذا الاسم (انظر ResourceHolder.get)"""
+        return self._holders[name].get()
+
+    def readiness(self):
+        """حالة كل مورد: {الاسم: الحالة}"""
+        with self._lock:
+            holders = dict(self._holders)
+        return {name: holder.status()['state'] for name, holder in holders.items()}
+
+    def is_ready(self, *names):
+        """هل الموارد المطلوبة (أو كلها) جاهزة للاستخدام؟"""
+        readiness = self.readiness()
+        names = names or tuple(readiness)
+        return all(readiness.get(name) in (READY, REFRESHING) for name in names)
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_warmup_manager():
+    """مدير التجهيز المشترك على مستوى العملية"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = WarmupManager()
+        return _manager